@@ -0,0 +1,32 @@
+"""http cache
+
+Revision ID: 5f2b9c4e7a1d
+Revises: 0e35fff276f3
+Create Date: 2026-10-19 09:12:41.305118
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '5f2b9c4e7a1d'
+down_revision = '0e35fff276f3'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('http_cache',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('url', sa.String(255), nullable=False, index=True,
+            unique=True),
+        sa.Column('etag', sa.String(255), nullable=True),
+        sa.Column('last_modified', sa.String(64), nullable=True),
+        sa.Column('body', sa.LargeBinary, nullable=False),
+        sa.Column('fetched_on', sa.DateTime, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('http_cache')
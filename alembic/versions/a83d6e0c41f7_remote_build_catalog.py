@@ -0,0 +1,43 @@
+"""remote build catalog
+
+Revision ID: a83d6e0c41f7
+Revises: 5f2b9c4e7a1d
+Create Date: 2026-10-19 10:24:07.581962
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'a83d6e0c41f7'
+down_revision = '5f2b9c4e7a1d'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('remote_build',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('number', sa.String(16), nullable=False, index=True,
+            unique=True),
+        sa.Column('released_on', sa.DateTime, nullable=False),
+        sa.Column('discovered_on', sa.DateTime, nullable=False),
+    )
+
+    op.create_table('remote_build_asset',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('build', sa.Integer, sa.ForeignKey('remote_build.id'),
+            nullable=False, index=True),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('size', sa.Integer, nullable=True),
+    )
+
+    # The cached releases response is only useful alongside the catalog
+    op.execute('DELETE FROM http_cache')
+
+
+def downgrade():
+    op.drop_table('remote_build_asset')
+    op.drop_table('remote_build')
@@ -0,0 +1,31 @@
+"""soundpack size manifest
+
+Revision ID: b3f6d81e2a47
+Revises: e7b2c8a45f19
+Create Date: 2026-10-19 18:47:09.201836
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'b3f6d81e2a47'
+down_revision = 'e7b2c8a45f19'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('soundpack_size',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('soundpacks_dir', sa.Text(), nullable=False, index=True),
+        sa.Column('path', sa.Text(), nullable=False, unique=True),
+        sa.Column('mtime', sa.Float, nullable=False),
+        sa.Column('size', sa.Integer, nullable=False),
+        sa.Column('recorded_on', sa.DateTime, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('soundpack_size')
@@ -0,0 +1,32 @@
+"""changelog cache
+
+Revision ID: c5e1b7f2d934
+Revises: a83d6e0c41f7
+Create Date: 2026-10-19 11:40:52.213876
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1b7f2d934'
+down_revision = 'a83d6e0c41f7'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('changelog_build',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('number', sa.Integer, nullable=False, index=True,
+            unique=True),
+        sa.Column('status', sa.String(16), nullable=False),
+        sa.Column('locale', sa.String(16), nullable=False),
+        sa.Column('html', sa.Text(), nullable=False),
+        sa.Column('cached_on', sa.DateTime, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('changelog_build')
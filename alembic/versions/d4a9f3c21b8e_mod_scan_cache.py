@@ -0,0 +1,32 @@
+"""mod scan cache
+
+Revision ID: d4a9f3c21b8e
+Revises: c5e1b7f2d934
+Create Date: 2026-10-19 15:02:17.684301
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9f3c21b8e'
+down_revision = 'c5e1b7f2d934'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('mod_scan',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('mods_dir', sa.Text(), nullable=False, index=True),
+        sa.Column('path', sa.Text(), nullable=False, unique=True),
+        sa.Column('mtime', sa.Float, nullable=False),
+        sa.Column('info', sa.Text(), nullable=True),
+        sa.Column('size', sa.Integer, nullable=True),
+        sa.Column('scanned_on', sa.DateTime, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('mod_scan')
@@ -0,0 +1,31 @@
+"""remote size cache
+
+Revision ID: e7b2c8a45f19
+Revises: d4a9f3c21b8e
+Create Date: 2026-10-19 16:21:43.517920
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'e7b2c8a45f19'
+down_revision = 'd4a9f3c21b8e'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('remote_size',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('url', sa.Text(), nullable=False, index=True, unique=True),
+        sa.Column('size', sa.Integer, nullable=False),
+        sa.Column('etag', sa.String(255), nullable=True),
+        sa.Column('last_modified', sa.String(64), nullable=True),
+        sa.Column('checked_on', sa.DateTime, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('remote_size')
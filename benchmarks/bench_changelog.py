@@ -0,0 +1,248 @@
+"""Benchmark parsing and rendering of the Jenkins changelog.
+
+Compares the previous approach (ElementTree.fromstring on the whole body and a
+single StringIO rendered once every build is done) with the streaming parser
+in cddagl.changelog. Reports the time until the first batch of builds is
+available, the total time and the peak memory for each approach.
+
+Use a recorded changelog with:
+
+    curl -o changelog.xml "<cddagl.constants.CHANGELOG_URL>"
+    python benchmarks/bench_changelog.py --payload changelog.xml
+
+Without --payload, synthetic changelogs shaped like the Jenkins API responses
+are generated for a few different sizes.
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree
+
+from datetime import datetime, timezone
+from io import BytesIO, StringIO
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..'))
+
+from babel.dates import format_datetime
+
+import cddagl.constants as cons
+from cddagl.changelog import iter_changelog_builds
+from cddagl.functions import unique
+from cddagl.i18n import load_gettext_no_locale, proxy_gettext as _
+
+RUNS = (
+    ('Tiles', 'Windows'), ('Tiles', 'Windows_x64'), ('Curses', 'Windows'),
+    ('Curses', 'Windows_x64'), ('Tiles', 'Linux_x64'), ('Curses', 'Linux_x64'),
+    ('Tiles', 'OSX'), ('Curses', 'OSX'),
+)
+
+
+def synthetic_payload(count, newest=10500):
+    payload = StringIO()
+    payload.write('<builds>')
+    for number in range(newest, newest - count, -1):
+        payload.write('<build _class="hudson.matrix.MatrixBuild">')
+        payload.write('<building>{0}</building>'.format(
+            'true' if number == newest else 'false'))
+        payload.write('<number>{0}</number>'.format(number))
+        payload.write('<result>{0}</result>'.format(
+            'FAILURE' if number % 7 == 0 else 'SUCCESS'))
+        payload.write('<timestamp>{0}</timestamp>'.format(
+            1588334400000 + number * 3600000))
+        payload.write('<changeSet>')
+        for index in range(number % 12):
+            payload.write('<item><msg>{0}</msg></item>'.format(escape(
+                'Fix <thing> & "stuff" in item {0} (#{1})'.format(index,
+                40000 + number + index))))
+        payload.write('</changeSet>')
+        for ui, plat in RUNS:
+            payload.write('<run><fullDisplayName>Cataclysm-Matrix » '
+                '{0},{1},Windows #{2}</fullDisplayName><result>{3}</result>'
+                '</run>'.format(ui, plat, number,
+                'FAILURE' if number % 7 == 0 and ui == 'Tiles' else 'SUCCESS'))
+        payload.write('</build>')
+    payload.write('</builds>')
+    return payload.getvalue().encode('utf8')
+
+
+def legacy_results_by_platform(build_data):
+    regex = re.compile(r'.*\b'
+                       r'(?P<ui>Curses|Tiles),'
+                       r'(?P<plat>Linux_x64|Windows(?:_x64)?)'
+                       r'\b.*')
+
+    def platform_display_name(code_name):
+        code_name = regex.sub(r'\g<ui>-\g<plat>',
+                              code_name.find('fullDisplayName').text)
+
+        if code_name == 'Tiles-Windows': return _('Windows x86')
+        if code_name == 'Tiles-Windows_x64': return _('Windows x64')
+        if code_name == 'Curses-Linux_x64': return _('All Platforms')
+        return None
+
+    build_platforms = build_data.findall(r'.//run')
+    build_platforms = filter(
+        lambda x: x.find('result') is not None and
+                  x.find('fullDisplayName') is not None and
+                  regex.search(x.find('fullDisplayName').text) is not None,
+        build_platforms
+    )
+
+    return tuple({'result': x.find('result').text,
+                  'platform': platform_display_name(x)}
+                 for x in build_platforms
+                 if platform_display_name(x) is not None)
+
+
+def legacy_parse(payload, batch_size, app_locale, first_batch):
+    """The parsing done by ChangelogParsingThread before the streaming
+    parser."""
+    changelog_html = StringIO()
+    changelog_xml = xml.etree.ElementTree.fromstring(payload.read())
+
+    id_regex = re.compile(r'((?<![\w#])(?=[\w#])|(?<=[\w#])(?![\w#]))'
+                          r'#(?P<id>\d+)\b')
+
+    count = 0
+    for build_data in changelog_xml:
+        build_by_platform = legacy_results_by_platform(build_data)
+        if build_data.find('building').text == 'true':
+            build_status = 'IN_PROGRESS'
+        elif any(x['result'] == 'FAILURE' for x in build_by_platform):
+            build_status = 'FAILURE'
+        else:
+            build_status = 'SUCCESS'
+
+        build_timestamp = int(build_data.find('timestamp').text) // 1000
+        build_date_utc = datetime.utcfromtimestamp(build_timestamp)
+        build_date_utc = build_date_utc.replace(tzinfo=timezone.utc)
+        build_date_local = build_date_utc.astimezone(tz=None)
+        build_date_text = format_datetime(build_date_local,
+            format='long', locale=app_locale)
+
+        build_changes = build_data.findall(r'.//changeSet/item/msg')
+        build_changes = map(lambda x: html.escape(x.text.strip(), True),
+                            build_changes)
+        build_changes = list(unique(build_changes))
+        build_number = int(build_data.find('number').text)
+        build_desc = _('Build #{build_number}').format(
+            build_number=build_number)
+        build_link = (f'<a href="{cons.BUILD_CHANGES_URL(build_number)}">'
+            f'{build_desc}</a>')
+
+        if build_status == 'IN_PROGRESS':
+            changelog_html.write(
+                '<h4>{0} - {1} <span style="color:purple">{2}</span></h4>'
+                .format(build_link, build_date_text,
+                    _('build still in progress!')))
+        elif build_status == 'SUCCESS':
+            changelog_html.write('<h4>{0} - {1}</h4>'.format(build_link,
+                build_date_text))
+        else:
+            changelog_html.write(
+                '<h4>{0} - {1} <span style="color:red">{2} {3}</span></h4>'
+                .format(build_link, build_date_text,
+                    _('but build failed for:'),
+                    ', '.join(map(lambda x: x['platform'],
+                                  filter(lambda y: y['result'] == 'FAILURE',
+                                         build_by_platform)))))
+
+        changelog_html.write('<ul>')
+        if len(build_changes) < 1:
+            changelog_html.write(
+                '<li><span style="color:green">{0}</span></li>'
+                .format(_('No changes, same code as previous build!')))
+        else:
+            for change in build_changes:
+                link_repl = (rf'<a href="{cons.CDDA_ISSUE_URL_ROOT}\g<id>">'
+                    r'#\g<id></a>')
+                change = id_regex.sub(link_repl, change)
+                changelog_html.write(f'<li>{change}</li>')
+        changelog_html.write('</ul>')
+        count += 1
+
+    # Nothing could be shown before everything was rendered
+    first_batch()
+    return count
+
+
+def streaming_parse(payload, batch_size, app_locale, first_batch):
+    changelog_builds = []
+    for changelog_build in iter_changelog_builds(payload, app_locale):
+        changelog_builds.append(changelog_build)
+        if len(changelog_builds) == batch_size:
+            first_batch()
+    if len(changelog_builds) < batch_size:
+        first_batch()
+    return len(changelog_builds)
+
+
+def measure(function, payload, batch_size, repeat):
+    best = None
+    best_first = None
+    for index in range(repeat):
+        first = []
+        started = time.perf_counter()
+        function(BytesIO(payload), batch_size, 'en',
+            lambda: first.append(time.perf_counter()) if not first else None)
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+            best_first = first[0] - started
+
+    tracemalloc.start()
+    count = function(BytesIO(payload), batch_size, 'en', lambda: None)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return best_first, best, peak, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payload', help='recorded Jenkins changelog XML')
+    parser.add_argument('--builds', type=int, nargs='+',
+        default=[100, 500, 2000], help='synthetic changelog sizes, in builds')
+    parser.add_argument('--batch-size', type=int,
+        default=cons.CHANGELOG_BATCH_SIZE)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    load_gettext_no_locale()
+
+    if args.payload is not None:
+        with open(args.payload, 'rb') as payload_file:
+            payloads = [(os.path.basename(args.payload), payload_file.read())]
+    else:
+        payloads = [('{count} builds'.format(count=count),
+            synthetic_payload(count)) for count in args.builds]
+
+    print('{:<14} {:>8} {:>11} {:>10} {:>10} {:>11} {:>10} {:>10}'.format(
+        'payload', 'size', 'old first', 'old total', 'old peak',
+        'new first', 'new total', 'new peak'))
+    for name, payload in payloads:
+        old_first, old_total, old_peak, old_count = measure(legacy_parse,
+            payload, args.batch_size, args.repeat)
+        new_first, new_total, new_peak, new_count = measure(streaming_parse,
+            payload, args.batch_size, args.repeat)
+
+        if old_count != new_count:
+            print('Build count mismatch for {name}: {old} != {new}'.format(
+                name=name, old=old_count, new=new_count))
+
+        print('{:<14} {:>6.1f}MB {:>9.1f}ms {:>8.1f}ms {:>8.1f}MB '
+            '{:>9.1f}ms {:>8.1f}ms {:>8.1f}MB'.format(name,
+            len(payload) / 1048576, old_first * 1000, old_total * 1000,
+            old_peak / 1048576, new_first * 1000, new_total * 1000,
+            new_peak / 1048576))
+
+
+if __name__ == '__main__':
+    main()
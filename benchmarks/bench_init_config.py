@@ -0,0 +1,74 @@
+"""Benchmark the cold start cost of initializing the config database.
+
+Each measurement runs in a fresh interpreter so module imports are included.
+The fast path is init_config on a database already at the head revision. The
+upgrade path is what every launch used to do: import alembic and run the
+upgrade command even when there is nothing to migrate.
+
+    python benchmarks/bench_init_config.py --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+FAST_PATH = '''
+import time
+started = time.perf_counter()
+from cddagl.sql.functions import init_config
+init_config({root!r})
+print(time.perf_counter() - started)
+'''
+
+UPGRADE_PATH = '''
+import time
+started = time.perf_counter()
+from cddagl.sql.functions import upgrade_config, load_config_values
+upgrade_config({root!r})
+load_config_values()
+print(time.perf_counter() - started)
+'''
+
+
+def run(code, env):
+    output = subprocess.check_output([sys.executable, '-c',
+        code.format(root=ROOT_DIR)], cwd=ROOT_DIR, env=env)
+    return float(output.decode('utf8').strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env = dict(os.environ)
+        env['LOCALAPPDATA'] = temp_dir
+        env['PYTHONPATH'] = os.pathsep.join(
+            [ROOT_DIR] + [x for x in [env.get('PYTHONPATH')] if x])
+
+        # Create the database at the head revision first
+        run(UPGRADE_PATH, env)
+
+        fast_times = []
+        upgrade_times = []
+        for _ in range(args.repeat):
+            fast_times.append(run(FAST_PATH, env))
+            upgrade_times.append(run(UPGRADE_PATH, env))
+
+    fast = statistics.median(fast_times) * 1000
+    upgrade = statistics.median(upgrade_times) * 1000
+    print('upgrade path: {0:8.1f} ms (median of {1})'.format(upgrade,
+        args.repeat))
+    print('fast path:    {0:8.1f} ms (median of {1})'.format(fast,
+        args.repeat))
+    print('saved:        {0:8.1f} ms'.format(upgrade - fast))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,392 @@
+"""Benchmark the file operations behind the launcher tabs.
+
+Every operation is run headless, without Qt, the same way the widgets do it:
+
+* exe: fingerprinting the game executable (SHA256 and embedded version)
+* saves: scanning the save directory for worlds, characters and size
+* backup: compressing the save directory in a backup archive
+* backup-list: reading the summary of every backup archive
+* extract: extracting a build archive member by member
+* extract-stream: extracting the same archive in chunks with cddagl.archives
+* copy: copying a game directory in READ_BUFFER_SIZE chunks
+* delete: deleting a game directory entry by entry
+* mods: reading modinfo.json and the size of every mod
+* restore: finding and copying the custom mods of a previous version
+* releases: parsing a GitHub releases listing
+* changelog: parsing and rendering a Jenkins changelog
+
+The fixtures are synthetic but shaped like a real installation: a 30 MB
+executable, a save directory with thousands of map files, a 100 MB build
+archive and a few hundred mods at the default scale. They are generated from
+a fixed seed so runs can be compared. Use --fixtures to keep them between
+runs and --scale to make them smaller or larger.
+
+    python benchmarks/bench_io.py --repeat 3
+    python benchmarks/bench_io.py --scale 0.1 --only exe saves mods
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+from io import BytesIO
+from os import scandir
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..'))
+
+from cddagl.archives import extract_archive
+from cddagl.changelog import iter_changelog_builds
+from cddagl.fileops import (fingerprint_exe, SavesScan, backup_summary,
+    mod_config_info, tree_size, custom_content, copy_custom_content,
+    SavesArchive, copy_tree, delete_tree)
+from cddagl.i18n import load_gettext_no_locale
+from cddagl.releases import parse_releases
+
+import bench_changelog
+import bench_releases
+
+EXE_VERSION = '0.E-10500-g0123abc'
+MB = 1024 * 1024
+
+
+def random_bytes(rng, size):
+    return rng.getrandbits(size * 8).to_bytes(size, 'little')
+
+
+def json_bytes(rng, size):
+    """Compressible JSON shaped like the game data files."""
+    items = []
+    length = 0
+    while length < size:
+        item = {
+            'type': rng.choice(('MONSTER', 'ITEM', 'GENERIC', 'terrain',
+                'recipe')),
+            'id': 'id_{0}'.format(rng.getrandbits(32)),
+            'name': {'str': 'thing {0}'.format(rng.randrange(10000))},
+            'description': 'A synthetic description ' * rng.randrange(1, 6),
+            'weight': '{0} g'.format(rng.randrange(1, 5000)),
+            'flags': rng.sample(('NO_SALVAGE', 'WATERPROOF', 'FRAGILE',
+                'LIGHT_1', 'TRADER_AVOID', 'ZERO_WEIGHT'), 2)
+        }
+        items.append(item)
+        length += 200
+    return json.dumps(items, indent=2).encode('utf8')[:size]
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class Fixtures():
+    def __init__(self, root, scale, seed):
+        self.root = root
+        self.scale = scale
+        self.seed = seed
+
+        self.exe_path = os.path.join(root, 'cataclysm-tiles.exe')
+        self.game_dir = os.path.join(root, 'game')
+        self.save_dir = os.path.join(self.game_dir, 'save')
+        self.mods_dir = os.path.join(self.game_dir, 'data', 'mods')
+        self.build_path = os.path.join(root, 'build.zip')
+        self.backups_dir = os.path.join(root, 'backups')
+
+    def scaled(self, value):
+        return max(1, int(value * self.scale))
+
+    def create(self):
+        marker = os.path.join(self.root, 'fixtures.json')
+        description = {'scale': self.scale, 'seed': self.seed}
+        if os.path.isfile(marker):
+            with open(marker, 'r', encoding='utf8') as f:
+                if json.load(f) == description:
+                    return False
+            shutil.rmtree(self.root)
+
+        os.makedirs(self.root, exist_ok=True)
+        rng = random.Random(self.seed)
+
+        self.create_exe(rng)
+        self.create_saves(rng)
+        self.create_mods(rng)
+        self.create_build(rng)
+        self.create_backups()
+
+        with open(marker, 'w', encoding='utf8') as f:
+            json.dump(description, f)
+
+        return True
+
+    def create_exe(self, rng):
+        size = self.scaled(30 * MB)
+        data = bytearray(random_bytes(rng, size))
+        version = EXE_VERSION.encode('ascii') + b'\x00'
+        offset = rng.randrange(size // 2, size - len(version))
+        data[offset:offset + len(version)] = version
+        write_file(self.exe_path, data)
+
+    def create_saves(self, rng):
+        for world_index in range(4):
+            world_dir = os.path.join(self.save_dir,
+                'World{0}'.format(world_index))
+            write_file(os.path.join(world_dir, 'worldoptions.json'),
+                json_bytes(rng, 4096))
+            write_file(os.path.join(world_dir, 'master.gsav'),
+                json_bytes(rng, 2048))
+            for character_index in range(2):
+                write_file(os.path.join(world_dir,
+                    'Character{0}.sav'.format(character_index)),
+                    json_bytes(rng, 256 * 1024))
+
+            for map_index in range(self.scaled(1500)):
+                x = map_index % 40
+                y = map_index // 40
+                write_file(os.path.join(world_dir, 'maps',
+                    '{0}.{1}.0'.format(x // 4, y // 4),
+                    '{0}.{1}.0.map'.format(x, y)),
+                    json_bytes(rng, rng.randrange(2048, 12288)))
+
+    def create_mods(self, rng):
+        for mod_index in range(self.scaled(300)):
+            mod_dir = os.path.join(self.mods_dir, 'mod{0}'.format(mod_index))
+            modinfo = [{
+                'type': 'MOD_INFO',
+                'ident': 'mod{0}'.format(mod_index),
+                'name': 'Synthetic mod {0}'.format(mod_index),
+                'authors': ['Someone'],
+                'description': 'A synthetic mod',
+                'category': 'content',
+                'dependencies': ['dda']
+            }]
+            write_file(os.path.join(mod_dir, 'modinfo.json'),
+                json.dumps(modinfo, indent=2).encode('utf8'))
+            for file_index in range(rng.randrange(2, 12)):
+                write_file(os.path.join(mod_dir, 'items',
+                    'file{0}.json'.format(file_index)),
+                    json_bytes(rng, rng.randrange(1024, 16384)))
+
+    def create_build(self, rng):
+        # Half of the content is incompressible, like the tilesets and sounds
+        size = self.scaled(100 * MB)
+        with zipfile.ZipFile(self.build_path, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.writestr('cataclysm-tiles.exe', random_bytes(rng,
+                min(size // 4, 30 * MB)))
+            written = 0
+            index = 0
+            while written < size:
+                if index % 2 == 0:
+                    data = random_bytes(rng, rng.randrange(64, 1024) * 1024)
+                    name = 'gfx/tileset{0}/tiles{1}.png'.format(index % 7,
+                        index)
+                else:
+                    data = json_bytes(rng, rng.randrange(16, 512) * 1024)
+                    name = 'data/json/items/file{0}.json'.format(index)
+                z.writestr(name, data)
+                written += len(data)
+                index += 1
+
+    def create_backups(self):
+        os.makedirs(self.backups_dir, exist_ok=True)
+        first_backup = os.path.join(self.backups_dir, 'backup0.zip')
+        SavesArchive(self.game_dir, first_backup).scan().write()
+        for index in range(1, 10):
+            shutil.copy(first_backup, os.path.join(self.backups_dir,
+                'backup{0}.zip'.format(index)))
+
+
+def case_exe(fixtures, work_dir):
+    started = time.perf_counter()
+    fingerprint = fingerprint_exe(fixtures.exe_path)
+    elapsed = time.perf_counter() - started
+    if fingerprint.version != EXE_VERSION:
+        raise ValueError('Unexpected version: ' + fingerprint.version)
+    return elapsed, fingerprint.total_read, 1
+
+
+def case_saves(fixtures, work_dir):
+    started = time.perf_counter()
+    scan = SavesScan(fixtures.save_dir).scan()
+    elapsed = time.perf_counter() - started
+    return elapsed, scan.size, len(scan.world_dirs)
+
+
+def case_backup(fixtures, work_dir):
+    backup_path = os.path.join(work_dir, 'backup.zip')
+    started = time.perf_counter()
+    total = SavesArchive(fixtures.game_dir, backup_path).scan().write()
+    elapsed = time.perf_counter() - started
+    return elapsed, total, 1
+
+
+def case_backup_list(fixtures, work_dir):
+    total = 0
+    count = 0
+    started = time.perf_counter()
+    for entry in scandir(fixtures.backups_dir):
+        summary = backup_summary(entry.path)
+        if summary is not None:
+            total += entry.stat().st_size
+            count += 1
+    elapsed = time.perf_counter() - started
+    return elapsed, total, count
+
+
+def case_extract(fixtures, work_dir):
+    extract_dir = os.path.join(work_dir, 'extract')
+    total = 0
+    started = time.perf_counter()
+    with zipfile.ZipFile(fixtures.build_path) as zfile:
+        infolist = zfile.infolist()
+        for info in infolist:
+            zfile.extract(info, extract_dir)
+            total += info.file_size
+    elapsed = time.perf_counter() - started
+    return elapsed, total, len(infolist)
+
+
+def case_extract_stream(fixtures, work_dir):
+    extract_dir = os.path.join(work_dir, 'extract-stream')
+    with zipfile.ZipFile(fixtures.build_path) as zfile:
+        members = len(zfile.infolist())
+    progress = []
+    started = time.perf_counter()
+    extract_archive(fixtures.build_path, extract_dir,
+        lambda done, total: progress.append(done))
+    elapsed = time.perf_counter() - started
+    return elapsed, progress[-1], members
+
+
+def case_copy(fixtures, work_dir):
+    started = time.perf_counter()
+    total, files = copy_tree(fixtures.game_dir, os.path.join(work_dir, 'copy'))
+    elapsed = time.perf_counter() - started
+    return elapsed, total, files
+
+
+def case_delete(fixtures, work_dir):
+    delete_dir = os.path.join(work_dir, 'delete')
+    total, _ = copy_tree(fixtures.game_dir, delete_dir)
+    started = time.perf_counter()
+    files = delete_tree(delete_dir)
+    elapsed = time.perf_counter() - started
+    return elapsed, total, files
+
+
+def case_mods(fixtures, work_dir):
+    mods = []
+    started = time.perf_counter()
+    for entry in scandir(fixtures.mods_dir):
+        if entry.is_dir():
+            config_file = os.path.join(entry.path, 'modinfo.json')
+            if os.path.isfile(config_file):
+                info = mod_config_info(config_file)
+                if 'ident' in info:
+                    info['size'] = tree_size(entry.path)
+                    mods.append(info)
+    elapsed = time.perf_counter() - started
+    return elapsed, sum(x['size'] for x in mods), len(mods)
+
+
+def case_restore(fixtures, work_dir):
+    game_dir = os.path.join(work_dir, 'restore')
+    os.makedirs(os.path.join(game_dir, 'data', 'mods'))
+    copy_tree(fixtures.mods_dir, os.path.join(game_dir, 'previous_version',
+        'data', 'mods'))
+    progress = [0]
+    started = time.perf_counter()
+    copies = custom_content(game_dir, os.path.join(game_dir,
+        'previous_version'))
+    copy_custom_content(copies, None, lambda done, total: progress.append(
+        done))
+    elapsed = time.perf_counter() - started
+    return elapsed, progress[-1], len(copies)
+
+
+def case_releases(fixtures, work_dir):
+    payload = bench_releases.synthetic_payload(fixtures.scaled(300))
+    started = time.perf_counter()
+    releases = parse_releases(payload)
+    elapsed = time.perf_counter() - started
+    return elapsed, len(payload), len(releases)
+
+
+def case_changelog(fixtures, work_dir):
+    payload = bench_changelog.synthetic_payload(fixtures.scaled(500))
+    started = time.perf_counter()
+    builds = list(iter_changelog_builds(BytesIO(payload), 'en'))
+    elapsed = time.perf_counter() - started
+    return elapsed, len(payload), len(builds)
+
+
+CASES = (
+    ('exe', case_exe),
+    ('saves', case_saves),
+    ('backup', case_backup),
+    ('backup-list', case_backup_list),
+    ('extract', case_extract),
+    ('extract-stream', case_extract_stream),
+    ('copy', case_copy),
+    ('delete', case_delete),
+    ('mods', case_mods),
+    ('restore', case_restore),
+    ('releases', case_releases),
+    ('changelog', case_changelog),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures',
+        help='directory where the fixtures are kept between runs')
+    parser.add_argument('--scale', type=float, default=1.0,
+        help='size of the fixtures relative to a real installation')
+    parser.add_argument('--seed', type=int, default=20200501)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', choices=[x[0] for x in CASES],
+        help='operations to measure')
+    args = parser.parse_args()
+
+    load_gettext_no_locale()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fixtures_dir = args.fixtures
+        if fixtures_dir is None:
+            fixtures_dir = os.path.join(temp_dir, 'fixtures')
+
+        fixtures = Fixtures(fixtures_dir, args.scale, args.seed)
+        started = time.perf_counter()
+        if fixtures.create():
+            print('Fixtures created in {0:.1f}s'.format(time.perf_counter()
+                - started))
+
+        print('{:<14} {:>10} {:>10} {:>10} {:>12}'.format('operation',
+            'best', 'size', 'MB/s', 'items/s'))
+        for name, case in CASES:
+            if args.only is not None and name not in args.only:
+                continue
+
+            best = None
+            for _ in range(args.repeat):
+                work_dir = tempfile.mkdtemp(dir=temp_dir)
+                try:
+                    elapsed, total, items = case(fixtures, work_dir)
+                finally:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                if best is None or elapsed < best:
+                    best = elapsed
+
+            print('{:<14} {:>8.1f}ms {:>8.1f}MB {:>10.1f} {:>12.1f}'.format(
+                name, best * 1000, total / MB, total / MB / best,
+                items / best))
+
+
+if __name__ == '__main__':
+    main()
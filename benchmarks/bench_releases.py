@@ -0,0 +1,218 @@
+"""Benchmark parsing of the GitHub releases listing.
+
+Compares the previous approach (buffer the whole response, decode it to a
+string, json.loads it and match every asset) with the streaming parser in
+cddagl.releases. Reports the time and the peak memory for each approach.
+
+Use a recorded listing with:
+
+    curl -o releases.json "https://api.github.com/repos/CleverRaven/Cataclysm-DDA/releases?per_page=100"
+    python benchmarks/bench_releases.py --payload releases.json
+
+Without --payload, synthetic listings shaped like the GitHub API responses are
+generated for a few different sizes.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from io import BytesIO, TextIOWrapper
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..'))
+
+import arrow
+
+import cddagl.constants as cons
+from cddagl.releases import ReleaseStreamParser
+
+PLATFORMS = (
+    ('Windows_x64', 'Tiles'), ('Windows_x64', 'Curses'),
+    ('Windows', 'Tiles'), ('Windows', 'Curses'),
+    ('Linux_x64', 'Tiles'), ('Linux_x64', 'Curses'),
+    ('OSX', 'Tiles'), ('OSX', 'Curses'),
+    ('Android', 'arm64'), ('Android', 'arm32'),
+)
+
+
+def user(login):
+    return {
+        'login': login,
+        'id': 1234567,
+        'node_id': 'MDQ6VXNlcjEyMzQ1Njc=',
+        'avatar_url': 'https://avatars.githubusercontent.com/u/1234567?v=4',
+        'url': 'https://api.github.com/users/' + login,
+        'html_url': 'https://github.com/' + login,
+        'type': 'Bot',
+        'site_admin': False
+    }
+
+
+def release(number):
+    base_url = 'https://api.github.com/repos/CleverRaven/Cataclysm-DDA'
+    tag = 'cdda-jenkins-b{number}'.format(number=number)
+    assets = []
+    for index, (platform, graphics) in enumerate(PLATFORMS):
+        name = 'cataclysmdda-0.E-{platform}-{graphics}-{number}.zip'.format(
+            platform=platform, graphics=graphics, number=number)
+        assets.append({
+            'url': base_url + '/releases/assets/{id}'.format(id=number * 100
+                + index),
+            'id': number * 100 + index,
+            'node_id': 'MDEyOlJlbGVhc2VBc3NldDE5MDk2NzEz',
+            'name': name,
+            'label': '',
+            'uploader': user('github-actions[bot]'),
+            'content_type': 'application/zip',
+            'state': 'uploaded',
+            'size': 40000000 + number,
+            'download_count': 42,
+            'created_at': '2020-05-01T12:00:00Z',
+            'updated_at': '2020-05-01T12:05:00Z',
+            'browser_download_url': 'https://github.com/CleverRaven/'
+                'Cataclysm-DDA/releases/download/{tag}/{name}'.format(
+                tag=tag, name=name)
+        })
+
+    return {
+        'url': base_url + '/releases/{number}'.format(number=number),
+        'assets_url': base_url + '/releases/{number}/assets'.format(
+            number=number),
+        'html_url': 'https://github.com/CleverRaven/Cataclysm-DDA/releases/'
+            'tag/' + tag,
+        'id': number,
+        'author': user('github-actions[bot]'),
+        'node_id': 'MDc6UmVsZWFzZTI2MjM1NzU4',
+        'tag_name': tag,
+        'target_commitish': 'master',
+        'name': 'Cataclysm-DDA experimental build #{number}'.format(
+            number=number),
+        'draft': False,
+        'prerelease': True,
+        'created_at': '2020-05-01T11:58:00Z',
+        'published_at': '2020-05-01T12:06:00Z',
+        'assets': assets,
+        'tarball_url': base_url + '/tarball/' + tag,
+        'zipball_url': base_url + '/zipball/' + tag,
+        'body': 'Changes in this build:\n' + '\n'.join(
+            '* Fix {index} "quoted" and {{braced}} text'.format(index=index)
+            for index in range(40))
+    }
+
+
+def synthetic_payload(count):
+    return json.dumps([release(11000 - x) for x in range(count)],
+        indent=2).encode('utf8')
+
+
+def legacy_parse(chunks, platform, graphics):
+    """The parsing done by UpdateGroupBox before the streaming parser."""
+    buffer = BytesIO()
+    for chunk in chunks:
+        buffer.write(chunk)
+
+    buffer.seek(0)
+    releases = json.loads(TextIOWrapper(buffer, encoding='utf8').read())
+
+    target_regex = re.compile(r'cataclysmdda-(?P<major>.+)-' +
+        re.escape(platform) + r'-' +
+        re.escape(graphics) + r'-' +
+        r'(?P<build>\d+)\.zip'
+        )
+    build_regex = re.compile(r'build #(?P<build>\d+)')
+
+    builds = []
+    for release in releases:
+        if any(x not in release for x in ('name', 'created_at')):
+            continue
+
+        build_match = build_regex.search(release['name'])
+        if build_match is not None:
+            asset = None
+            if 'assets' in release:
+                asset = next((x for x in release['assets']
+                    if 'browser_download_url' in x
+                    and 'name' in x
+                    and target_regex.search(x['name']) is not None), None)
+
+            builds.append({
+                'url': asset['browser_download_url'] if asset is not None
+                    else None,
+                'name': asset['name'] if asset is not None else None,
+                'number': build_match.group('build'),
+                'date': arrow.get(release['created_at']).datetime
+            })
+
+    return builds
+
+
+def streaming_parse(chunks, platform, graphics):
+    parser = ReleaseStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def measure(function, payload, chunk_size, repeat):
+    chunks = [payload[x:x + chunk_size]
+        for x in range(0, len(payload), chunk_size)]
+
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(chunks, 'Windows_x64', 'Tiles')
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+
+    tracemalloc.start()
+    result = function(chunks, 'Windows_x64', 'Tiles')
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return best, peak, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payload', help='recorded releases listing')
+    parser.add_argument('--releases', type=int, nargs='+',
+        default=[30, 100, 300, 1000],
+        help='synthetic listing sizes, in releases')
+    parser.add_argument('--chunk-size', type=int,
+        default=cons.READ_BUFFER_SIZE, help='bytes per readyRead chunk')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payload is not None:
+        with open(args.payload, 'rb') as payload_file:
+            payloads = [(os.path.basename(args.payload), payload_file.read())]
+    else:
+        payloads = [('{count} releases'.format(count=count),
+            synthetic_payload(count)) for count in args.releases]
+
+    print('{:<16} {:>10} {:>10} {:>12} {:>10} {:>12} {:>7}'.format('payload',
+        'size', 'legacy', 'legacy peak', 'stream', 'stream peak', 'builds'))
+    for name, payload in payloads:
+        legacy_time, legacy_peak, legacy_count = measure(legacy_parse,
+            payload, args.chunk_size, args.repeat)
+        stream_time, stream_peak, stream_count = measure(streaming_parse,
+            payload, args.chunk_size, args.repeat)
+
+        if legacy_count != stream_count:
+            print('Build count mismatch for {name}: {legacy} != {stream}'
+                .format(name=name, legacy=legacy_count, stream=stream_count))
+
+        print('{:<16} {:>8.1f}MB {:>8.1f}ms {:>10.1f}MB {:>8.1f}ms '
+            '{:>10.1f}MB {:>7}'.format(name, len(payload) / 1048576,
+            legacy_time * 1000, legacy_peak / 1048576, stream_time * 1000,
+            stream_peak / 1048576, stream_count))
+
+
+if __name__ == '__main__':
+    main()
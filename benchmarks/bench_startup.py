@@ -0,0 +1,136 @@
+"""Benchmark the startup cost of the launcher.
+
+Two measurements are taken, each in fresh interpreters:
+
+* The import time of the launcher modules, as recorded by python -X importtime.
+  The self time of every imported module is summed by top level package so
+  the heaviest dependencies stand out.
+* The wall-clock time until the main window is shown and the event loop is
+  running, following the same steps as cddagl.launcher.run_cddagl.
+
+A temporary LOCALAPPDATA is used so the configuration database of the current
+user is not touched. The database is created before measuring so migrations
+are not part of the timings.
+
+    python benchmarks/bench_startup.py --repeat 5 --top 15
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..'))
+
+IMPORTTIME_REGEX = re.compile(r'^import time:\s+(?P<self>\d+) \|\s+'
+    r'(?P<cumulative>\d+) \| (?P<name>.+)$')
+
+FIRST_WINDOW = '''
+import time
+started = time.perf_counter()
+import sys
+from cddagl.i18n import load_gettext_no_locale, load_gettext_locale
+from cddagl.constants import get_cddagl_path, get_locale_path
+from cddagl.sql.functions import init_config
+load_gettext_no_locale()
+init_config(get_cddagl_path())
+load_gettext_locale(get_locale_path(), 'en')
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from cddagl.ui.views.tabbed import TabbedWindow
+app = QApplication(sys.argv)
+app.single_instance = None
+app.app_locale = 'en'
+win = TabbedWindow('CDDA Game Launcher')
+win.show()
+app.main_win = win
+def shown():
+    print(time.perf_counter() - started)
+    app.quit()
+QTimer.singleShot(0, shown)
+app.exec_()
+'''
+
+
+def run(args, env):
+    return subprocess.run([sys.executable] + args, cwd=ROOT_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+
+
+def import_times(module, env):
+    result = run(['-X', 'importtime', '-c', 'import ' + module], env)
+
+    total = 0
+    by_package = defaultdict(int)
+    for line in result.stderr.decode('utf8', 'replace').splitlines():
+        match = IMPORTTIME_REGEX.match(line)
+        if match is None:
+            continue
+
+        self_time = int(match.group('self'))
+        total += self_time
+        by_package[match.group('name').strip().split('.')[0]] += self_time
+
+    return total, by_package
+
+
+def first_window_time(env):
+    result = run(['-c', FIRST_WINDOW], env)
+    return float(result.stdout.decode('utf8').strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='cddagl.launcher',
+        help='module imported for the import time measurement')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15,
+        help='number of packages listed by import time')
+    parser.add_argument('--offscreen', action='store_true',
+        help='use the offscreen Qt platform to avoid showing windows')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env = dict(os.environ)
+        env['LOCALAPPDATA'] = temp_dir
+        env['PYTHONPATH'] = os.pathsep.join(
+            [ROOT_DIR] + [x for x in [env.get('PYTHONPATH')] if x])
+        if args.offscreen:
+            env['QT_QPA_PLATFORM'] = 'offscreen'
+
+        # Create the configuration database and warm the disk cache
+        first_window_time(env)
+
+        totals = []
+        packages = defaultdict(list)
+        window_times = []
+        for _ in range(args.repeat):
+            total, by_package = import_times(args.module, env)
+            totals.append(total)
+            for package, self_time in by_package.items():
+                packages[package].append(self_time)
+
+            window_times.append(first_window_time(env))
+
+    print('import {module}: {total:8.1f} ms (median of {repeat})'.format(
+        module=args.module, total=statistics.median(totals) / 1000,
+        repeat=args.repeat))
+
+    medians = sorted(((statistics.median(times + [0] * (args.repeat -
+        len(times))), package) for package, times in packages.items()),
+        reverse=True)
+    for self_time, package in medians[:args.top]:
+        print('    {package:<24} {self_time:8.1f} ms'.format(package=package,
+            self_time=self_time / 1000))
+
+    print('first window:     {window:8.1f} ms (median of {repeat})'.format(
+        window=statistics.median(window_times) * 1000, repeat=args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Benchmark a whole game update against the local mock server.
+
+The launcher runs in a fresh interpreter with a temporary LOCALAPPDATA and is
+pointed at benchmarks/mock_server.py. Once the builds and the changelog are
+loaded, the update is started the same way the Update game button does and
+the launcher is closed once it is done. Nothing is mocked inside the
+launcher: the download, the archive test, the previous version backup, the
+extraction and the post-extraction steps all run as they do for users.
+
+Two scenarios are available:
+
+* install: install the latest build in an empty directory
+* update: install an older build first, then time the update to the latest
+  build, which also moves the previous version and restores the saves
+
+The total time, the operations recorded in cddagl.metrics and the status bar
+messages are reported for every run.
+
+    python benchmarks/bench_update.py --scenario update --repeat 3
+    python benchmarks/bench_update.py --latency 0.2 --bandwidth 20 --redirect
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..'))
+
+import mock_server
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..'))
+
+UPDATE_RUN = '''
+import json
+import sys
+import time
+from cddagl.i18n import load_gettext_no_locale, load_gettext_locale
+from cddagl.constants import get_cddagl_path, get_locale_path
+from cddagl.sql.functions import init_config, set_config_value
+load_gettext_no_locale()
+init_config(get_cddagl_path())
+load_gettext_locale(get_locale_path(), 'en')
+set_config_value('branch', 'experimental')
+set_config_value('platform', 'x64')
+set_config_value('game_directory', {game_dir!r})
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from cddagl.metrics import metrics
+from cddagl.ui.views.tabbed import TabbedWindow
+app = QApplication(sys.argv)
+app.single_instance = None
+app.app_locale = 'en'
+win = TabbedWindow('CDDA Game Launcher')
+win.show()
+app.main_win = win
+update_group_box = win.central_widget.main_tab.update_group_box
+status_bar = win.statusBar()
+messages = []
+state = {{'started': None, 'operations': 0}}
+def message_changed(message):
+    if message and state['started'] is not None:
+        messages.append((time.perf_counter() - state['started'], message))
+status_bar.messageChanged.connect(message_changed)
+def done(completed):
+    print(json.dumps({{
+        'completed': completed,
+        'total': time.perf_counter() - state['started'],
+        'build': win.central_widget.main_tab.game_dir_group_box.current_build,
+        'message': status_bar.currentMessage(),
+        'messages': messages,
+        'operations': [x.to_dict() for x in
+            metrics.recent_operations()[:len(metrics.operations) -
+            state['operations']]]
+    }}))
+    win.close()
+def poll():
+    if state['started'] is None:
+        if (status_bar.busy == 0 and update_group_box.builds
+                and update_group_box.update_button.isEnabled()):
+            update_group_box.builds_combo.setCurrentIndex({build_index})
+            state['operations'] = len(metrics.operations)
+            state['started'] = time.perf_counter()
+            update_group_box.update_game()
+    elif not update_group_box.updating:
+        done(True)
+        return
+    elif time.perf_counter() - state['started'] > {timeout}:
+        done(False)
+        return
+    QTimer.singleShot(20, poll)
+QTimer.singleShot(0, poll)
+app.exec_()
+'''
+
+
+def run_update(game_dir, build_index, timeout, env):
+    code = UPDATE_RUN.format(game_dir=game_dir, build_index=build_index,
+        timeout=timeout)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR,
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        timeout=timeout + 60)
+    lines = result.stdout.decode('utf8', 'replace').strip().splitlines()
+    if result.returncode != 0 or len(lines) == 0:
+        sys.stderr.write(result.stderr.decode('utf8', 'replace'))
+        raise RuntimeError('The launcher exited with {code}'.format(
+            code=result.returncode))
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', choices=('install', 'update'),
+        default='update')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--build-size', type=float, default=100,
+        help='content of the build archives, in MB')
+    parser.add_argument('--builds-dir',
+        help='directory where the build archives are kept between runs')
+    parser.add_argument('--latency', type=float, default=0.0,
+        help='seconds waited before every response')
+    parser.add_argument('--bandwidth', type=float, default=0,
+        help='download bandwidth in MB/s, unlimited by default')
+    parser.add_argument('--redirect', action='store_true',
+        help='send downloads through a redirect')
+    parser.add_argument('--rate-limit', type=int,
+        help='GitHub API requests allowed before answering 403')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+        help='fraction of downloads dropped halfway through')
+    parser.add_argument('--timeout', type=float, default=600,
+        help='seconds allowed for each update')
+    parser.add_argument('--offscreen', action='store_true',
+        help='use the offscreen Qt platform to avoid showing windows')
+    args = parser.parse_args()
+
+    if args.builds_dir is not None and not os.path.isdir(args.builds_dir):
+        os.makedirs(args.builds_dir)
+
+    server = mock_server.MockServer(build_size=int(args.build_size *
+        mock_server.MB), latency=args.latency, bandwidth=args.bandwidth *
+        mock_server.MB, redirect=args.redirect, rate_limit=args.rate_limit,
+        drop_rate=args.drop_rate, builds_dir=args.builds_dir)
+    server.start()
+
+    try:
+        # Generate the archives before measuring
+        for index in (0, 1):
+            server.build_archive(server.asset_name(index))
+
+        totals = []
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                env = dict(os.environ)
+                env.update(server.environ())
+                env['LOCALAPPDATA'] = os.path.join(temp_dir, 'appdata')
+                env['PYTHONPATH'] = os.pathsep.join(
+                    [ROOT_DIR] + [x for x in [env.get('PYTHONPATH')] if x])
+                if args.offscreen:
+                    env['QT_QPA_PLATFORM'] = 'offscreen'
+                os.makedirs(env['LOCALAPPDATA'])
+
+                game_dir = os.path.join(temp_dir, 'game')
+                if args.scenario == 'update':
+                    run_update(game_dir, 1, args.timeout, env)
+                    # Play a little so there are saves to carry over
+                    shutil.copytree(os.path.join(game_dir, 'data', 'json'),
+                        os.path.join(game_dir, 'save', 'World', 'maps'))
+
+                result = run_update(game_dir, 0, args.timeout, env)
+
+            totals.append(result['total'])
+            print('{scenario}: {total:8.2f}s build {build} - {message}'.format(
+                scenario=args.scenario, total=result['total'],
+                build=result['build'], message=result['message'] if
+                result['completed'] else 'timed out'))
+            for operation in reversed(result['operations']):
+                throughput = operation['throughput']
+                print('    {name:<10} {duration:8.2f}s {size:8.1f}MB '
+                    '{throughput:>10} {success}'.format(
+                    name=operation['name'], duration=operation['duration'],
+                    size=operation['bytes'] / mock_server.MB,
+                    throughput='' if throughput is None else
+                        '{0:.1f}MB/s'.format(throughput / mock_server.MB),
+                    success='' if operation['success'] else 'failed'))
+            for at, message in result['messages']:
+                print('    {at:8.2f}s {message}'.format(at=at,
+                    message=message))
+    finally:
+        server.stop()
+
+    print('total: {total:8.2f}s (median of {repeat})'.format(
+        total=statistics.median(totals), repeat=args.repeat))
+    for (route, status), (count, size) in sorted(server.requests.items()):
+        print('    {route:<48} {status} x{count:<4} {size:8.1f}MB'.format(
+            route=route, status=status, count=count,
+            size=size / mock_server.MB))
+
+
+if __name__ == '__main__':
+    main()
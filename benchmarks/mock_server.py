@@ -0,0 +1,460 @@
+"""Local stand-in for GitHub, Jenkins and the release downloads.
+
+Serves everything the launcher asks for during an update so the whole
+pipeline can be exercised and timed without network access:
+
+* the CDDA releases listing, paginated with Link headers and answering
+  conditional requests with 304 Not Modified like the GitHub API
+* the latest launcher release, matching the running version so no launcher
+  update is offered
+* the Jenkins changelog
+* the build archives, generated once per build with an executable carrying
+  the build version, game data, mods and tilesets
+
+Network conditions can be injected: latency before every response, limited
+download bandwidth, downloads going through a redirect like the GitHub CDN,
+GitHub rate limit headers running out and downloads dropped halfway through.
+
+Start it on its own and point the launcher at it with the environment
+variables read by cddagl.constants:
+
+    python benchmarks/mock_server.py --port 8765 --latency 0.1 --redirect
+    set CDDAGL_GITHUB_API_URL=http://127.0.0.1:8765
+    set CDDAGL_JENKINS_URL=http://127.0.0.1:8765
+
+Recorded responses can be served instead of the synthetic ones with
+--releases and --changelog, see bench_releases.py and bench_changelog.py for
+how to record them. benchmarks/bench_update.py starts this server by itself.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, quote, unquote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..'))
+
+import cddagl.constants as cons
+from cddagl import __version__ as version
+
+import bench_changelog
+import bench_io
+import bench_releases
+
+CDDA_RELEASES_PATH = cons.CDDA_RELEASES
+CDDAGL_LATEST_RELEASE_PATH = cons.CDDAGL_LATEST_RELEASE
+CHANGELOG_PATH = urlsplit(cons.CHANGELOG_API_URL).path
+DOWNLOAD_PATH = '/releases/download/'
+CDN_PATH = '/cdn/'
+
+BUILD_NUMBER_REGEX = re.compile(r'-(?P<build>\d+)\.zip$')
+
+MB = 1024 * 1024
+SEND_BUFFER_SIZE = 64 * 1024
+
+
+def write_build_archive(path, number, size, seed):
+    """Write a build archive shaped like the ones published for Windows with
+    about size bytes of content."""
+    rng = random.Random(seed + number)
+    game_version = '0.E-{number}-g{commit:07x}'.format(number=number,
+        commit=rng.getrandbits(28))
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zfile:
+        exe_size = max(1024, min(size // 4, 30 * MB))
+        exe = bytearray(bench_io.random_bytes(rng, exe_size))
+        version_bytes = game_version.encode('ascii') + b'\x00'
+        offset = rng.randrange(exe_size // 2, exe_size - len(version_bytes))
+        exe[offset:offset + len(version_bytes)] = version_bytes
+        zfile.writestr('cataclysm-tiles.exe', exe)
+        written = exe_size
+
+        for mod in ('dda', 'aftershock', 'magiclysm', 'no_fungal_growth'):
+            zfile.writestr('data/mods/{mod}/modinfo.json'.format(mod=mod),
+                json.dumps([{
+                    'type': 'MOD_INFO',
+                    'ident': mod,
+                    'name': mod.replace('_', ' ').title(),
+                    'authors': ['The CDDA team'],
+                    'description': 'Bundled with build {number}'.format(
+                        number=number),
+                    'category': 'content'
+                }], indent=2))
+
+        index = 0
+        while written < size:
+            # Half of the content is incompressible, like the tilesets and the
+            # fonts
+            if index % 2 == 0:
+                data = bench_io.random_bytes(rng, rng.randrange(64, 1024)
+                    * 1024)
+                name = 'gfx/tileset{tileset}/tiles{index}.png'.format(
+                    tileset=index % 5, index=index)
+            else:
+                data = bench_io.json_bytes(rng, rng.randrange(16, 512) * 1024)
+                name = 'data/json/items/file{index}.json'.format(index=index)
+            zfile.writestr(name, data)
+            written += len(data)
+            index += 1
+
+    return game_version
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super(MockRequestHandler, self).log_message(format, *args)
+
+    def do_GET(self):
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == CDDA_RELEASES_PATH:
+            self.send_releases(query)
+        elif url.path == CDDAGL_LATEST_RELEASE_PATH:
+            self.send_launcher_release()
+        elif url.path == CHANGELOG_PATH:
+            self.send_body(200, self.server.changelog, 'application/xml')
+        elif url.path.startswith(DOWNLOAD_PATH):
+            name = unquote(url.path[len(DOWNLOAD_PATH):])
+            if self.server.redirect:
+                self.send_response(302)
+                self.send_header('Location', CDN_PATH + quote(name))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                self.server.count_request('redirect', 302, 0)
+            else:
+                self.send_build(name)
+        elif url.path.startswith(CDN_PATH):
+            self.send_build(unquote(url.path[len(CDN_PATH):]))
+        else:
+            self.send_body(404, b'Not Found', 'text/plain')
+
+    def send_body(self, status, body, content_type, headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count_request(urlsplit(self.path).path, status, len(body))
+
+    def rate_limit_headers(self):
+        """Return the GitHub rate limit headers for this request or None when
+        the rate limit is exhausted."""
+        remaining = self.server.take_api_request()
+        if remaining is None:
+            return None
+
+        return (
+            (cons.GITHUB_XRL_REMAINING.decode('ascii'), str(remaining)),
+            (cons.GITHUB_XRL_RESET.decode('ascii'),
+                str(self.server.rate_limit_reset)),
+        )
+
+    def send_rate_limited(self):
+        self.send_body(403, json.dumps({
+            'message': 'API rate limit exceeded for 127.0.0.1.',
+            'documentation_url': 'https://developer.github.com/v3/'
+                '#rate-limiting'
+        }).encode('utf8'), 'application/json', (
+            (cons.GITHUB_XRL_REMAINING.decode('ascii'), '0'),
+            (cons.GITHUB_XRL_RESET.decode('ascii'),
+                str(self.server.rate_limit_reset)),
+        ))
+
+    def send_releases(self, query):
+        per_page = int(query.get('per_page', ['30'])[0])
+        page = int(query.get('page', ['1'])[0])
+
+        releases = self.server.releases
+        etag = '"{newest}-{per_page}-{page}"'.format(
+            newest=releases[0]['id'] if len(releases) > 0 else 0,
+            per_page=per_page, page=page)
+
+        # Conditional requests do not count against the rate limit
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            self.server.count_request(CDDA_RELEASES_PATH, 304, 0)
+            return
+
+        headers = self.rate_limit_headers()
+        if headers is None:
+            self.send_rate_limited()
+            return
+
+        headers = list(headers)
+        headers.append(('ETag', etag))
+
+        start = (page - 1) * per_page
+        if start + per_page < len(releases):
+            headers.append(('Link', '<{url}{path}?per_page={per_page}'
+                '&page={page}>; rel="next"'.format(url=self.server.url,
+                path=CDDA_RELEASES_PATH, per_page=per_page, page=page + 1)))
+
+        body = json.dumps(releases[start:start + per_page]).encode('utf8')
+        self.send_body(200, body, 'application/json', headers)
+
+    def send_launcher_release(self):
+        headers = self.rate_limit_headers()
+        if headers is None:
+            self.send_rate_limited()
+            return
+
+        body = json.dumps({
+            'name': 'CDDA Game Launcher ' + version,
+            'html_url': 'https://github.com/remyroy/CDDA-Game-Launcher/'
+                'releases/tag/v' + version,
+            'tag_name': 'v' + version,
+            'assets': [],
+            'body': ''
+        }).encode('utf8')
+        self.send_body(200, body, 'application/json', headers)
+
+    def send_build(self, name):
+        path = self.server.build_archive(name)
+        if path is None:
+            self.send_body(404, b'Not Found', 'text/plain')
+            return
+
+        size = os.path.getsize(path)
+        limit = size
+        if self.server.should_drop():
+            limit = size // 2
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/zip')
+        self.send_header('Content-Disposition',
+            'attachment; filename={name}'.format(name=name))
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+
+        sent = 0
+        with open(path, 'rb') as build_file:
+            while sent < limit:
+                buf = build_file.read(min(SEND_BUFFER_SIZE, limit - sent))
+                if not buf:
+                    break
+                self.wfile.write(buf)
+                sent += len(buf)
+
+                if self.server.bandwidth > 0:
+                    time.sleep(len(buf) / self.server.bandwidth)
+
+        if sent < size:
+            # Drop the connection before the end of the content
+            self.close_connection = True
+            self.wfile.flush()
+            self.connection.shutdown(socket.SHUT_RDWR)
+            self.server.count_request('dropped', 200, sent)
+        else:
+            self.server.count_request('download', 200, sent)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, releases=None, changelog=None,
+        release_count=30, newest_build=11000, build_size=100 * MB,
+        latency=0.0, bandwidth=0, redirect=False, rate_limit=None,
+        drop_rate=0.0, seed=20200501, builds_dir=None, verbose=False):
+        super(MockServer, self).__init__(('127.0.0.1', port),
+            MockRequestHandler)
+
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.redirect = redirect
+        self.drop_rate = drop_rate
+        self.build_size = build_size
+        self.seed = seed
+        self.verbose = verbose
+
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.thread = None
+
+        self.api_remaining = rate_limit
+        self.rate_limit_reset = int(time.time()) + 3600
+
+        self.requests = {}
+
+        self.temp_dir = None
+        if builds_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix=cons.TEMP_PREFIX)
+            builds_dir = self.temp_dir
+        self.builds_dir = builds_dir
+        self.build_locks = {}
+
+        if releases is None:
+            releases = [bench_releases.release(newest_build - x)
+                for x in range(release_count)]
+        for release in releases:
+            for asset in release.get('assets', []):
+                if 'name' in asset:
+                    asset['browser_download_url'] = (self.url + DOWNLOAD_PATH
+                        + quote(asset['name']))
+        self.releases = releases
+
+        if changelog is None:
+            changelog = bench_changelog.synthetic_payload(
+                cons.MAX_CHANGELOG_BUILDS, newest_build)
+        self.changelog = changelog
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://{host}:{port}'.format(host=host, port=port)
+
+    def environ(self):
+        """Return the environment variables pointing the launcher at this
+        server."""
+        return {
+            cons.GITHUB_API_URL_ENV_VAR: self.url,
+            cons.JENKINS_URL_ENV_VAR: self.url
+        }
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        self.thread = thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+    def count_request(self, route, status, size):
+        with self.lock:
+            key = (route, status)
+            count, total = self.requests.get(key, (0, 0))
+            self.requests[key] = (count + 1, total + size)
+
+    def take_api_request(self):
+        with self.lock:
+            if self.api_remaining is None:
+                return 5000
+            if self.api_remaining <= 0:
+                return None
+            self.api_remaining -= 1
+            return self.api_remaining
+
+    def should_drop(self):
+        with self.lock:
+            return self.rng.random() < self.drop_rate
+
+    def build_archive(self, name):
+        """Return the path of a build archive, generating it the first time it
+        is requested. None is returned for unknown builds."""
+        match = BUILD_NUMBER_REGEX.search(name)
+        if match is None or os.path.basename(name) != name:
+            return None
+
+        with self.lock:
+            build_lock = self.build_locks.setdefault(name, threading.Lock())
+
+        path = os.path.join(self.builds_dir, name)
+        with build_lock:
+            if not os.path.isfile(path):
+                temp_path = path + '.part'
+                write_build_archive(temp_path, int(match.group('build')),
+                    self.build_size, self.seed)
+                os.replace(temp_path, path)
+
+        return path
+
+    def asset_name(self, index, platform='Windows_x64', graphics='Tiles'):
+        """Return the build asset name of the release at index."""
+        suffix = '-{platform}-{graphics}-'.format(platform=platform,
+            graphics=graphics)
+        for asset in self.releases[index].get('assets', []):
+            if suffix in asset.get('name', ''):
+                return asset['name']
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--releases', help='recorded releases listing')
+    parser.add_argument('--changelog', help='recorded Jenkins changelog XML')
+    parser.add_argument('--release-count', type=int, default=30,
+        help='synthetic releases served')
+    parser.add_argument('--build-size', type=float, default=100,
+        help='content of the build archives, in MB')
+    parser.add_argument('--builds-dir',
+        help='directory where the build archives are kept between runs')
+    parser.add_argument('--latency', type=float, default=0.0,
+        help='seconds waited before every response')
+    parser.add_argument('--bandwidth', type=float, default=0,
+        help='download bandwidth in MB/s, unlimited by default')
+    parser.add_argument('--redirect', action='store_true',
+        help='send downloads through a redirect')
+    parser.add_argument('--rate-limit', type=int,
+        help='GitHub API requests allowed before answering 403')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+        help='fraction of downloads dropped halfway through')
+    parser.add_argument('--seed', type=int, default=20200501)
+    args = parser.parse_args()
+
+    releases = None
+    if args.releases is not None:
+        with open(args.releases, 'r', encoding='utf8') as releases_file:
+            releases = json.load(releases_file)
+
+    changelog = None
+    if args.changelog is not None:
+        with open(args.changelog, 'rb') as changelog_file:
+            changelog = changelog_file.read()
+
+    if args.builds_dir is not None and not os.path.isdir(args.builds_dir):
+        os.makedirs(args.builds_dir)
+
+    server = MockServer(port=args.port, releases=releases,
+        changelog=changelog, release_count=args.release_count,
+        build_size=int(args.build_size * MB), latency=args.latency,
+        bandwidth=args.bandwidth * MB, redirect=args.redirect,
+        rate_limit=args.rate_limit, drop_rate=args.drop_rate, seed=args.seed,
+        builds_dir=args.builds_dir, verbose=True)
+
+    print('Serving on {url}'.format(url=server.url))
+    for name, value in server.environ().items():
+        print('    {name}={value}'.format(name=name, value=value))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if server.temp_dir is not None:
+            shutil.rmtree(server.temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,13 @@
-import cddagl.launcher
+import sys
 
-cddagl.launcher.run_cddagl()
+import cddagl.constants as cons
+
+if (len(sys.argv) > 1 and
+    sys.argv[1] in cons.CLI_COMMANDS + ('-h', '--help')):
+    from cddagl.cli import run_cli
+
+    sys.exit(run_cli())
+else:
+    import cddagl.launcher
+
+    cddagl.launcher.run_cddagl()
@@ -0,0 +1,514 @@
+"""Streaming extraction of the zip, rar and 7z archives used for mods,
+soundpacks and backups.
+
+Every format is read through the same small interface: a list of members
+and a file-like stream for each of them. Members are written to disk in
+chunks of EXTRACT_CHUNK_SIZE bytes so the memory used does not depend on
+the size of the archive. Nothing in here depends on Qt.
+"""
+
+import lzma
+import os
+import zipfile
+import zlib
+from io import BytesIO
+
+import cddagl.constants as cons
+from cddagl.functions import get_rarfile
+from cddagl.i18n import proxy_gettext as _
+
+WINDOWS_ILLEGAL_NAME_CHARS = ':<>|"?*'
+
+SEVEN_ZIP_COPY = b'\x00'
+SEVEN_ZIP_LZMA_FILTERS = {
+    b'\x03\x01\x01': lzma.FILTER_LZMA1,
+    b'\x21': lzma.FILTER_LZMA2,
+}
+SEVEN_ZIP_FILTERS = {
+    b'\x03': lzma.FILTER_DELTA,
+    b'\x03\x03\x01\x03': lzma.FILTER_X86,
+    b'\x03\x03\x02\x05': lzma.FILTER_POWERPC,
+    b'\x03\x03\x04\x01': lzma.FILTER_IA64,
+    b'\x03\x03\x05\x01': lzma.FILTER_ARM,
+    b'\x03\x03\x07\x01': lzma.FILTER_ARMTHUMB,
+    b'\x03\x03\x08\x05': lzma.FILTER_SPARC,
+}
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class ArchiveMember():
+    def __init__(self, filename, size, is_dir, entry):
+        self.filename = filename
+        self.size = size
+        self.is_dir = is_dir
+        self.entry = entry
+
+
+class ZipArchive():
+    errors = (zipfile.BadZipFile, zlib.error, EOFError)
+
+    def __init__(self, path):
+        try:
+            self.archive = zipfile.ZipFile(path)
+        except zipfile.BadZipFile:
+            raise ArchiveError(_('Selected file is a bad archive file'))
+
+    def members(self):
+        return [ArchiveMember(info.filename, info.file_size, info.is_dir(),
+            info) for info in self.archive.infolist()]
+
+    def open(self, member):
+        try:
+            return self.archive.open(member.entry)
+        except RuntimeError:
+            # Encrypted member
+            raise ArchiveError(_('Selected file is a password protected '
+                'archive file'))
+
+    def close(self):
+        self.archive.close()
+
+
+class RarArchive():
+    def __init__(self, path):
+        rarfile = get_rarfile()
+        self.rarfile = rarfile
+        self.errors = (rarfile.Error, )
+        try:
+            self.archive = rarfile.RarFile(path)
+        except rarfile.PasswordRequired:
+            raise ArchiveError(_('Selected file is a password protected '
+                'archive file'))
+        except rarfile.Error:
+            raise ArchiveError(_('Selected file is a bad archive file'))
+
+    def members(self):
+        return [ArchiveMember(info.filename, info.file_size, info.isdir(),
+            info) for info in self.archive.infolist()]
+
+    def open(self, member):
+        try:
+            return self.archive.open(member.entry)
+        except self.rarfile.PasswordRequired:
+            raise ArchiveError(_('Selected file is a password protected '
+                'archive file'))
+
+    def close(self):
+        self.archive.close()
+
+
+class SevenZipFolderStream():
+    """Decompressed data of a 7z folder, decoded as it is read.
+
+    py7zlib only gives the data of a member at once and keeps everything
+    decoded before it in solid archives. Folders made of LZMA or LZMA2,
+    optionally behind delta or branch filters, or stored as is are decoded
+    here with the lzma module instead.
+    """
+
+    def __init__(self, archive_file, folder, src_start):
+        filters, size = seven_zip_filters(folder)
+        if len(filters) == 0:
+            self.decompressor = None
+        else:
+            self.decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW,
+                filters=filters)
+
+        self.archive_file = archive_file
+        self.folder = folder
+        self.src_pos = src_start
+        self.remaining = size
+        self.position = 0
+
+    def read_input(self, size):
+        self.archive_file.seek(self.src_pos)
+        data = self.archive_file.read(size)
+        self.src_pos += len(data)
+        return data
+
+    def read(self, size):
+        size = min(size, self.remaining)
+        if size <= 0:
+            return b''
+
+        if self.decompressor is None:
+            data = self.read_input(size)
+        else:
+            data = b''
+            while len(data) == 0 and not self.decompressor.eof:
+                if self.decompressor.needs_input:
+                    compressed = self.read_input(cons.EXTRACT_CHUNK_SIZE)
+                    if len(compressed) == 0:
+                        break
+                else:
+                    compressed = b''
+                try:
+                    data = self.decompressor.decompress(compressed, size)
+                except lzma.LZMAError:
+                    raise ArchiveError(_('Downloaded archive is invalid'))
+
+        if len(data) == 0:
+            raise ArchiveError(_('Downloaded archive is invalid'))
+
+        self.remaining -= len(data)
+        self.position += len(data)
+        return data
+
+    def skip(self, size):
+        while size > 0:
+            size -= len(self.read(min(size, cons.EXTRACT_CHUNK_SIZE)))
+
+
+class SevenZipMemberStream():
+    """Data of a member, read from the stream of its folder and checked
+    against its CRC once everything was read."""
+
+    def __init__(self, folder_stream, member):
+        self.folder_stream = folder_stream
+        self.remaining = member.size
+        self.digest = getattr(member, 'digest', None)
+        self.crc = 0
+
+    def read(self, size=-1):
+        if size < 0:
+            size = self.remaining
+        size = min(size, self.remaining)
+        if size <= 0:
+            return b''
+
+        data = self.folder_stream.read(size)
+        self.remaining -= len(data)
+        self.crc = zlib.crc32(data, self.crc)
+
+        if (self.remaining == 0 and self.digest is not None
+            and self.crc != self.digest & 0xffffffff):
+            raise ArchiveError(_('Downloaded archive is invalid'))
+
+        return data
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SevenZipArchive():
+    def __init__(self, path):
+        from py7zlib import (
+            Archive7z, ArchiveError as Archive7zError, NoPasswordGivenError,
+            FormatError
+        )
+
+        self.archive_file = open(path, 'rb')
+        try:
+            self.archive = Archive7z(self.archive_file)
+        except FormatError:
+            self.archive_file.close()
+            raise ArchiveError(_('Selected file is a bad archive file'))
+        except NoPasswordGivenError:
+            self.archive_file.close()
+            raise ArchiveError(_('Selected file is a password protected '
+                'archive file'))
+
+        self.errors = (Archive7zError, )
+        self.folder_stream = None
+
+    def members(self):
+        # py7zlib leaves out the directory entries
+        return [ArchiveMember(member.filename, member.size, False, member)
+            for member in self.archive.getmembers()]
+
+    def open(self, member):
+        archive_member = member.entry
+        folder = archive_member._folder
+
+        if folder is None or archive_member.size == 0:
+            return SevenZipMemberStream(None, archive_member)
+
+        if folder.isEncrypted():
+            raise ArchiveError(_('Selected file is a password protected '
+                'archive file'))
+
+        if seven_zip_filters(folder) is None:
+            # Other coders are left to py7zlib which decodes in memory
+            return BytesIO(archive_member.read())
+
+        # The members of a folder are usually read in order so the stream
+        # of the previous one can keep going
+        folder_stream = self.folder_stream
+        if (folder_stream is None or folder_stream.folder is not folder
+            or folder_stream.position > archive_member._start):
+            folder_stream = SevenZipFolderStream(self.archive_file, folder,
+                archive_member._src_start)
+            self.folder_stream = folder_stream
+
+        folder_stream.skip(archive_member._start - folder_stream.position)
+
+        return SevenZipMemberStream(folder_stream, archive_member)
+
+    def close(self):
+        self.folder_stream = None
+        self.archive_file.close()
+
+
+def lzma_properties_filter(filter_id, properties):
+    """Return the lzma filter for the LZMA1 or LZMA2 properties of a 7z
+    coder, or None when they are not valid."""
+    if filter_id == lzma.FILTER_LZMA1:
+        # lc, lp and pb packed in one byte followed by the dictionary size
+        if len(properties) != 5 or properties[0] >= 9 * 5 * 5:
+            return None
+        pb, remainder = divmod(properties[0], 9 * 5)
+        lp, lc = divmod(remainder, 9)
+        if lc + lp > 4:
+            return None
+        return {
+            'id': filter_id,
+            'dict_size': int.from_bytes(properties[1:], 'little'),
+            'lc': lc,
+            'lp': lp,
+            'pb': pb
+        }
+
+    # The dictionary size is 2 or 3 shifted left by the property
+    if len(properties) != 1 or properties[0] > 40:
+        return None
+    if properties[0] == 40:
+        dict_size = 0xFFFFFFFF
+    else:
+        dict_size = (2 | (properties[0] & 1)) << (properties[0] // 2 + 11)
+    return {
+        'id': filter_id,
+        'dict_size': dict_size
+    }
+
+
+def seven_zip_filters(folder):
+    """Return the lzma filter chain decoding a 7z folder with its unpacked
+    size, or None when the lzma module cannot decode it."""
+    coders = folder.coders
+    if (len(folder.packed_indexes) != 1
+        or any(coder['numinstreams'] != 1 or coder['numoutstreams'] != 1
+            for coder in coders)):
+        return None
+
+    # Decoding starts from the coder reading the packed stream then goes
+    # through the coders bound to the output of the previous one
+    bound_inputs = dict((out_index, in_index)
+        for in_index, out_index in folder.bindpairs)
+    chain = [folder.packed_indexes[0]]
+    while chain[-1] in bound_inputs and len(chain) <= len(coders):
+        chain.append(bound_inputs[chain[-1]])
+    if len(chain) != len(coders):
+        return None
+
+    size = folder.unpacksizes[chain[-1]]
+    methods = [coders[index]['method'] for index in chain]
+
+    if methods == [SEVEN_ZIP_COPY]:
+        return [], size
+
+    if (methods[0] not in SEVEN_ZIP_LZMA_FILTERS
+        or any(method not in SEVEN_ZIP_FILTERS for method in methods[1:])):
+        return None
+
+    # The lzma module takes the filters in the order they are applied when
+    # compressing
+    filters = []
+    for index in reversed(chain):
+        method = coders[index]['method']
+        properties = coders[index].get('properties', None) or b''
+
+        if method in SEVEN_ZIP_LZMA_FILTERS:
+            lzma_filter = lzma_properties_filter(
+                SEVEN_ZIP_LZMA_FILTERS[method], properties)
+            if lzma_filter is None:
+                return None
+            filters.append(lzma_filter)
+        elif method == b'\x03':
+            if len(properties) != 1:
+                return None
+            filters.append({
+                'id': lzma.FILTER_DELTA,
+                'dist': properties[0] + 1
+            })
+        else:
+            filters.append({
+                'id': SEVEN_ZIP_FILTERS[method],
+                'start_offset': int.from_bytes(properties, 'little')
+            })
+
+    return filters, size
+
+
+ARCHIVE_CLASSES = (
+    ('.zip', ZipArchive),
+    ('.rar', RarArchive),
+    ('.7z', SevenZipArchive),
+)
+
+
+def open_archive(path):
+    """Return the reader for the archive in path based on its extension."""
+    for extension, archive_class in ARCHIVE_CLASSES:
+        if path.lower().endswith(extension):
+            return archive_class(path)
+
+    extension = os.path.splitext(path)[1]
+    raise ArchiveError(_('Unknown downloaded archive format ({extension})'
+        ).format(extension=extension))
+
+
+def member_parts(filename):
+    """Return the path parts of a member, without the ones which would lead
+    out of the extraction directory, like zipfile does."""
+    filename = filename.replace('\\', '/')
+    filename = os.path.splitdrive(filename)[1]
+    parts = [part for part in filename.split('/')
+        if part not in ('', os.curdir, os.pardir)]
+
+    if os.sep == '\\':
+        table = str.maketrans(WINDOWS_ILLEGAL_NAME_CHARS,
+            '_' * len(WINDOWS_ILLEGAL_NAME_CHARS))
+        parts = [part.translate(table).rstrip('.') or '_' for part in parts]
+
+    return tuple(parts)
+
+
+def find_member_roots(members, file_name):
+    """Return the directories, as tuples of path parts, holding a member
+    named file_name. Nothing is searched inside the directories found and
+    the shallowest come first."""
+    candidates = set()
+    for member in members:
+        if member.is_dir:
+            continue
+        parts = member_parts(member.filename)
+        if len(parts) > 0 and parts[-1].lower() == file_name:
+            candidates.add(parts[:-1])
+
+    roots = []
+    for root in sorted(candidates, key=lambda x: (len(x), x)):
+        if not any(root[:len(found)] == found for found in roots):
+            roots.append(root)
+
+    return roots
+
+
+def subtree_members(members, root, name):
+    """Return the members under the root directory, renamed to be under a
+    directory called name instead."""
+    renamed = []
+    for member in members:
+        parts = member_parts(member.filename)
+        if len(parts) > len(root) and parts[:len(root)] == root:
+            renamed.append(ArchiveMember('/'.join((name, ) +
+                parts[len(root):]), member.size, member.is_dir,
+                member.entry))
+
+    return renamed
+
+
+def extract_archive(path, extract_dir, progress=None, interrupted=None):
+    """Extract the archive in path into extract_dir. See extract_members."""
+    archive = open_archive(path)
+    try:
+        return extract_members(archive, archive.members(), extract_dir,
+            progress, interrupted)
+    finally:
+        archive.close()
+
+
+def extract_members(archive, members, extract_dir, progress=None,
+    interrupted=None):
+    """Extract some members of an opened archive into extract_dir.
+
+    progress is called with the number of bytes written and the total size
+    of the members after each chunk. Extraction stops when interrupted
+    returns True, in which case False is returned. Raises ArchiveError when
+    the archive cannot be read.
+    """
+    total_bytes = sum(member.size for member in members)
+    written_bytes = 0
+
+    try:
+        for member in members:
+            if interrupted is not None and interrupted():
+                return False
+
+            parts = member_parts(member.filename)
+            if len(parts) == 0:
+                continue
+            destination = os.path.join(extract_dir, *parts)
+
+            if member.is_dir:
+                if not os.path.isdir(destination):
+                    os.makedirs(destination)
+                continue
+
+            dest_dir = os.path.dirname(destination)
+            if not os.path.isdir(dest_dir):
+                os.makedirs(dest_dir)
+
+            with archive.open(member) as source, open(destination,
+                'wb') as dest_file:
+                while True:
+                    if interrupted is not None and interrupted():
+                        return False
+
+                    data = source.read(cons.EXTRACT_CHUNK_SIZE)
+                    if not data:
+                        break
+                    dest_file.write(data)
+
+                    written_bytes += len(data)
+                    if progress is not None:
+                        progress(written_bytes, total_bytes)
+    except archive.errors:
+        raise ArchiveError(_('Downloaded archive is invalid'))
+
+    return True
+
+
+def extract_dirs(path, extract_dir, plan_function, target_dirs,
+    target_sizes=None, progress=None, interrupted=None):
+    """Extract the directories of the archive in path picked by
+    plan_function straight into extract_dir.
+
+    plan_function is called with the archive members, extract_dir and path.
+    It returns the (root, name) pairs of the directories to extract with the
+    name they get in extract_dir. The directories are added to target_dirs
+    as they are created so they can be removed if the extraction does not
+    complete. The size of their files, as listed in the archive, is put in
+    target_sizes. See extract_members for the rest.
+    """
+    archive = open_archive(path)
+    try:
+        members = archive.members()
+        dirs = plan_function(members, extract_dir, path)
+
+        extracted_members = []
+        for root, name in dirs:
+            # Creating the directory first keeps the other installations from
+            # using it
+            target_dir = os.path.join(extract_dir, name)
+            os.mkdir(target_dir)
+            target_dirs.append(target_dir)
+
+            target_members = subtree_members(members, root, name)
+            if target_sizes is not None:
+                target_sizes[target_dir] = sum(member.size
+                    for member in target_members if not member.is_dir)
+            extracted_members.extend(target_members)
+
+        return extract_members(archive, extracted_members, extract_dir,
+            progress, interrupted)
+    finally:
+        archive.close()
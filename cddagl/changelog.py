@@ -0,0 +1,142 @@
+import html
+import re
+import xml.etree.ElementTree
+
+from datetime import datetime, timezone
+from io import StringIO
+
+from babel.dates import format_datetime
+
+import cddagl.constants as cons
+from cddagl.functions import unique
+from cddagl.i18n import proxy_gettext as _
+
+PLATFORM_REGEX = re.compile(r'\b'
+                            r'(?P<ui>Curses|Tiles),'
+                            r'(?P<plat>Linux_x64|Windows(?:_x64)?)'
+                            r'\b')
+
+### "((?<![\w#])(?=[\w#])|(?<=[\w#])(?![\w#]))" is like a \b
+### that accepts "#" as word char too.
+### regex used to match issues / PR IDs like "#43151"
+ID_REGEX = re.compile(r'((?<![\w#])(?=[\w#])|(?<=[\w#])(?![\w#]))'
+                      r'#(?P<id>\d+)\b')
+
+
+def platform_display_name(ui, plat):
+    if (ui, plat) == ('Tiles', 'Windows'): return _('Windows x86')
+    if (ui, plat) == ('Tiles', 'Windows_x64'): return _('Windows x64')
+    if (ui, plat) == ('Curses', 'Linux_x64'): return _('All Platforms')
+    return None
+
+
+def results_by_platform(build_data):
+    results = []
+    for run in build_data.iter('run'):
+        result = run.find('result')
+        display_name = run.find('fullDisplayName')
+        if result is None or display_name is None:
+            continue
+
+        match = PLATFORM_REGEX.search(display_name.text or '')
+        if match is None:
+            continue
+
+        platform = platform_display_name(match.group('ui'),
+            match.group('plat'))
+        if platform is not None:
+            results.append({'result': result.text, 'platform': platform})
+
+    return results
+
+
+def render_build(build_data, app_locale):
+    """Render a Jenkins build element into a changelog HTML fragment."""
+    changelog_html = StringIO()
+
+    build_by_platform = results_by_platform(build_data)
+    if build_data.findtext('building') == 'true':
+        build_status = 'IN_PROGRESS'
+    elif any(x['result'] == 'FAILURE' for x in build_by_platform):
+        build_status = 'FAILURE'
+    else:
+        ### possible "result" values: 'SUCCESS' or 'FAILURE'
+        build_status = 'SUCCESS'
+
+    build_timestamp = int(build_data.findtext('timestamp')) // 1000
+    build_date_utc = datetime.utcfromtimestamp(build_timestamp)
+    build_date_utc = build_date_utc.replace(tzinfo=timezone.utc)
+    build_date_local = build_date_utc.astimezone(tz=None)
+    build_date_text = format_datetime(build_date_local,
+        format='long', locale=app_locale)
+
+    build_changes = build_data.findall(r'.//changeSet/item/msg')
+    build_changes = map(lambda x: html.escape((x.text or '').strip(), True),
+                        build_changes)
+    build_changes = list(unique(build_changes))
+    build_number = int(build_data.findtext('number'))
+    build_desc = _('Build #{build_number}').format(build_number=build_number)
+    build_link = f'<a href="{cons.BUILD_CHANGES_URL(build_number)}">{build_desc}</a>'
+
+    if build_status == 'IN_PROGRESS':
+        changelog_html.write(
+            '<h4>{0} - {1} <span style="color:purple">{2}</span></h4>'
+            .format(
+                build_link,
+                build_date_text,
+                _('build still in progress!')
+            )
+        )
+    elif build_status == 'SUCCESS':
+        changelog_html.write(
+            '<h4>{0} - {1}</h4>'
+            .format(build_link, build_date_text)
+        )
+    else:   ### build_status == 'FAILURE'
+        changelog_html.write(
+            '<h4>{0} - {1} <span style="color:red">{2} {3}</span></h4>'
+            .format(
+                build_link,
+                build_date_text,
+                _('but build failed for:'),
+                ', '.join(x['platform'] for x in build_by_platform
+                          if x['result'] == 'FAILURE')
+            )
+        )
+
+    changelog_html.write('<ul>')
+    if len(build_changes) < 1:
+        changelog_html.write(
+            '<li><span style="color:green">{0}</span></li>'
+            .format(_('No changes, same code as previous build!')))
+    else:
+        link_repl = rf'<a href="{cons.CDDA_ISSUE_URL_ROOT}\g<id>">#\g<id></a>'
+        for change in build_changes:
+            change = ID_REGEX.sub(link_repl, change)
+            changelog_html.write(f'<li>{change}</li>')
+    changelog_html.write('</ul>')
+
+    return {
+        'number': build_number,
+        'status': build_status,
+        'html': changelog_html.getvalue()
+    }
+
+
+def iter_changelog_builds(source, app_locale):
+    """Yield the rendered builds of a Jenkins changelog as they are parsed.
+
+    source is a file object with the XML returned by the Jenkins API.
+    xml.etree.ElementTree.ParseError is raised once malformed data is reached.
+    """
+    depth = 0
+    for event, element in xml.etree.ElementTree.iterparse(source,
+        events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 1 and element.tag == 'build':
+            yield render_build(element, app_locale)
+            element.clear()
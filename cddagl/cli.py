@@ -0,0 +1,759 @@
+"""Command line interface of the launcher.
+
+Update the game, backup and restore saves and manage mods without the user
+interface, for example from a script provisioning many game directories:
+
+    python -m cddagl update --dir C:\\Games\\CDDA --build latest
+    python -m cddagl backup --dir C:\\Games\\CDDA --name nightly
+    python -m cddagl restore --dir C:\\Games\\CDDA nightly
+    python -m cddagl mods list --dir C:\\Games\\CDDA
+    python -m cddagl mods install --dir C:\\Games\\CDDA "Mod name"
+    python -m cddagl version --dir C:\\Games\\CDDA
+
+The commands follow the same steps as the user interface and share its
+configuration. Their progress is printed on the standard output as JSON
+objects, one per line, each with an event key. Failures are reported with an
+error event and a non-zero exit code.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from os import scandir
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit, unquote
+from urllib.request import Request, urlopen
+
+import cddagl.archives as archives
+import cddagl.constants as cons
+from cddagl import __version__ as version
+from cddagl.constants import get_cddagl_path, get_data_path
+from cddagl.fileops import (fingerprint_exe, find_game_exe, custom_content,
+    copy_custom_content, backup_file_name, new_mod_dirs, scan_mod_dir,
+    InstallError, SavesArchive, copy_tree, saves_backup_dir,
+    restored_backup_path, temp_save_path, previous_version_entries,
+    previous_version_dirs, previous_version_skips)
+from cddagl.functions import (delete_path, move_path, parse_link_header,
+    tryint, safe_filename)
+from cddagl.i18n import load_gettext_no_locale, proxy_gettext as _
+from cddagl.releases import ReleaseStreamParser, catalog_builds, releases_url
+from cddagl.sql.functions import (init_config, get_config_value, config_true,
+    new_version, new_build, get_build_from_sha256, get_http_cache,
+    set_http_cache, save_remote_builds, get_remote_builds,
+    get_remote_builds_backfill_page, set_remote_builds_backfill_page)
+
+logger = logging.getLogger('cddagl')
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+
+GRAPHICS = {
+    'tiles': 'Tiles',
+    'console': 'Console'
+}
+
+
+class CommandError(Exception):
+    pass
+
+
+class ProgressPrinter():
+    """Print the events of a command as JSON lines. Progress events are only
+    printed when the percentage changes to keep the output small."""
+
+    def __init__(self, stream=None):
+        if stream is None:
+            stream = sys.stdout
+        self.stream = stream
+        self.last_percents = {}
+
+    def event(self, event, **values):
+        values = dict(event=event, **values)
+        self.stream.write(json.dumps(values, default=str) + '\n')
+        self.stream.flush()
+
+    def progress(self, step, done, total):
+        if total:
+            percent = done * 100 // total
+            if self.last_percents.get(step) == percent:
+                return
+            self.last_percents[step] = percent
+
+        self.event('progress', step=step, done=done, total=total)
+
+
+def http_request(url, user_agent=None, headers=()):
+    if user_agent is None:
+        user_agent = b'CDDA-Game-Launcher/' + version.encode('utf8')
+
+    request = Request(url)
+    request.add_header('User-Agent', user_agent.decode('utf8'))
+    for name, value in headers:
+        request.add_header(name, value)
+
+    return request
+
+
+def download_file(url, download_dir, output, user_agent=None):
+    """Download url in download_dir and return the path of the file."""
+    output.event('step', step='download', url=url)
+
+    try:
+        response = urlopen(http_request(url, user_agent))
+    except (HTTPError, URLError) as e:
+        raise CommandError(_('Could not download {url}: {error}').format(
+            url=url, error=e))
+
+    with response:
+        file_name = response.headers.get_filename()
+        if file_name is None:
+            file_name = unquote(os.path.basename(urlsplit(
+                response.geturl()).path))
+        downloaded_file = os.path.join(download_dir, os.path.basename(
+            file_name))
+
+        total = tryint(response.headers.get('Content-Length'))
+        if not isinstance(total, int):
+            total = None
+
+        bytes_read = 0
+        with open(downloaded_file, 'wb') as f:
+            while True:
+                buf = response.read(cons.READ_BUFFER_SIZE)
+                if not buf:
+                    break
+                f.write(buf)
+                bytes_read += len(buf)
+                output.progress('download', bytes_read, total)
+
+    if total is not None and bytes_read < total:
+        raise CommandError(_('Could not download {url}: {error}').format(
+            url=url, error=_('connection closed after {size} bytes').format(
+                size=bytes_read)))
+
+    return downloaded_file
+
+
+def extract_archive(archive_path, extract_dir, output):
+    """Extract a zip, rar or 7z archive like the tabs do."""
+    output.event('step', step='extract', path=archive_path)
+
+    try:
+        archives.extract_archive(archive_path, extract_dir,
+            lambda done, total: output.progress('extract', done, total))
+    except archives.ArchiveError as e:
+        raise CommandError(str(e))
+
+
+def fetch_remote_builds(output):
+    """Add the releases published since the last time to the remote build
+    catalog, the same way the Update/Installation group box does."""
+    remote_builds = get_remote_builds()
+    if len(remote_builds) > 0:
+        request_url = releases_url(cons.CDDA_RELEASES_PER_PAGE)
+        backfill_page = None
+    else:
+        # Backfill the catalog from the newest releases
+        set_remote_builds_backfill_page(0, False)
+        request_url = releases_url(cons.CDDA_RELEASES_BACKFILL_PER_PAGE, 1)
+        backfill_page = 1
+    # Backfill requests are not made again once they succeed, so they are
+    # not worth caching
+    use_cache = len(remote_builds) > 0
+
+    url = request_url
+    page = 1
+    backfill_first_page = backfill_page
+    cache_entry = None
+    while url is not None:
+        output.event('step', step='fetch', url=url)
+
+        headers = [('Accept', cons.GITHUB_API_VERSION.decode('utf8'))]
+        if page == 1 and use_cache:
+            cached_response = get_http_cache(request_url)
+            if cached_response is not None:
+                if cached_response['etag'] is not None:
+                    headers.append(('If-None-Match',
+                        cached_response['etag']))
+                if cached_response['last_modified'] is not None:
+                    headers.append(('If-Modified-Since',
+                        cached_response['last_modified']))
+
+        next_url = None
+        try:
+            response = urlopen(http_request(url, headers=headers))
+        except HTTPError as e:
+            if e.code != 304:
+                if page == 1:
+                    raise CommandError(_('Could not find remote builds when '
+                        'requesting {url}. Error: {error}').format(url=url,
+                        error=e))
+                logger.warning('Could not fetch older releases when '
+                    f'requesting {url}. Error: [HTTP {e.code}]')
+                cache_entry = None
+                break
+        except URLError as e:
+            raise CommandError(_('Could not find remote builds when '
+                'requesting {url}. Error: {error}').format(url=url, error=e))
+        else:
+            with response:
+                parser = ReleaseStreamParser()
+                while True:
+                    chunk = response.read(cons.READ_BUFFER_SIZE)
+                    if not chunk:
+                        break
+                    parser.feed(chunk)
+
+                known_builds = save_remote_builds(parser.close())
+
+                if page == 1 and use_cache and parser.valid:
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+                    if etag is not None or last_modified is not None:
+                        cache_entry = (etag, last_modified)
+
+                requests_remaining = tryint(response.headers.get(
+                    cons.GITHUB_XRL_REMAINING.decode('ascii')))
+                if (isinstance(requests_remaining, int)
+                    and requests_remaining <= 10):
+                    output.event('warning', message=_('You have {remaining} '
+                        'request(s) remaining for accessing GitHub API.'
+                        ).format(remaining=requests_remaining))
+
+                next_url = parse_link_header(response.headers.get('Link',
+                    '')).get('next')
+
+            if backfill_page is not None:
+                # Remember how far the backfill went so it goes on from
+                # there if it is interrupted
+                if parser.valid:
+                    set_remote_builds_backfill_page(backfill_page,
+                        next_url is None)
+                if (parser.valid
+                    and next_url is not None
+                    and backfill_page - backfill_first_page + 1
+                        < cons.CDDA_RELEASES_MAX_PAGES):
+                    backfill_page += 1
+                else:
+                    next_url = None
+            elif (len(known_builds) > 0
+                or page >= cons.CDDA_RELEASES_MAX_PAGES):
+                # Keep walking through newer releases until we reach builds
+                # which are already in the catalog
+                next_url = None
+
+        if next_url is None and backfill_page is None:
+            # Then go on with the older releases where the last backfill
+            # stopped
+            backfill_page = get_remote_builds_backfill_page()
+            if backfill_page is not None:
+                backfill_first_page = backfill_page
+                next_url = releases_url(cons.CDDA_RELEASES_BACKFILL_PER_PAGE,
+                    backfill_page)
+
+        page += 1
+        url = next_url
+
+    if cache_entry is not None:
+        etag, last_modified = cache_entry
+        set_http_cache(request_url, etag, last_modified)
+
+
+def available_builds(branch, platform, graphics, output):
+    if branch == cons.CONFIG_BRANCH_STABLE:
+        import arrow
+
+        builds = []
+        for stable_version in cons.STABLE_ASSETS:
+            version_details = cons.STABLE_ASSETS[stable_version]
+            builds.append({
+                'url': version_details['Tiles'][platform],
+                'name': version_details['name'],
+                'number': version_details['number'],
+                'date': arrow.get(version_details['released_on']).datetime
+            })
+    else:
+        fetch_remote_builds(output)
+
+        base_asset = cons.BASE_ASSETS[GRAPHICS[graphics]][platform]
+        builds = catalog_builds(get_remote_builds(), base_asset['Platform'],
+            base_asset['Graphics'])
+
+    builds.sort(key=lambda x: (tryint(x['number']), x['date']), reverse=True)
+    return builds
+
+
+def select_build(builds, wanted):
+    for build in builds:
+        if wanted == 'latest' or build['number'] == wanted:
+            if build['url'] is not None:
+                return build
+            if wanted != 'latest':
+                break
+
+    raise CommandError(_('Build {build} is not available').format(
+        build=wanted))
+
+
+def game_info(game_dir):
+    """Return the version details of the game installed in game_dir or None
+    when it is not installed there."""
+    exe_path, version_type = find_game_exe(game_dir)
+    if exe_path is None:
+        return None
+
+    fingerprint = fingerprint_exe(exe_path)
+    sha256 = fingerprint.hexdigest()
+    game_version = fingerprint.version
+
+    stable_version = cons.STABLE_SHA256.get(sha256, None)
+    is_stable = stable_version is not None
+    if is_stable:
+        game_version = stable_version
+
+    if game_version == '':
+        game_version = _('Unknown')
+
+    new_version(game_version, sha256, is_stable)
+    build = get_build_from_sha256(sha256)
+
+    return {
+        'exe': exe_path,
+        'type': version_type,
+        'version': game_version,
+        'sha256': sha256,
+        'stable': is_stable,
+        'build': build['build'] if build is not None else None,
+        'released_on': build['released_on'] if build is not None else None
+    }
+
+
+def backup_current_game(game_dir, output):
+    """Move the current game in the previous_version directory."""
+    backup_dir = os.path.join(game_dir, 'previous_version')
+
+    if os.path.isdir(backup_dir):
+        output.event('step', step='delete', path=backup_dir)
+        if not delete_path(backup_dir):
+            raise CommandError(_('Update cancelled - Could not delete '
+                'the {name}.').format(name=_('previous_version directory')))
+
+    dir_list = previous_version_entries(game_dir, config_true(
+        get_config_value('prevent_save_move', 'False')))
+
+    if len(dir_list) == 0:
+        return
+
+    output.event('step', step='backup_game', path=backup_dir)
+    os.makedirs(backup_dir)
+
+    for index, backup_element in enumerate(dir_list):
+        srcpath = os.path.join(game_dir, backup_element)
+        if not move_path(srcpath, backup_dir):
+            raise CommandError(_('Could not move {srcpath} in {dstpath} .'
+                ).format(srcpath=srcpath, dstpath=backup_dir))
+        output.progress('backup_game', index + 1, len(dir_list))
+
+
+def restore_previous_version(game_dir, output):
+    """Copy the saves, the configuration and the custom assets from the
+    previous_version directory, like the post-extraction steps of the
+    Update/Installation group box."""
+    previous_version_dir = os.path.join(game_dir, 'previous_version')
+    if not os.path.isdir(previous_version_dir):
+        return
+
+    skips = previous_version_skips(game_dir)
+    for next_dir, src_path, dst_path in previous_version_dirs(game_dir,
+        config_true(get_config_value('prevent_save_move', 'False'))):
+        output.event('step', step='restore', name=next_dir)
+        copy_tree(src_path, dst_path, skips)
+
+    def copying(kind, name):
+        if name is None:
+            output.event('step', step='restore', name=kind)
+        else:
+            output.event('step', step='restore', name=kind, item=name)
+
+    copy_custom_content(custom_content(game_dir, previous_version_dir),
+        copying, lambda done, total: output.progress('restore', done, total))
+
+
+def update_command(args, output):
+    game_dir = os.path.abspath(args.dir)
+    if os.path.isfile(game_dir):
+        raise CommandError(_('Cannot install game on a file'))
+
+    current = None
+    if os.path.isdir(game_dir):
+        current = game_info(game_dir)
+
+    builds = available_builds(args.branch, args.platform, args.graphics,
+        output)
+    build = select_build(builds, args.build)
+
+    if (current is not None and current['build'] == build['number']
+        and not args.force):
+        output.event('up_to_date', build=build['number'],
+            version=current['version'])
+        return
+
+    if current is None and os.path.isdir(game_dir) and len(
+        os.listdir(game_dir)) > 0:
+        raise CommandError(_('You cannot install the game in a directory '
+            'that is not empty.'))
+
+    if not os.path.exists(game_dir):
+        os.makedirs(game_dir)
+
+    download_dir = tempfile.mkdtemp(prefix=cons.TEMP_PREFIX)
+    try:
+        downloaded_file = download_file(build['url'], download_dir, output)
+
+        output.event('step', step='test', path=downloaded_file)
+        try:
+            with zipfile.ZipFile(downloaded_file) as z:
+                if z.testzip() is not None:
+                    raise CommandError(_('Downloaded archive is invalid'))
+        except zipfile.BadZipFile:
+            raise CommandError(_('Could not download game'))
+
+        backup_current_game(game_dir, output)
+        extract_archive(downloaded_file, game_dir, output)
+
+        # Keep a copy of the archive if selected in the settings
+        if config_true(get_config_value('keep_archive_copy', 'False')):
+            archive_dir = get_config_value('archive_directory', '')
+            archive_name = os.path.basename(downloaded_file)
+            move_target = os.path.join(archive_dir, archive_name)
+            if (os.path.isdir(archive_dir)
+                and not os.path.exists(move_target)):
+                shutil.move(downloaded_file, archive_dir)
+    finally:
+        delete_path(download_dir)
+
+    exe_path, version_type = find_game_exe(game_dir)
+    if exe_path is None:
+        raise CommandError(_('No executable found in the downloaded '
+            'archive. You might want to restore your previous version.'))
+
+    output.event('step', step='analyse', path=exe_path)
+    fingerprint = fingerprint_exe(exe_path)
+    sha256 = fingerprint.hexdigest()
+    game_version = fingerprint.version
+
+    stable_version = cons.STABLE_SHA256.get(sha256, None)
+    is_stable = stable_version is not None
+    if is_stable:
+        game_version = stable_version
+
+    if game_version == '':
+        game_version = _('Unknown')
+
+    new_build(game_version, sha256, is_stable, build['number'],
+        build['date'])
+
+    restore_previous_version(game_dir, output)
+
+    if config_true(get_config_value('remove_previous_version', 'False')):
+        output.event('step', step='delete', path=os.path.join(game_dir,
+            'previous_version'))
+        delete_path(os.path.join(game_dir, 'previous_version'))
+
+    output.event('updated' if current is not None else 'installed',
+        build=build['number'], version=game_version, dir=game_dir)
+
+
+def compress_saves(game_dir, backup_path, output):
+    """Compress the save directory of game_dir in backup_path, one file after
+    another like the Backups tab."""
+    output.event('step', step='backup', path=backup_path)
+
+    return SavesArchive(game_dir, backup_path).scan().write(
+        lambda done, total: output.progress('backup', done, total))
+
+
+def backup_command(args, output):
+    game_dir = os.path.abspath(args.dir)
+    if not os.path.isdir(os.path.join(game_dir, 'save')):
+        raise CommandError(_('Save directory not found'))
+
+    name = safe_filename(args.name)
+    if name == '':
+        name = _('manual_backup')
+
+    backup_dir = saves_backup_dir(game_dir)
+    backup_path = os.path.join(backup_dir, backup_file_name(backup_dir, name))
+
+    size = compress_saves(game_dir, backup_path, output)
+
+    output.event('backed_up', path=backup_path, size=size,
+        compressed_size=os.path.getsize(backup_path))
+
+
+def restore_command(args, output):
+    game_dir = os.path.abspath(args.dir)
+    backup_dir = os.path.join(game_dir, 'save_backups')
+
+    backup_path = args.backup
+    if not os.path.isfile(backup_path):
+        backup_name = backup_path
+        if not backup_name.lower().endswith('.zip'):
+            backup_name = backup_name + '.zip'
+        backup_path = os.path.join(backup_dir, backup_name)
+    if not os.path.isfile(backup_path):
+        raise CommandError(_('Backup {name} not found').format(
+            name=args.backup))
+
+    save_dir = os.path.join(game_dir, 'save')
+
+    backup_previous = not config_true(get_config_value(
+        'do_not_backup_previous', 'False'))
+    if backup_previous and os.path.isdir(save_dir):
+        before_last_restore_name = _('before_last_restore')
+        backup_dir = saves_backup_dir(game_dir)
+
+        # Keep the backup being restored if it is the last one made here
+        new_backup_path = restored_backup_path(backup_path, backup_dir,
+            before_last_restore_name)
+        if new_backup_path is not None:
+            os.rename(backup_path, new_backup_path)
+            backup_path = new_backup_path
+
+        before_path = os.path.join(backup_dir, before_last_restore_name +
+            '.zip')
+        if os.path.isfile(before_path) and not delete_path(before_path):
+            raise CommandError(_('Could not delete previous backup archive'))
+        compress_saves(game_dir, before_path, output)
+
+    temp_save_dir = None
+    if os.path.isdir(save_dir):
+        temp_save_dir = temp_save_path(game_dir)
+
+        try:
+            os.rename(save_dir, temp_save_dir)
+        except OSError:
+            raise CommandError(_('Could not rename the save directory'))
+    elif os.path.isfile(save_dir):
+        if not delete_path(save_dir):
+            raise CommandError(_('Could not remove the save file'))
+
+    try:
+        extract_archive(backup_path, game_dir, output)
+    except BaseException:
+        # Put the saves back as they were
+        if temp_save_dir is not None:
+            if os.path.exists(save_dir):
+                shutil.rmtree(save_dir, ignore_errors=True)
+            os.rename(temp_save_dir, save_dir)
+        raise
+
+    if temp_save_dir is not None:
+        delete_path(temp_save_dir)
+
+    output.event('restored', path=backup_path)
+
+
+def installed_mods(game_dir):
+    """Return the mods of game_dir like the Mods tab lists them."""
+    mods = []
+    for mods_dir in (os.path.join(game_dir, 'data', 'mods'),
+        os.path.join(game_dir, 'mods')):
+        if not os.path.isdir(mods_dir):
+            continue
+
+        for entry in scandir(mods_dir):
+            if entry.is_dir():
+                mod_scan = scan_mod_dir(entry.path)
+                if mod_scan['info'] is not None:
+                    mod_info = {
+                        'path': entry.path
+                    }
+                    mod_info.update(mod_scan['info'])
+                    mod_info['size'] = mod_scan['size']
+                    mods.append(mod_info)
+
+    mods.sort(key=lambda x: x['name'] or '')
+    return mods
+
+
+def mods_list_command(args, output):
+    game_dir = os.path.abspath(args.dir)
+    for mod_info in installed_mods(game_dir):
+        output.event('mod', **mod_info)
+
+
+def mods_install_command(args, output):
+    game_dir = os.path.abspath(args.dir)
+    mods_dir = os.path.join(game_dir, 'data', 'mods')
+    if not os.path.isdir(mods_dir):
+        raise CommandError(_('Game is not installed in this directory.'))
+
+    repo_mods = []
+    json_file = get_data_path('mods.json')
+    if os.path.isfile(json_file):
+        with open(json_file, 'r', encoding='utf8') as f:
+            try:
+                values = json.load(f)
+                if isinstance(values, list):
+                    repo_mods = values
+            except ValueError:
+                pass
+
+    wanted = args.name.lower()
+    selected_info = None
+    for mod_info in repo_mods:
+        mod_idents = mod_info['ident']
+        if not isinstance(mod_idents, list):
+            mod_idents = [mod_idents]
+        if (mod_info['name'].lower() == wanted
+            or wanted in (x.lower() for x in mod_idents)):
+            selected_info = mod_info
+            break
+
+    if selected_info is None:
+        raise CommandError(_('{name} was not found in the mods repository'
+            ).format(name=args.name))
+
+    mod_idents = selected_info['ident']
+    if isinstance(mod_idents, list):
+        mod_idents = set(mod_idents)
+    else:
+        mod_idents = set((mod_idents, ))
+
+    if not args.force and any(x['ident'] in mod_idents
+        for x in installed_mods(game_dir)):
+        raise CommandError(_('It seems this mod is already installed.'))
+
+    if selected_info['type'] != 'direct_download':
+        raise CommandError(_('The {name} mod can only be downloaded from a '
+            'browser: {url}').format(name=selected_info['name'],
+            url=selected_info['url']))
+
+    download_dir = tempfile.mkdtemp(prefix=cons.TEMP_PREFIX)
+    target_dirs = []
+    completed = False
+
+    try:
+        downloaded_file = download_file(selected_info['url'], download_dir,
+            output, cons.FAKE_USER_AGENT)
+
+        output.event('step', step='extract', path=downloaded_file)
+        try:
+            archives.extract_dirs(downloaded_file, mods_dir, new_mod_dirs,
+                target_dirs, progress=lambda done, total: output.progress(
+                    'extract', done, total))
+        except (archives.ArchiveError, InstallError) as e:
+            raise CommandError(str(e))
+
+        completed = True
+    finally:
+        delete_path(download_dir)
+        if not completed:
+            for target_dir in target_dirs:
+                if os.path.exists(target_dir):
+                    delete_path(target_dir)
+
+    output.event('mod_installed', name=selected_info['name'],
+        dirs=sorted(os.path.basename(target_dir)
+            for target_dir in target_dirs))
+
+
+def version_command(args, output):
+    game_dir = os.path.abspath(args.dir)
+    info = game_info(game_dir) if os.path.isdir(game_dir) else None
+    if info is None:
+        raise CommandError(_('Game is not installed in this directory.'))
+
+    output.event('version', launcher=version, **info)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cddagl',
+        description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    def add_dir_argument(subparser):
+        subparser.add_argument('--dir', required=True,
+            help='game directory')
+
+    update_parser = subparsers.add_parser('update',
+        help='install or update the game')
+    add_dir_argument(update_parser)
+    update_parser.add_argument('--build', default='latest',
+        help='build number or latest')
+    update_parser.add_argument('--branch', default=cons.CONFIG_BRANCH_EXPERIMENTAL,
+        choices=(cons.CONFIG_BRANCH_EXPERIMENTAL, cons.CONFIG_BRANCH_STABLE))
+    update_parser.add_argument('--platform', default='x64',
+        choices=('x64', 'x86'))
+    update_parser.add_argument('--graphics', default='tiles',
+        choices=sorted(GRAPHICS))
+    update_parser.add_argument('--force', action='store_true',
+        help='update even when the build is already installed')
+    update_parser.set_defaults(function=update_command)
+
+    backup_parser = subparsers.add_parser('backup',
+        help='backup the current saves')
+    add_dir_argument(backup_parser)
+    backup_parser.add_argument('--name', default='',
+        help='backup name, a counter is added when it already exists')
+    backup_parser.set_defaults(function=backup_command)
+
+    restore_parser = subparsers.add_parser('restore',
+        help='restore a saves backup')
+    add_dir_argument(restore_parser)
+    restore_parser.add_argument('backup',
+        help='backup name in save_backups or path of a backup archive')
+    restore_parser.set_defaults(function=restore_command)
+
+    mods_parser = subparsers.add_parser('mods', help='list or install mods')
+    mods_subparsers = mods_parser.add_subparsers(dest='mods_command',
+        metavar='mods_command')
+    mods_subparsers.required = True
+
+    mods_list_parser = mods_subparsers.add_parser('list',
+        help='list the installed mods')
+    add_dir_argument(mods_list_parser)
+    mods_list_parser.set_defaults(function=mods_list_command)
+
+    mods_install_parser = mods_subparsers.add_parser('install',
+        help='install a mod from the repository')
+    add_dir_argument(mods_install_parser)
+    mods_install_parser.add_argument('name',
+        help='name or ident of the mod in the repository')
+    mods_install_parser.add_argument('--force', action='store_true',
+        help='install even when the mod seems to be installed')
+    mods_install_parser.set_defaults(function=mods_install_command)
+
+    version_parser = subparsers.add_parser('version',
+        help='show the version of the installed game')
+    add_dir_argument(version_parser)
+    version_parser.set_defaults(function=version_command)
+
+    return parser
+
+
+def run_cli(argv=None):
+    args = build_parser().parse_args(argv)
+
+    load_gettext_no_locale()
+    init_config(get_cddagl_path())
+
+    output = ProgressPrinter()
+    try:
+        args.function(args, output)
+    except CommandError as e:
+        output.event('error', message=str(e))
+        return EXIT_FAILURE
+    except (OSError, zipfile.BadZipFile) as e:
+        output.event('error', message=str(e))
+        return EXIT_FAILURE
+
+    return EXIT_SUCCESS
@@ -1,28 +1,82 @@
+import os
+
 MAX_LOG_SIZE = 1024 * 1024
 MAX_LOG_FILES = 5
 
 SAVES_WARNING_SIZE = 150 * 1024 * 1024
 
+CONFIG_WRITE_DELAY = 1
+DB_POOL_SIZE = 4
+DB_CACHE_SIZE = 8 * 1024 * 1024
+# Old SQLite versions do not take more than 999 variables in a statement
+DB_MAX_IN_VALUES = 500
+
+METRICS_MAX_OPERATIONS = 200
+
 READ_BUFFER_SIZE = 16 * 1024
+EXTRACT_CHUNK_SIZE = 256 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
 
 MAX_GAME_DIRECTORIES = 6
 
-GITHUB_REST_API_URL = 'https://api.github.com'
+MOD_SCAN_WORKERS = 4
+MOD_SCAN_BATCH_SIZE = 20
+
+ASSET_INDEX_WORKERS = 8
+
+SEARCH_CACHED_TERMS = 64
+
+REMOTE_SIZE_MAX_REQUESTS = 4
+REMOTE_SIZE_TTL = 7 * 24 * 60 * 60
+REMOTE_SIZE_RETRY_DELAY = 5 * 60
+REMOTE_SIZE_PREFETCH_DELAY = 200
+
+MAX_PARALLEL_INSTALLS = 3
+INSTALL_EXTRACT_WORKERS = 2
+
+# The remote services can be replaced, with benchmarks/mock_server.py for
+# example, by setting these environment variables
+GITHUB_API_URL_ENV_VAR = 'CDDAGL_GITHUB_API_URL'
+JENKINS_URL_ENV_VAR = 'CDDAGL_JENKINS_URL'
+
+GITHUB_REST_API_URL = os.environ.get(GITHUB_API_URL_ENV_VAR,
+    'https://api.github.com').rstrip('/')
 GITHUB_API_VERSION = b'application/vnd.github.v3+json'
 
 GITHUB_XRL_REMAINING = b'X-RateLimit-Remaining'
 GITHUB_XRL_RESET = b'X-RateLimit-Reset'
 
 CDDA_RELEASES = '/repos/CleverRaven/Cataclysm-DDA/releases'
+CDDA_RELEASES_PER_PAGE = 10
+CDDA_RELEASES_BACKFILL_PER_PAGE = 100
+CDDA_RELEASES_MAX_PAGES = 5
 CDDAGL_LATEST_RELEASE = '/repos/remyroy/CDDA-Game-Launcher/releases/latest'
 
 NEW_ISSUE_URL = 'https://github.com/remyroy/CDDA-Game-Launcher/issues/new'
 
-CHANGELOG_URL = 'http://gorgon.narc.ro:8080/job/Cataclysm-Matrix/api/xml?tree=builds[number,timestamp,building,result,changeSet[items[msg]],runs[result,fullDisplayName]]&xpath=//build&wrapper=builds'
+JENKINS_URL = os.environ.get(JENKINS_URL_ENV_VAR,
+    'http://gorgon.narc.ro:8080').rstrip('/')
+
+CHANGELOG_API_URL = JENKINS_URL + '/job/Cataclysm-Matrix/api/xml?tree=builds[number,timestamp,building,result,changeSet[items[msg]],runs[result,fullDisplayName]]&wrapper=builds&xpath='
+CHANGELOG_URL = CHANGELOG_API_URL + '//build'
+MAX_CHANGELOG_BUILDS = 100
+CHANGELOG_BATCH_SIZE = 10
+CHANGELOG_PAGE_SIZE = 10
+CHANGELOG_WINDOW_PAGES = 3
 CDDA_ISSUE_URL_ROOT = 'https://github.com/CleverRaven/Cataclysm-DDA/issues/'
 CDDAGL_ISSUE_URL_ROOT = 'https://github.com/remyroy/CDDA-Game-Launcher/issues/'
 
-BUILD_CHANGES_URL = lambda bn: f'http://gorgon.narc.ro:8080/job/Cataclysm-Matrix/{bn}/changes'
+BUILD_CHANGES_URL = lambda bn: f'{JENKINS_URL}/job/Cataclysm-Matrix/{bn}/changes'
+
+# Directories carried over from the previous version after an update and
+# the files skipped while doing so
+PREVIOUS_VERSION_DIRS = ('config', 'save', 'templates', 'memorial',
+    'graveyard', 'save_backups')
+PREVIOUS_VERSION_SKIPS = (('config', 'debug.log'), ('config', 'debug.log.prev'))
+
+# First arguments which run the command line interface instead of the
+# launcher window, see cddagl/cli.py
+CLI_COMMANDS = ('update', 'backup', 'restore', 'mods', 'version')
 
 WORLD_FILES = set(('worldoptions.json', 'worldoptions.txt', 'master.gsav'))
 
@@ -123,7 +177,6 @@ CONFIG_BRANCH_EXPERIMENTAL = 'experimental'
 ### Path to Dirs and Files used in CDDAGL
 ### TODO: (kurzed) centralize here and then move to a better place?
 import sys
-import os
 
 
 def get_cddagl_path(*subpaths):
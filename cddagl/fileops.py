@@ -0,0 +1,888 @@
+"""File operations behind the launcher tabs.
+
+Nothing in here depends on Qt so these can be used from worker threads and
+measured on their own, see benchmarks/bench_io.py.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import stat
+import sys
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from os import scandir
+
+import cddagl.constants as cons
+from cddagl.archives import find_member_roots
+from cddagl.functions import alphanum_key
+from cddagl.i18n import proxy_gettext as _
+
+EXE_VERSION_REGEX = re.compile(
+    b'(?P<version>[01]\\.[A-F](-\\d+-g[0-9a-f]+)?)\\x00')
+
+MOD_INFO_KEYS = ('ident', 'name', 'author', 'authors', 'description',
+    'category', 'version')
+
+MOD_CONFIG_FILES = (
+    ('modinfo.json', True),
+    ('modinfo.json.disabled', False),
+)
+
+GAME_EXECUTABLES = (
+    ('cataclysm.exe', 'console'),
+    ('cataclysm-tiles.exe', 'tiles'),
+)
+
+
+class ExeFingerprint():
+    """SHA256 and embedded version string of a game executable, computed
+    from the chunks read from it."""
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.version = ''
+        self.total_read = 0
+        self.last_bytes = None
+
+    def update(self, data):
+        # The version string could be split between two chunks
+        last_frame = data
+        if self.last_bytes is not None:
+            last_frame = self.last_bytes + last_frame
+
+        match = EXE_VERSION_REGEX.search(last_frame)
+        if match is not None:
+            version = match.group('version').decode('ascii')
+            if len(version) > len(self.version):
+                self.version = version
+
+        self.total_read += len(data)
+        self.sha256.update(data)
+        self.last_bytes = data
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+def fingerprint_exe(path, chunk_size=cons.READ_BUFFER_SIZE):
+    fingerprint = ExeFingerprint()
+    with open(path, 'rb') as exe_file:
+        while True:
+            data = exe_file.read(chunk_size)
+            if len(data) == 0:
+                break
+            fingerprint.update(data)
+
+    return fingerprint
+
+
+class SavesScan():
+    """Incremental scan of a save directory counting its worlds, characters
+    and total size.
+
+    step() handles a single directory entry and returns False once the whole
+    tree has been scanned.
+    """
+
+    def __init__(self, save_dir):
+        self.save_dir = save_dir
+        self.size = 0
+        self.worlds = 0
+        self.characters = 0
+
+        self.world_dirs = set()
+        self.current_scan = scandir(save_dir)
+        self.next_scans = []
+
+    def step(self):
+        try:
+            entry = next(self.current_scan)
+        except StopIteration:
+            if len(self.next_scans) > 0:
+                self.current_scan = scandir(self.next_scans.pop())
+                return True
+            return False
+
+        if entry.is_dir():
+            self.next_scans.append(entry.path)
+        elif entry.is_file():
+            self.size += entry.stat().st_size
+
+            if entry.name.endswith('.sav'):
+                world_dir = os.path.dirname(entry.path)
+                if self.save_dir == os.path.dirname(world_dir):
+                    self.characters += 1
+
+            if entry.name in cons.WORLD_FILES:
+                world_dir = os.path.dirname(entry.path)
+                if (world_dir not in self.world_dirs
+                        and self.save_dir == os.path.dirname(world_dir)):
+                    self.world_dirs.add(world_dir)
+                    self.worlds += 1
+
+        return True
+
+    def scan(self):
+        while self.step():
+            pass
+        return self
+
+
+def backup_summary(path):
+    """Return the uncompressed size, the character count and the worlds of a
+    saves backup archive. None is returned when the archive contains anything
+    else than saves."""
+    uncompressed_size = 0
+    character_count = 0
+    worlds = set()
+
+    try:
+        with zipfile.ZipFile(path) as zfile:
+            for info in zfile.infolist():
+                if not info.filename.startswith('save/'):
+                    return None
+
+                uncompressed_size += info.file_size
+
+                path_items = info.filename.split('/')
+
+                if len(path_items) == 3:
+                    save_file = path_items[-1]
+                    if save_file.endswith('.sav'):
+                        character_count += 1
+                    if save_file in cons.WORLD_FILES:
+                        worlds.add(path_items[1])
+    except zipfile.BadZipFile:
+        pass
+
+    return {
+        'uncompressed_size': uncompressed_size,
+        'character_count': character_count,
+        'worlds': worlds
+    }
+
+
+def mod_config_info(config_file):
+    """Return the MOD_INFO values of a modinfo.json file."""
+    val = {}
+    try:
+        with open(config_file, 'r', encoding='utf8') as f:
+            try:
+                values = json.load(f)
+                if isinstance(values, dict):
+                    if values.get('type', '') == 'MOD_INFO':
+                        for key in MOD_INFO_KEYS:
+                            val[key] = values.get(key, None)
+                elif isinstance(values, list):
+                    for item in values:
+                        if (isinstance(item, dict)
+                            and item.get('type', '') == 'MOD_INFO'):
+                                for key in MOD_INFO_KEYS:
+                                    val[key] = item.get(key, None)
+                                break
+            except ValueError:
+                pass
+    except FileNotFoundError:
+        return val
+    return val
+
+
+def soundpack_config_info(config_file):
+    """Return the NAME and VIEW values of a soundpack.txt file."""
+    val = {}
+    try:
+        with open(config_file, 'r', encoding='latin1') as f:
+            for line in f:
+                if line.startswith('NAME'):
+                    space_index = line.find(' ')
+                    name = line[space_index:].strip().replace(
+                        ',', '')
+                    val['NAME'] = name
+                elif line.startswith('VIEW'):
+                    space_index = line.find(' ')
+                    view = line[space_index:].strip()
+                    val['VIEW'] = view
+
+                if 'NAME' in val and 'VIEW' in val:
+                    break
+    except FileNotFoundError:
+        return val
+    return val
+
+
+def tree_entries(path, skips=None):
+    """Yield the entries under path breadth first, each directory before its
+    content. Entries whose path is in skips are left out with their content.
+    """
+    next_scans = deque([path])
+    while len(next_scans) > 0:
+        with scandir(next_scans.popleft()) as current_scan:
+            for entry in current_scan:
+                if skips is not None and entry.path in skips:
+                    continue
+                if entry.is_dir():
+                    next_scans.append(entry.path)
+                yield entry
+
+
+def tree_size(path):
+    """Return the total size of the files under path."""
+    total_size = 0
+    for entry in tree_entries(path):
+        if entry.is_file():
+            total_size += entry.stat().st_size
+
+    return total_size
+
+
+def copy_entry(entry, src, dst):
+    """Copy an entry found under src to the same place under dst. Files are
+    copied in READ_BUFFER_SIZE chunks and the size of each chunk is yielded
+    once it is written so the copy can be spread over timer ticks."""
+    dst_path = os.path.join(dst, os.path.relpath(entry.path, src))
+    if entry.is_dir():
+        os.makedirs(dst_path)
+        return
+
+    file_dir = os.path.dirname(dst_path)
+    if not os.path.isdir(file_dir):
+        os.makedirs(file_dir)
+    with open(entry.path, 'rb') as source_file:
+        with open(dst_path, 'wb') as destination_file:
+            while True:
+                buf = source_file.read(cons.READ_BUFFER_SIZE)
+                if len(buf) == 0:
+                    break
+                destination_file.write(buf)
+                yield len(buf)
+    shutil.copystat(entry.path, dst_path)
+
+
+def copy_tree(src, dst, skips=None):
+    """Copy the directory tree src to dst, which must not exist, leaving out
+    the paths in skips. Return the bytes and the number of files copied."""
+    os.makedirs(dst)
+
+    total_size = 0
+    total_files = 0
+    for entry in tree_entries(src, skips):
+        for buf_len in copy_entry(entry, src, dst):
+            total_size += buf_len
+        if entry.is_file():
+            total_files += 1
+
+    return total_size, total_files
+
+
+def remove_entry(path, is_dir):
+    """Remove the directory or the file at path, clearing its read-only flag
+    if it cannot be removed otherwise."""
+    remove = os.rmdir if is_dir else os.unlink
+    try:
+        remove(path)
+    except OSError:
+        # Remove read-only and try again
+        os.chmod(path, stat.S_IWRITE)
+        remove(path)
+
+
+def delete_tree(path):
+    """Delete the directory tree at path, the content of each directory
+    before the directory itself. Return the number of files deleted."""
+    entries = list(tree_entries(path))
+
+    total_files = 0
+    for entry in reversed(entries):
+        is_dir = entry.is_dir()
+        remove_entry(entry.path, is_dir)
+        if not is_dir:
+            total_files += 1
+    remove_entry(path, True)
+
+    return total_files
+
+
+class SavesArchive():
+    """Backup archive of the save directory of a game directory. The save
+    files are found first and then compressed one at a time, each under its
+    path relative to the game directory, so the progress can be shown
+    between files."""
+
+    def __init__(self, game_dir, backup_path):
+        self.game_dir = game_dir
+        self.save_dir = os.path.join(game_dir, 'save')
+        self.backup_path = backup_path
+
+        self.files = deque()
+        self.file_sizes = {}
+        self.total_size = 0
+
+        self.zfile = None
+
+    def add_file(self, entry):
+        size = entry.stat().st_size
+        self.files.append(entry.path)
+        self.file_sizes[entry.path] = size
+        self.total_size += size
+
+    def scan(self):
+        for entry in tree_entries(self.save_dir):
+            if entry.is_file():
+                self.add_file(entry)
+        return self
+
+    def open(self):
+        self.zfile = zipfile.ZipFile(self.backup_path, 'w',
+            zipfile.ZIP_DEFLATED)
+
+    def compress(self, path):
+        """Write a save file in the archive and return its size."""
+        self.zfile.write(path, os.path.relpath(path, self.game_dir))
+        return self.file_sizes[path]
+
+    def close(self):
+        if self.zfile is not None:
+            self.zfile.close()
+            self.zfile = None
+
+    def write(self, progress=None):
+        """Compress every save file found by scan. progress is called with
+        the bytes compressed so far and the total after each file. The
+        archive is removed if it could not be completed. Return the total
+        size of the save files."""
+        compressed_size = 0
+        self.open()
+        try:
+            for path in self.files:
+                compressed_size += self.compress(path)
+                if progress is not None:
+                    progress(compressed_size, self.total_size)
+            self.close()
+        except BaseException:
+            self.close()
+            if os.path.isfile(self.backup_path):
+                os.remove(self.backup_path)
+            raise
+
+        return self.total_size
+
+
+def dir_tree_mtime(path):
+    """Return the latest modification time of path and its subdirectories.
+    It changes when files are added, removed or renamed anywhere under path,
+    without having to stat every file."""
+    latest = os.stat(path).st_mtime
+
+    next_scans = deque([path])
+    while len(next_scans) > 0:
+        for entry in scandir(next_scans.popleft()):
+            if entry.is_dir():
+                latest = max(latest, entry.stat().st_mtime)
+                next_scans.append(entry.path)
+
+    return latest
+
+
+def mod_dir_mtime(path):
+    """Return the latest modification time of path, its subdirectories and
+    its modinfo files, see dir_tree_mtime."""
+    latest = dir_tree_mtime(path)
+
+    for config_name, enabled in MOD_CONFIG_FILES:
+        try:
+            latest = max(latest, os.stat(os.path.join(path,
+                config_name)).st_mtime)
+        except FileNotFoundError:
+            pass
+
+    return latest
+
+
+def scan_mod_dir(path, cached_scan=None):
+    """Return the mtime, the info and the size of the mod in path. The info
+    is None when path does not contain a mod. cached_scan is returned as is
+    when the mod did not change since it was made."""
+    mtime = mod_dir_mtime(path)
+    if cached_scan is not None and cached_scan['mtime'] == mtime:
+        return cached_scan
+
+    info = None
+    for config_name, enabled in MOD_CONFIG_FILES:
+        config_file = os.path.join(path, config_name)
+        if os.path.isfile(config_file):
+            config_info = mod_config_info(config_file)
+            if 'ident' in config_info:
+                info = {
+                    'enabled': enabled
+                }
+                info.update(config_info)
+                break
+
+    return {
+        'mtime': mtime,
+        'info': info,
+        'size': tree_size(path) if info is not None else None
+    }
+
+
+def find_game_exe(game_dir):
+    """Return the path and the type of the game executable in game_dir or
+    (None, None) when the game is not installed there."""
+    for name, version_type in GAME_EXECUTABLES:
+        exe_path = os.path.join(game_dir, name)
+        if os.path.isfile(exe_path):
+            return exe_path, version_type
+
+    return None, None
+
+
+def asset_name(path, filename):
+    """Return the NAME value of a tileset or soundpack description file,
+    which might be disabled."""
+    asset_file = os.path.join(path, filename)
+
+    if not os.path.isfile(asset_file):
+        disabled_asset_file = os.path.join(path, filename + '.disabled')
+        if not os.path.isfile(disabled_asset_file):
+            return None
+        else:
+            asset_file_path = disabled_asset_file
+    else:
+        asset_file_path = asset_file
+
+    try:
+        with open(asset_file_path, 'r', encoding='latin1') as f:
+            for line in f:
+                if line.startswith('NAME'):
+                    space_index = line.find(' ')
+                    name = line[space_index:].strip().replace(
+                        ',', '')
+                    return name
+    except FileNotFoundError:
+        return None
+    return None
+
+
+def mod_ident(path):
+    """Return the ident of the mod in path, which might be disabled."""
+    json_file = os.path.join(path, 'modinfo.json')
+    if not os.path.isfile(json_file):
+        json_file = os.path.join(path, 'modinfo.json.disabled')
+    if os.path.isfile(json_file):
+        try:
+            with open(json_file, 'r', encoding='utf8') as f:
+                try:
+                    values = json.load(f)
+                    if isinstance(values, dict):
+                        if values.get('type', '') == 'MOD_INFO':
+                            return values.get('ident', None)
+                    elif isinstance(values, list):
+                        for item in values:
+                            if (isinstance(item, dict)
+                                and item.get('type', '') == 'MOD_INFO'):
+                                    return item.get('ident', None)
+                except ValueError:
+                    pass
+        except FileNotFoundError:
+            return None
+
+    return None
+
+
+class AssetIndexer():
+    """Find the names of asset directories with identify, which returns
+    None when a directory is not an asset. Names are cached by directory
+    path and by the mtime of the identity file of the asset, which might be
+    disabled, so unchanged assets are not parsed again."""
+
+    def __init__(self, identity_file, identify):
+        self.identity_file = identity_file
+        self.identify = identify
+        self.names = {}
+
+    def identity_mtime(self, path):
+        for filename in (self.identity_file, self.identity_file + '.disabled'):
+            try:
+                return os.stat(os.path.join(path, filename)).st_mtime
+            except OSError:
+                pass
+
+        return None
+
+    def name(self, path):
+        mtime = self.identity_mtime(path)
+        if mtime is None:
+            return None
+
+        cached = self.names.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        name = self.identify(path)
+        self.names[path] = (mtime, name)
+        return name
+
+    def index(self, parent_dir, executor):
+        """Return the names of the directories in parent_dir, keyed by
+        path, in the order they are listed. The identity files are read
+        on executor."""
+        paths = [entry.path for entry in scandir(parent_dir)
+            if entry.is_dir()]
+        return dict(zip(paths, executor.map(self.name, paths)))
+
+
+TILESET_INDEXER = AssetIndexer('tileset.txt',
+    lambda path: asset_name(path, 'tileset.txt'))
+SOUNDPACK_INDEXER = AssetIndexer('soundpack.txt',
+    lambda path: asset_name(path, 'soundpack.txt'))
+MOD_INDEXER = AssetIndexer('modinfo.json', mod_ident)
+
+# Asset directories restored from the previous version after an update
+CUSTOM_ASSET_DIRS = (
+    ('tilesets', ('gfx', ), TILESET_INDEXER),
+    ('soundpacks', ('data', 'sound'), SOUNDPACK_INDEXER),
+    ('mods', ('data', 'mods'), MOD_INDEXER),
+    ('user_mods', ('mods', ), MOD_INDEXER),
+)
+
+
+def custom_assets(official_dir, previous_dir, indexer, executor):
+    """Return the asset directories of previous_dir, keyed by their name,
+    which are not part of official_dir. Both directories are indexed with
+    indexer on executor. official_dir might not exist."""
+    official_set = set()
+    if os.path.isdir(official_dir):
+        official_set.update(name for name in indexer.index(official_dir,
+            executor).values() if name is not None)
+
+    previous_set = {}
+    for path, name in indexer.index(previous_dir, executor).items():
+        if name is not None and name not in previous_set:
+            previous_set[name] = path
+
+    return dict((name, path) for name, path in previous_set.items()
+        if name not in official_set)
+
+
+def custom_content(game_dir, previous_version_dir):
+    """Return the custom tilesets, soundpacks, mods, user mods, fonts and
+    the user-default-mods.json file of previous_version_dir which are
+    missing from game_dir, as (kind, name, source, target) tuples. name is
+    None for user-default-mods.json."""
+    copies = []
+
+    with ThreadPoolExecutor(cons.ASSET_INDEX_WORKERS) as executor:
+        for kind, subdirs, indexer in CUSTOM_ASSET_DIRS:
+            assets_dir = os.path.join(game_dir, *subdirs)
+            previous_assets_dir = os.path.join(previous_version_dir,
+                *subdirs)
+
+            # The user mods directory is created when restoring them
+            if kind != 'user_mods' and not os.path.isdir(assets_dir):
+                continue
+            if not os.path.isdir(previous_assets_dir):
+                continue
+
+            custom_set = custom_assets(assets_dir, previous_assets_dir,
+                indexer, executor)
+            for name, path in custom_set.items():
+                target_dir = os.path.join(assets_dir, os.path.basename(path))
+                if not os.path.exists(target_dir):
+                    copies.append((kind, name, path, target_dir))
+
+    user_default_mods_file = os.path.join(game_dir, 'data', 'mods',
+        'user-default-mods.json')
+    previous_user_default_mods_file = os.path.join(previous_version_dir,
+        'data', 'mods', 'user-default-mods.json')
+    if (not os.path.exists(user_default_mods_file)
+        and os.path.isfile(previous_user_default_mods_file)):
+        copies.append(('user-default-mods.json', None,
+            previous_user_default_mods_file, user_default_mods_file))
+
+    fonts_dir = os.path.join(game_dir, 'data', 'font')
+    previous_fonts_dir = os.path.join(previous_version_dir, 'data', 'font')
+    if os.path.isdir(fonts_dir) and os.path.isdir(previous_fonts_dir):
+        custom_set = set(os.listdir(previous_fonts_dir)) - set(
+            os.listdir(fonts_dir))
+        for entry in sorted(custom_set):
+            copies.append(('fonts', entry, os.path.join(previous_fonts_dir,
+                entry), os.path.join(fonts_dir, entry)))
+
+    return copies
+
+
+def copy_custom_content(copies, copying=None, progress=None,
+    interrupted=None):
+    """Copy the (kind, name, source, target) tuples returned by
+    custom_content. Targets which exist by now are skipped.
+
+    copying is called with the kind and the name of each copy when it
+    starts and progress with the bytes copied so far and the total.
+    interrupted is polled between chunks and stops the copy when it returns
+    True. Return whether everything was copied."""
+    # Find what to copy first so the progress has a total
+    files = []
+    total_size = 0
+    for kind, name, source, target in copies:
+        if os.path.exists(target):
+            continue
+
+        copy_files = []
+        if os.path.isdir(source):
+            next_scans = deque([(source, target)])
+            while len(next_scans) > 0:
+                source_dir, target_dir = next_scans.popleft()
+                copy_files.append((source_dir, target_dir, None))
+                for entry in scandir(source_dir):
+                    entry_target = os.path.join(target_dir, entry.name)
+                    if entry.is_dir():
+                        next_scans.append((entry.path, entry_target))
+                    elif entry.is_file():
+                        size = entry.stat().st_size
+                        copy_files.append((entry.path, entry_target, size))
+                        total_size += size
+        elif os.path.isfile(source):
+            size = os.stat(source).st_size
+            copy_files.append((source, target, size))
+            total_size += size
+
+        files.append((kind, name, copy_files))
+
+    copied_size = 0
+    if progress is not None:
+        progress(copied_size, total_size)
+
+    for kind, name, copy_files in files:
+        if copying is not None:
+            copying(kind, name)
+
+        copied_dirs = []
+        for source, target, size in copy_files:
+            if size is None:
+                os.makedirs(target, exist_ok=True)
+                copied_dirs.append((source, target))
+                continue
+
+            with open(source, 'rb') as source_file:
+                with open(target, 'wb') as target_file:
+                    while True:
+                        if interrupted is not None and interrupted():
+                            return False
+
+                        chunk = source_file.read(cons.COPY_CHUNK_SIZE)
+                        if len(chunk) == 0:
+                            break
+                        target_file.write(chunk)
+
+                        copied_size += len(chunk)
+                        if progress is not None:
+                            progress(copied_size, total_size)
+            shutil.copystat(source, target)
+
+        # Like shutil.copytree, the directories get their times last
+        for source, target in reversed(copied_dirs):
+            shutil.copystat(source, target)
+
+    return True
+
+
+def backup_file_name(backup_dir, name):
+    """Return a backup archive file name for name which does not already
+    exist in backup_dir or which is the next one based on an incremental
+    counter placed at the end of the name."""
+    name_lower = name.lower()
+    name_key = alphanum_key(name_lower)
+    if len(name_key) > 1 and isinstance(name_key[-1:][0], int):
+        name_key = name_key[:-1]
+
+    duplicate_name = False
+    duplicate_basename = False
+    max_counter = 0
+
+    for entry in scandir(backup_dir):
+        filename, ext = os.path.splitext(entry.name)
+        if entry.is_file() and ext.lower() == '.zip':
+            filename_lower = filename.lower()
+
+            if filename_lower == name_lower:
+                duplicate_name = True
+            else:
+                filename_key = alphanum_key(filename_lower)
+
+                counter = filename_key[-1:][0]
+                if len(filename_key) > 1 and isinstance(counter, int):
+                    filename_key = filename_key[:-1]
+
+                    if name_key == filename_key:
+                        duplicate_basename = True
+                        max_counter = max(max_counter, counter)
+
+    if duplicate_basename:
+        name_key = alphanum_key(name)
+        if len(name_key) > 1 and isinstance(name_key[-1:][0], int):
+            name_key = name_key[:-1]
+
+        name_key.append(max_counter + 1)
+        backup_filename = ''.join(map(lambda x: str(x), name_key))
+    elif duplicate_name:
+        backup_filename = name + '2'
+    else:
+        backup_filename = name
+
+    return backup_filename + '.zip'
+
+
+def saves_backup_dir(game_dir):
+    """Return the save_backups directory of game_dir, created if needed."""
+    backup_dir = os.path.join(game_dir, 'save_backups')
+    if not os.path.isdir(backup_dir):
+        if os.path.isfile(backup_dir):
+            os.remove(backup_dir)
+
+        os.makedirs(backup_dir)
+
+    return backup_dir
+
+
+def restored_backup_path(backup_path, backup_dir, before_last_restore_name):
+    """Return where the backup archive at backup_path has to be renamed so
+    the backup of the current saves made under before_last_restore_name in
+    backup_dir does not replace it before it is restored, or None when it
+    can stay where it is."""
+    before_last_restore_path = os.path.join(backup_dir,
+        before_last_restore_name + '.zip')
+    if (os.path.normcase(os.path.abspath(backup_path)) !=
+        os.path.normcase(os.path.abspath(before_last_restore_path))):
+        return None
+
+    return os.path.join(backup_dir, backup_file_name(backup_dir,
+        before_last_restore_name))
+
+
+def temp_save_path(game_dir):
+    """Return a path which does not exist yet in game_dir where its save
+    directory can be moved while a backup is restored."""
+    while True:
+        temp_save_dir = os.path.join(game_dir, 'save-{0}'.format(
+            '%08x' % random.randrange(16**8)))
+        if not os.path.exists(temp_save_dir):
+            return temp_save_dir
+
+
+def previous_version_entries(game_dir, keep_saves):
+    """Return the names of the entries of game_dir to move in its
+    previous_version directory before an update. The save directory stays
+    when keep_saves is set and so does the launcher when it runs from
+    game_dir."""
+    dir_list = os.listdir(game_dir)
+
+    if keep_saves and 'save' in dir_list:
+        dir_list.remove('save')
+
+    if getattr(sys, 'frozen', False):
+        launcher_exe = os.path.abspath(sys.executable)
+        launcher_dir = os.path.dirname(launcher_exe)
+        if os.path.abspath(game_dir) == launcher_dir:
+            launcher_name = os.path.basename(launcher_exe)
+            if launcher_name in dir_list:
+                dir_list.remove(launcher_name)
+
+    return dir_list
+
+
+def previous_version_dirs(game_dir, keep_saves):
+    """Return the (name, source, target) tuples of the directories to copy
+    back from the previous_version directory of game_dir after an update.
+    Targets which already exist are left out and so are the saves when
+    keep_saves is set."""
+    previous_version_dir = os.path.join(game_dir, 'previous_version')
+
+    copies = []
+    for name in cons.PREVIOUS_VERSION_DIRS:
+        if keep_saves and name == 'save':
+            continue
+
+        source = os.path.join(previous_version_dir, name)
+        target = os.path.join(game_dir, name)
+        if os.path.isdir(source) and not os.path.exists(target):
+            copies.append((name, source, target))
+
+    return copies
+
+
+def previous_version_skips(game_dir):
+    """Return the paths of the previous_version directory of game_dir which
+    are not copied back, like the debug logs."""
+    previous_version_dir = os.path.join(game_dir, 'previous_version')
+    return set(os.path.join(previous_version_dir, *x)
+        for x in cons.PREVIOUS_VERSION_SKIPS)
+
+
+def archive_mod_dirs(members, archive_path):
+    """Return where the mods in the members of an archive are, as (root,
+    name) pairs with the name of the directory each one is installed in.
+    A mod at the top of the archive is named after the archive."""
+    return [(root, root[-1] if len(root) > 0 else archive_stem(archive_path))
+        for root in find_member_roots(members, 'modinfo.json')]
+
+
+def archive_soundpack_dir(members, archive_path):
+    """Return where the soundpack in the members of an archive is, as a
+    (root, name) pair like archive_mod_dirs, or None."""
+    roots = find_member_roots(members, 'soundpack.txt')
+    if len(roots) == 0:
+        return None
+
+    root = roots[0]
+    return root, root[-1] if len(root) > 0 else archive_stem(archive_path)
+
+
+class InstallError(Exception):
+    pass
+
+
+def new_mod_dirs(members, mods_dir, archive_path):
+    """Find the mods in the members of a downloaded archive and make sure
+    they can be installed in mods_dir. Raises InstallError otherwise."""
+    mod_dirs = archive_mod_dirs(members, archive_path)
+
+    if len(mod_dirs) == 0:
+        raise InstallError(_('Mod installation cancelled - There '
+            'is no mod in the downloaded archive'))
+
+    for root, name in mod_dirs:
+        if os.path.exists(os.path.join(mods_dir, name)):
+            raise InstallError(_('Mod installation cancelled - '
+                'There is already a {basename} directory in '
+                '{mods_dir}').format(basename=name, mods_dir=mods_dir))
+
+    return mod_dirs
+
+
+def new_soundpack_dir(members, soundpacks_dir, archive_path):
+    """Find the soundpack in the members of a downloaded archive and make
+    sure it can be installed in soundpacks_dir. Raises InstallError
+    otherwise."""
+    soundpack_dir = archive_soundpack_dir(members, archive_path)
+
+    if soundpack_dir is None:
+        raise InstallError(_('Soundpack installation cancelled - There '
+            'is no soundpack in the downloaded archive'))
+
+    root, name = soundpack_dir
+    if os.path.exists(os.path.join(soundpacks_dir, name)):
+        raise InstallError(_('Soundpack installation cancelled - '
+            'There is already a {basename} directory in '
+            '{soundpacks_dir}').format(basename=name,
+                soundpacks_dir=soundpacks_dir))
+
+    return [soundpack_dir]
+
+
+def archive_stem(archive_path):
+    return os.path.splitext(os.path.basename(archive_path))[0]
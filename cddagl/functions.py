@@ -1,13 +1,12 @@
 import logging
 import os
 import re
+import sys
 import traceback
 from io import StringIO
 
-import winutils
-from pywintypes import com_error
-
 import cddagl
+from cddagl.constants import get_cddagl_path
 from cddagl.i18n import proxy_gettext as _
 from cddagl.sql.functions import get_config_value, config_true
 
@@ -61,6 +60,19 @@ def arstrip(value):
         value = value[:-1]
     return value
 
+def parse_link_header(value):
+    """Return the urls of an HTTP Link header keyed by their rel value."""
+    links = {}
+    for link in value.split(','):
+        match = re.match(r'\s*<(?P<url>[^>]*)>(?P<params>.*)', link)
+        if match is None:
+            continue
+        rel_match = re.search(r'rel="?(?P<rel>[^";]+)"?', match.group('params'))
+        if rel_match is not None:
+            for rel in rel_match.group('rel').split():
+                links[rel] = match.group('url')
+    return links
+
 def is_64_windows():
     return 'PROGRAMFILES(X86)' in os.environ
 
@@ -80,12 +92,25 @@ def sizeof_fmt(num, suffix=None):
         num /= 1024.0
     return "%.1f %s%s" % (num, _('Yi'), suffix)
 
+def get_rarfile():
+    """Return the rarfile module, importing and configuring it on first use."""
+    import rarfile
+
+    if getattr(sys, 'frozen', False):
+        rarfile.UNRAR_TOOL = get_cddagl_path('UnRAR.exe')
+
+    return rarfile
+
+
 def delete_path(path):
     ''' Move directory or file in the recycle bin (or permanently delete it
     depending on the settings used) using the built in Windows File
     operations dialog
     '''
 
+    import winutils
+    from pywintypes import com_error
+
     # Make sure we have an absolute path first
     if not os.path.isabs(path):
         path = os.path.abspath(path)
@@ -116,6 +141,9 @@ def move_path(srcpath, dstpath):
     operations dialog
     '''
 
+    import winutils
+    from pywintypes import com_error
+
     # Make sure we have absolute paths first
     if not os.path.isabs(srcpath):
         srcpath = os.path.abspath(srcpath)
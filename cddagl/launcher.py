@@ -21,6 +21,7 @@ from cddagl.i18n import (
     proxy_gettext as _, get_available_locales
 )
 from cddagl.sql.functions import init_config, get_config_value, config_true
+from cddagl.tracing import init_startup_trace, mark_startup_phase
 from cddagl.ui.views.dialogs import ExceptionWindow
 from cddagl.ui.views.tabbed import TabbedWindow
 from cddagl.win32 import get_ui_locale, SingleInstance, write_named_pipe
@@ -133,11 +134,13 @@ def start_ui(locale, single_instance):
 
     main_app = QApplication(sys.argv)
     main_app.setWindowIcon(QIcon(get_resource_path('launcher.ico')))
+    mark_startup_phase('QApplication')
 
     main_app.single_instance = single_instance
     main_app.app_locale = locale
 
     main_win = TabbedWindow('CDDA Game Launcher')
+    mark_startup_phase('TabbedWindow')
     main_win.show()
 
     main_app.main_win = main_win
@@ -168,14 +171,20 @@ def init_exception_catcher():
 
 
 def run_cddagl():
+    init_startup_trace()
+
     load_gettext_no_locale()
     init_logging()
+    mark_startup_phase('init_logging')
     init_exception_catcher()
 
     init_config(get_cddagl_path())
+    mark_startup_phase('init_config')
+
+    locale = get_preferred_locale(get_available_locales(get_locale_path()))
+    mark_startup_phase('get_preferred_locale')
 
-    start_ui(get_preferred_locale(get_available_locales(get_locale_path())),
-             init_single_instance())
+    start_ui(locale, init_single_instance())
 
 
 if __name__ == '__main__':
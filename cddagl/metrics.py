@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import cddagl.constants as cons
+
+
+class Histogram():
+    """Running summary of observed values."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.minimum,
+            'max': self.maximum,
+            'mean': self.total / self.count if self.count > 0 else None
+        }
+
+
+class Span():
+    """A timed operation. bytes is updated by the operation as it progresses
+    and the span is reported to its registry once finished."""
+
+    def __init__(self, registry, name, details):
+        self.registry = registry
+        self.name = name
+        self.details = details
+        self.bytes = 0
+        self.started_on = datetime.now()
+        self.started = time.perf_counter()
+        self.duration = None
+        self.success = None
+
+    @property
+    def finished(self):
+        return self.duration is not None
+
+    @property
+    def throughput(self):
+        if not self.duration:
+            return None
+        return self.bytes / self.duration
+
+    def add_bytes(self, count):
+        self.bytes += count
+
+    def finish(self, success=True):
+        if self.finished:
+            return
+
+        self.duration = time.perf_counter() - self.started
+        self.success = success
+        self.registry.record(self)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'details': self.details,
+            'started_on': self.started_on.isoformat(),
+            'duration': self.duration,
+            'bytes': self.bytes,
+            'throughput': self.throughput,
+            'success': self.success
+        }
+
+
+class MetricsRegistry():
+    """Counters, histograms and recently finished operations reported by the
+    launcher. Safe to use from worker threads."""
+
+    def __init__(self, max_operations=cons.METRICS_MAX_OPERATIONS):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.operations = deque(maxlen=max_operations)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = Histogram()
+                self.histograms[name] = histogram
+            histogram.observe(value)
+
+    def start_span(self, name, **details):
+        return Span(self, name, details)
+
+    def record(self, span):
+        with self._lock:
+            self.operations.append(span)
+
+        self.increment(span.name + '.count')
+        if not span.success:
+            self.increment(span.name + '.failed')
+        self.increment(span.name + '.bytes', span.bytes)
+        self.observe(span.name + '.duration', span.duration)
+        if span.throughput is not None:
+            self.observe(span.name + '.throughput', span.throughput)
+
+    def recent_operations(self):
+        """Return the finished operations, most recent first."""
+        with self._lock:
+            return list(reversed(self.operations))
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'exported_on': datetime.now().isoformat(),
+                'counters': dict(self.counters),
+                'histograms': dict((name, histogram.to_dict())
+                    for name, histogram in self.histograms.items()),
+                'operations': [span.to_dict()
+                    for span in reversed(self.operations)]
+            }
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf8') as export_file:
+            json.dump(self.to_dict(), export_file, indent=2)
+
+
+metrics = MetricsRegistry()
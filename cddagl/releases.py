@@ -0,0 +1,211 @@
+import codecs
+import json
+import re
+
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import cddagl.constants as cons
+
+BUILD_REGEX = re.compile(r'build #(?P<build>\d+)')
+WHITESPACE_OR_COMMA = re.compile(r'[\s,]*')
+
+
+def releases_url(per_page, page=None):
+    """Return the url of a page of the CDDA releases, newest first."""
+    url = cons.GITHUB_REST_API_URL + cons.CDDA_RELEASES + (
+        '?per_page={per_page}'.format(per_page=per_page))
+    if page is not None:
+        url = url + '&page={page}'.format(page=page)
+
+    return url
+
+
+@lru_cache(maxsize=None)
+def asset_matcher(platform, graphics):
+    """Return a search function matching the build asset of a platform and
+    graphics combination."""
+    return re.compile(r'cataclysmdda-(?P<major>.+)-' +
+        re.escape(platform) + r'-' +
+        re.escape(graphics) + r'-' +
+        r'(?P<build>\d+)\.zip'
+        ).search
+
+
+@lru_cache(maxsize=None)
+def catalog_asset_matcher():
+    """Return a search function matching the build asset of any platform and
+    graphics combination the launcher can install."""
+    combos = []
+    for graphics_assets in cons.BASE_ASSETS.values():
+        for base_asset in graphics_assets.values():
+            combo = (base_asset['Platform'], base_asset['Graphics'])
+            if combo not in combos:
+                combos.append(combo)
+
+    return re.compile(r'cataclysmdda-(?P<major>.+)-(?:' +
+        '|'.join(re.escape(platform) + r'-' + re.escape(graphics)
+            for platform, graphics in combos) +
+        r')-(?P<build>\d+)\.zip'
+        ).search
+
+
+def parse_created_at(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+    except ValueError:
+        import arrow
+        return arrow.get(value).naive
+
+
+class ReleaseStreamParser():
+    """Incremental parser for the GitHub releases listing.
+
+    The listing is fed in chunks as they are received. Each release object is
+    decoded on its own as soon as it is complete and only its build number,
+    creation date and installable assets are kept.
+    """
+
+    def __init__(self):
+        self.remote_builds = []
+        self.valid = True
+
+        self._decoder = codecs.getincrementaldecoder('utf8')()
+        self._json_decoder = json.JSONDecoder()
+        self._asset_match = catalog_asset_matcher()
+        self._buffer = ''
+        self._scanned = 0
+        self._started = False
+        self._done = False
+
+    def feed(self, data):
+        if self._done or not self.valid:
+            return
+
+        try:
+            self._buffer += self._decoder.decode(data)
+        except UnicodeDecodeError:
+            self.valid = False
+            self._buffer = ''
+            return
+
+        self._consume()
+
+    def close(self):
+        if not self._done and self.valid:
+            try:
+                self._buffer += self._decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                self.valid = False
+            else:
+                self._consume()
+
+        if not self._done:
+            self.valid = False
+        self._buffer = ''
+
+        return self.remote_builds
+
+    def _consume(self):
+        buffer = self._buffer
+        position = WHITESPACE_OR_COMMA.match(buffer).end()
+
+        if not self._started:
+            if position == len(buffer):
+                self._buffer = ''
+                return
+            if buffer[position] != '[':
+                self.valid = False
+                self._buffer = ''
+                return
+            self._started = True
+            position += 1
+
+        while True:
+            position = WHITESPACE_OR_COMMA.match(buffer, position).end()
+            if position == len(buffer):
+                break
+
+            if buffer[position] == ']':
+                self._done = True
+                break
+
+            # A release can only be complete once its closing brace arrived
+            if '}' not in buffer[max(position, self._scanned):]:
+                self._scanned = len(buffer)
+                break
+
+            try:
+                release, position = self._json_decoder.raw_decode(buffer,
+                    position)
+            except json.JSONDecodeError:
+                self._scanned = len(buffer)
+                break
+
+            self._scanned = position
+            self._add_release(release)
+
+        self._buffer = buffer[position:]
+        self._scanned = max(self._scanned - position, 0)
+
+    def _add_release(self, release):
+        if not isinstance(release, dict):
+            return
+
+        name = release.get('name')
+        created_at = release.get('created_at')
+        if not isinstance(name, str) or not isinstance(created_at, str):
+            return
+
+        build_match = BUILD_REGEX.search(name)
+        if build_match is None:
+            return
+
+        assets = []
+        for asset in release.get('assets') or ():
+            asset_name = asset.get('name')
+            asset_url = asset.get('browser_download_url')
+            if (asset_name is None or asset_url is None
+                or self._asset_match(asset_name) is None):
+                continue
+
+            assets.append({
+                'name': asset_name,
+                'url': asset_url,
+                'size': asset.get('size')
+            })
+
+        self.remote_builds.append({
+            'number': build_match.group('build'),
+            'released_on': parse_created_at(created_at),
+            'assets': assets
+        })
+
+
+def parse_releases(releases_data, chunk_size=cons.READ_BUFFER_SIZE):
+    parser = ReleaseStreamParser()
+    for index in range(0, len(releases_data), chunk_size):
+        parser.feed(releases_data[index:index + chunk_size])
+    return parser.close()
+
+
+def catalog_builds(remote_builds, platform, graphics):
+    """Return the builds available for a platform and graphics combination
+    from the remote build catalog."""
+    builds = []
+
+    match = asset_matcher(platform, graphics)
+
+    for remote_build in remote_builds:
+        asset = next((x for x in remote_build['assets']
+            if match(x['name']) is not None), None)
+
+        builds.append({
+            'url': asset['url'] if asset is not None else None,
+            'name': asset['name'] if asset is not None else None,
+            'size': asset['size'] if asset is not None else None,
+            'number': remote_build['number'],
+            'date': remote_build['released_on'].replace(tzinfo=timezone.utc)
+        })
+
+    return builds
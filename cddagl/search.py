@@ -0,0 +1,76 @@
+import re
+from collections import OrderedDict
+
+import cddagl.constants as cons
+
+WORD_REGEX = re.compile(r'\w+')
+
+
+class SearchIndex():
+    """Inverted index of the words found in some fields of a list of entries.
+
+    A query matches the entries containing each of its terms in one of their
+    words, so typing the start or any part of a word is enough. The words
+    matching recent terms are kept to narrow down the next terms containing
+    them, which is what happens on every keystroke.
+    """
+
+    def __init__(self, entries, fields):
+        postings = {}
+        for index, entry in enumerate(entries):
+            for field in fields:
+                value = entry.get(field, None)
+                if value is None:
+                    continue
+                if isinstance(value, (list, tuple)):
+                    value = ' '.join(str(x) for x in value)
+                for word in WORD_REGEX.findall(str(value).lower()):
+                    postings.setdefault(word, set()).add(index)
+
+        self.postings = postings
+        self.words = sorted(postings)
+        self.term_words = OrderedDict()
+
+    def words_matching(self, term):
+        words = self.term_words.get(term, None)
+        if words is not None:
+            self.term_words.move_to_end(term)
+            return words
+
+        # Words containing term also contain every part of it
+        candidates = self.words
+        for cached_term, cached_words in self.term_words.items():
+            if cached_term in term and len(cached_words) < len(candidates):
+                candidates = cached_words
+
+        words = [word for word in candidates if term in word]
+
+        self.term_words[term] = words
+        if len(self.term_words) > cons.SEARCH_CACHED_TERMS:
+            self.term_words.popitem(last=False)
+
+        return words
+
+    def search(self, query):
+        """Return the indexes of the entries matching query or None when
+        query has no terms and everything matches."""
+        terms = set(WORD_REGEX.findall(query.lower()))
+        if len(terms) == 0:
+            return None
+
+        matches = None
+        # Longer terms usually match fewer entries
+        for term in sorted(terms, key=len, reverse=True):
+            term_matches = set()
+            for word in self.words_matching(term):
+                term_matches.update(self.postings[word])
+
+            if matches is None:
+                matches = term_matches
+            else:
+                matches &= term_matches
+
+            if len(matches) == 0:
+                break
+
+        return matches
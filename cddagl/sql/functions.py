@@ -1,31 +1,53 @@
+import atexit
+import json
+import logging
 import os
+import pkgutil
+import re
+import sqlite3
+import sys
 import threading
+import time
+import weakref
 
-from alembic import command
-from alembic.config import Config
+from datetime import datetime, timedelta
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, cast, event, Integer
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker, joinedload
 
-from cddagl.sql.model import ConfigValue, GameVersion, GameBuild
+import cddagl.constants as cons
+from cddagl.sql.model import (
+    ConfigValue, GameVersion, GameBuild, HttpCache, RemoteBuild,
+    RemoteBuildAsset, ChangelogBuild, ModScan, RemoteSize, SoundpackSize
+)
 
 
-class ThreadSafeSessionManager():
-    def __init__(self):
-        self._lock = threading.Lock()
-        self.sessions = {}
+logger = logging.getLogger('cddagl')
+
+
+# Sessions are kept in a thread local and closed when their thread finishes,
+# which gives their connection back to the pool
+class ThreadSession():
+    def __init__(self, session):
+        self.session = session
+        weakref.finalize(self, session.close)
 
-    def has_session(self, thread_id):
-        return thread_id in self.sessions
 
-    def get_session(self, thread_id):
-        return self.sessions[thread_id]
+_engine = None
+_sessionmaker = None
+_engine_lock = threading.Lock()
+_thread_sessions = threading.local()
 
-    def save_session(self, thread_id, session):
-        self._lock.acquire()
-        self.sessions[thread_id] = session
-        self._lock.release()
+_config_values = None
+_config_values_lock = threading.Lock()
+_config_listeners = []
+
+_pending_config_values = {}
+_config_flush_lock = threading.Lock()
+_config_writer = None
+_config_writer_lock = threading.Lock()
 
 
 def get_db_url():
@@ -33,6 +55,26 @@ def get_db_url():
 
 
 def init_config(basedir):
+    started = time.perf_counter()
+
+    # Loading alembic and its migration scripts is only worth it when the
+    # database is not already at the latest revision
+    head_revision = get_head_revision(basedir)
+    upgraded = head_revision is None or get_db_revision() != head_revision
+    if upgraded:
+        upgrade_config(basedir)
+
+    load_config_values()
+
+    logger.info('Config initialized in {0:.1f} ms ({1})'.format(
+        (time.perf_counter() - started) * 1000,
+        'upgraded' if upgraded else 'already up to date'))
+
+
+def upgrade_config(basedir):
+    from alembic import command
+    from alembic.config import Config
+
     alembic_dir = os.path.join(basedir, 'alembic')
 
     alembic_cfg = Config()
@@ -43,10 +85,73 @@ def init_config(basedir):
         command.upgrade(alembic_cfg, "head")
     except OperationalError:
         # If we cannot upgrade the database, we remove it and try again
-        os.remove(get_config_path())
+        dispose_engine()
+        config_path = get_config_path()
+        for path in (config_path, config_path + '-wal', config_path + '-shm'):
+            if os.path.isfile(path):
+                os.remove(path)
         command.upgrade(alembic_cfg, "head")
 
 
+def get_db_revision():
+    config_path = get_config_path()
+    if not os.path.isfile(config_path):
+        return None
+
+    try:
+        connection = sqlite3.connect(config_path)
+        try:
+            rows = connection.execute(
+                'SELECT version_num FROM alembic_version').fetchall()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+
+    if len(rows) != 1:
+        return None
+
+    return rows[0][0]
+
+
+def get_head_revision(basedir):
+    if getattr(sys, 'frozen', False):
+        # Written by the freeze command in setup.py
+        try:
+            return pkgutil.get_data('cddagl', 'ALEMBIC_HEAD').decode('utf8'
+                ).strip()
+        except OSError:
+            return None
+
+    # Find the head from the migration scripts without loading them
+    versions_dir = os.path.join(basedir, 'alembic', 'versions')
+    revision_regex = re.compile(
+        r"^(?P<name>revision|down_revision) = '(?P<revision>\w+)'",
+        re.MULTILINE)
+
+    revisions = set()
+    down_revisions = set()
+    try:
+        entries = os.scandir(versions_dir)
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.name.endswith('.py') or not entry.is_file():
+            continue
+        with open(entry.path, encoding='utf8') as version_file:
+            for match in revision_regex.finditer(version_file.read()):
+                if match.group('name') == 'revision':
+                    revisions.add(match.group('revision'))
+                else:
+                    down_revisions.add(match.group('revision'))
+
+    heads = revisions - down_revisions
+    if len(heads) != 1:
+        return None
+
+    return heads.pop()
+
+
 def get_config_path():
     local_app_data = os.environ.get('LOCALAPPDATA', os.environ.get('APPDATA'))
     if local_app_data is None or not os.path.isdir(local_app_data):
@@ -60,45 +165,184 @@ def get_config_path():
     return os.path.join(config_dir, 'configs.db')
 
 
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # Readers are not blocked by writes in WAL mode and a commit only needs an
+    # fsync when the WAL is checkpointed
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-{0}'.format(cons.DB_CACHE_SIZE // 1024))
+    cursor.close()
+
+
+def get_engine():
+    global _engine, _sessionmaker
+
+    with _engine_lock:
+        if _engine is None:
+            # Threads never wait for a connection. Connections above the pool
+            # size are closed when their session is.
+            _engine = create_engine(get_db_url(),
+                poolclass=QueuePool,
+                pool_size=cons.DB_POOL_SIZE,
+                max_overflow=-1,
+                connect_args={'check_same_thread': False})
+            event.listen(_engine, 'connect', set_sqlite_pragmas)
+            _sessionmaker = sessionmaker(bind=_engine)
+
+    return _engine
+
+
+def dispose_engine():
+    global _engine, _sessionmaker
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+            _sessionmaker = None
+
+
 def get_session():
-    global _session_manager
-    try:
-        _session_manager
-    except NameError:
-        _session_manager = ThreadSafeSessionManager()
+    thread_session = getattr(_thread_sessions, 'thread_session', None)
+    if thread_session is None:
+        get_engine()
+        thread_session = ThreadSession(_sessionmaker())
+        _thread_sessions.thread_session = thread_session
 
-    thread_id = threading.current_thread().ident
-    if not _session_manager.has_session(thread_id):
-        db_engine = create_engine(get_db_url())
-        Session = sessionmaker(bind=db_engine)
-        _session_manager.save_session(thread_id, Session())
+    return thread_session.session
 
-    return _session_manager.get_session(thread_id)
 
+def load_config_values():
+    global _config_values
 
-def get_config_value(name, default=None):
     session = get_session()
 
-    db_value = session.query(ConfigValue).filter_by(name=name).first()
+    # When a name is found more than once, keep the oldest value like the
+    # queries did before the cache
+    config_values = {}
+    for db_value in (session
+                     .query(ConfigValue)
+                     .order_by(ConfigValue.id.desc())
+                     .all()):
+        config_values[db_value.name] = db_value.value
+
+    with _config_values_lock:
+        _config_values = config_values
 
-    if db_value is None:
-        return default
 
-    return db_value.value
+def get_config_value(name, default=None):
+    if _config_values is None:
+        load_config_values()
+
+    return _config_values.get(name, default)
 
 
 def set_config_value(name, value):
-    session = get_session()
+    value = str(value)
 
-    db_value = session.query(ConfigValue).filter_by(name=name).first()
+    if _config_values is None:
+        load_config_values()
 
-    if db_value is None:
-        db_value = ConfigValue()
-        db_value.name = name
+    with _config_values_lock:
+        if _config_values.get(name) == value:
+            return
 
-    db_value.value = value
-    session.add(db_value)
-    session.commit()
+        _config_values[name] = value
+        _pending_config_values[name] = value
+
+    # Writes are coalesced and committed together by the config writer
+    get_config_writer().schedule()
+
+    for listener in list(_config_listeners):
+        listener(name, value)
+
+
+def flush_config_values():
+    """Commit the config values waiting to be written in one transaction."""
+    with _config_flush_lock:
+        with _config_values_lock:
+            pending_values = dict(_pending_config_values)
+            _pending_config_values.clear()
+
+        if len(pending_values) == 0:
+            return
+
+        session = get_session()
+
+        try:
+            # When a name is found more than once, update the oldest value
+            db_values = {}
+            for db_value in (session
+                             .query(ConfigValue)
+                             .filter(ConfigValue.name.in_(pending_values))
+                             .order_by(ConfigValue.id.desc())
+                             .all()):
+                db_values[db_value.name] = db_value
+
+            for name, value in pending_values.items():
+                db_value = db_values.get(name)
+                if db_value is None:
+                    db_value = ConfigValue()
+                    db_value.name = name
+
+                db_value.value = value
+                session.add(db_value)
+
+            session.commit()
+        except:
+            session.rollback()
+
+            # Keep the values around for the next flush unless they were
+            # changed in the meantime
+            with _config_values_lock:
+                for name, value in pending_values.items():
+                    _pending_config_values.setdefault(name, value)
+            raise
+
+
+class ConfigWriterThread(threading.Thread):
+    def __init__(self):
+        super(ConfigWriterThread, self).__init__(name='ConfigWriterThread',
+            daemon=True)
+        self.pending = threading.Event()
+
+    def schedule(self):
+        self.pending.set()
+
+    def run(self):
+        while True:
+            self.pending.wait()
+
+            # Give some time for other writes to be made before committing
+            time.sleep(cons.CONFIG_WRITE_DELAY)
+            self.pending.clear()
+
+            try:
+                flush_config_values()
+            except Exception:
+                logger.exception('Could not write config values')
+
+
+def get_config_writer():
+    global _config_writer
+
+    with _config_writer_lock:
+        if _config_writer is None:
+            _config_writer = ConfigWriterThread()
+            _config_writer.start()
+            atexit.register(flush_config_values)
+
+    return _config_writer
+
+
+def add_config_listener(listener):
+    """Call listener(name, value) each time a config value is changed."""
+    _config_listeners.append(listener)
+
+
+def remove_config_listener(listener):
+    _config_listeners.remove(listener)
 
 
 def new_version(version, sha256, stable):
@@ -162,5 +406,314 @@ def get_build_from_sha256(sha256):
     return None
 
 
+def get_http_cache(url):
+    session = get_session()
+
+    cached_response = session.query(HttpCache).filter_by(url=url).first()
+
+    if cached_response is None:
+        return None
+
+    return {
+        'etag': cached_response.etag,
+        'last_modified': cached_response.last_modified,
+        'body': cached_response.body,
+        'fetched_on': cached_response.fetched_on
+    }
+
+
+def set_http_cache(url, etag, last_modified, body=b''):
+    session = get_session()
+
+    cached_response = session.query(HttpCache).filter_by(url=url).first()
+
+    if cached_response is None:
+        cached_response = HttpCache()
+        cached_response.url = url
+
+    cached_response.etag = etag
+    cached_response.last_modified = last_modified
+    cached_response.body = body
+    cached_response.fetched_on = datetime.utcnow()
+    session.add(cached_response)
+    session.commit()
+
+
+def save_remote_builds(remote_builds):
+    session = get_session()
+
+    numbers = [remote_build['number'] for remote_build in remote_builds]
+    known_builds = {}
+    if len(numbers) > 0:
+        known_builds = {
+            x.number: x for x in (session
+                .query(RemoteBuild)
+                .filter(RemoteBuild.number.in_(numbers))
+                .options(joinedload('assets'))
+                .all())
+        }
+
+    for remote_build in remote_builds:
+        db_build = known_builds.get(remote_build['number'])
+        if db_build is None:
+            db_build = RemoteBuild()
+            db_build.number = remote_build['number']
+            session.add(db_build)
+
+        db_build.released_on = remote_build['released_on']
+
+        # Assets are uploaded after the release is created, refresh them
+        known_assets = {x.name: x for x in db_build.assets}
+        for asset in remote_build['assets']:
+            db_asset = known_assets.get(asset['name'])
+            if db_asset is None:
+                db_asset = RemoteBuildAsset()
+                db_asset.name = asset['name']
+                db_build.assets.append(db_asset)
+
+            db_asset.url = asset['url']
+            db_asset.size = asset['size']
+
+    session.commit()
+
+    # Let the caller know which builds were already in the catalog
+    return set(known_builds)
+
+
+def get_remote_builds():
+    session = get_session()
+
+    db_builds = (session
+                 .query(RemoteBuild)
+                 .options(joinedload('assets'))
+                 .order_by(cast(RemoteBuild.number, Integer).desc())
+                 .all())
+
+    return [{
+        'number': db_build.number,
+        'released_on': db_build.released_on,
+        'assets': [{
+            'name': db_asset.name,
+            'url': db_asset.url,
+            'size': db_asset.size
+        } for db_asset in db_build.assets]
+    } for db_build in db_builds]
+
+
+def get_remote_builds_backfill_page():
+    """Return the next page of older releases to add to the remote build
+    catalog, or None once they are all in it."""
+    if config_true(get_config_value('remote_builds_backfilled', 'False')):
+        return None
+
+    page = get_config_value('remote_builds_backfill_page', '0')
+    return (int(page) if page.isdigit() else 0) + 1
+
+
+def set_remote_builds_backfill_page(page, complete):
+    """Remember the last page of older releases added to the remote build
+    catalog so an interrupted backfill goes on from there."""
+    set_config_value('remote_builds_backfill_page', page)
+    set_config_value('remote_builds_backfilled', complete)
+
+
+def get_changelog_builds():
+    session = get_session()
+
+    db_builds = (session
+                 .query(ChangelogBuild)
+                 .order_by(ChangelogBuild.number.desc())
+                 .all())
+
+    return [{
+        'number': db_build.number,
+        'status': db_build.status,
+        'locale': db_build.locale,
+        'html': db_build.html
+    } for db_build in db_builds]
+
+
+def save_changelog_builds(changelog_builds, locale, keep):
+    session = get_session()
+
+    numbers = [changelog_build['number'] for changelog_build in changelog_builds]
+    known_builds = {}
+    if len(numbers) > 0:
+        known_builds = {
+            x.number: x for x in (session
+                .query(ChangelogBuild)
+                .filter(ChangelogBuild.number.in_(numbers))
+                .all())
+        }
+
+    for changelog_build in changelog_builds:
+        db_build = known_builds.get(changelog_build['number'])
+        if db_build is None:
+            db_build = ChangelogBuild()
+            db_build.number = changelog_build['number']
+            session.add(db_build)
+
+        db_build.status = changelog_build['status']
+        db_build.locale = locale
+        db_build.html = changelog_build['html']
+        db_build.cached_on = datetime.utcnow()
+
+    session.flush()
+
+    # Only keep the most recent builds around
+    kept_numbers = (session
+                    .query(ChangelogBuild.number)
+                    .order_by(ChangelogBuild.number.desc())
+                    .limit(keep)
+                    .subquery())
+    (session
+     .query(ChangelogBuild)
+     .filter(ChangelogBuild.number.notin_(kept_numbers))
+     .delete(synchronize_session=False))
+
+    session.commit()
+
+
+def clear_changelog_builds():
+    session = get_session()
+
+    session.query(ChangelogBuild).delete()
+    session.commit()
+
+
+def get_mod_scans(mods_dir):
+    session = get_session()
+
+    db_scans = session.query(ModScan).filter_by(mods_dir=mods_dir).all()
+
+    return {db_scan.path: {
+        'mtime': db_scan.mtime,
+        'info': None if db_scan.info is None else json.loads(db_scan.info),
+        'size': db_scan.size
+    } for db_scan in db_scans}
+
+
+def save_mod_scans(mods_dir, mod_scans):
+    session = get_session()
+
+    known_scans = {x.path: x for x in (session
+        .query(ModScan)
+        .filter_by(mods_dir=mods_dir)
+        .all())}
+
+    for path, mod_scan in mod_scans.items():
+        db_scan = known_scans.pop(path, None)
+        if db_scan is None:
+            db_scan = ModScan()
+            db_scan.mods_dir = mods_dir
+            db_scan.path = path
+            session.add(db_scan)
+        elif db_scan.mtime == mod_scan['mtime']:
+            continue
+
+        db_scan.mtime = mod_scan['mtime']
+        db_scan.info = (None if mod_scan['info'] is None
+            else json.dumps(mod_scan['info']))
+        db_scan.size = mod_scan['size']
+        db_scan.scanned_on = datetime.utcnow()
+
+    # Mods which are gone from the directory
+    for db_scan in known_scans.values():
+        session.delete(db_scan)
+
+    session.commit()
+
+
+def get_remote_sizes(urls):
+    """Return the sizes of urls which were checked less than REMOTE_SIZE_TTL
+    seconds ago, and the size, ETag and Last-Modified of the older ones which
+    can be revalidated."""
+    session = get_session()
+
+    checked_after = datetime.utcnow() - timedelta(seconds=cons.REMOTE_SIZE_TTL)
+
+    sizes = {}
+    stale_sizes = {}
+    urls = list(urls)
+    for index in range(0, len(urls), cons.DB_MAX_IN_VALUES):
+        for db_size in (session
+                        .query(RemoteSize)
+                        .filter(RemoteSize.url.in_(
+                            urls[index:index + cons.DB_MAX_IN_VALUES]))
+                        .all()):
+            if db_size.checked_on >= checked_after:
+                sizes[db_size.url] = db_size.size
+            elif (db_size.etag is not None
+                or db_size.last_modified is not None):
+                stale_sizes[db_size.url] = (db_size.size, db_size.etag,
+                    db_size.last_modified)
+
+    return sizes, stale_sizes
+
+
+def set_remote_size(url, size, etag, last_modified):
+    session = get_session()
+
+    db_size = session.query(RemoteSize).filter_by(url=url).first()
+
+    if db_size is None:
+        db_size = RemoteSize()
+        db_size.url = url
+
+    db_size.size = size
+    db_size.etag = etag
+    db_size.last_modified = last_modified
+    db_size.checked_on = datetime.utcnow()
+    session.add(db_size)
+    session.commit()
+
+
+def get_soundpack_sizes(soundpacks_dir):
+    session = get_session()
+
+    db_sizes = (session
+                .query(SoundpackSize)
+                .filter_by(soundpacks_dir=soundpacks_dir)
+                .all())
+
+    return {db_size.path: {
+        'mtime': db_size.mtime,
+        'size': db_size.size
+    } for db_size in db_sizes}
+
+
+def set_soundpack_size(soundpacks_dir, path, mtime, size):
+    session = get_session()
+
+    db_size = session.query(SoundpackSize).filter_by(path=path).first()
+
+    if db_size is None:
+        db_size = SoundpackSize()
+        db_size.path = path
+
+    db_size.soundpacks_dir = soundpacks_dir
+    db_size.mtime = mtime
+    db_size.size = size
+    db_size.recorded_on = datetime.utcnow()
+    session.add(db_size)
+    session.commit()
+
+
+def keep_soundpack_sizes(soundpacks_dir, paths):
+    """Remove the sizes of the soundpacks in soundpacks_dir which are not in
+    paths."""
+    session = get_session()
+
+    paths = set(paths)
+    for db_size in (session
+                    .query(SoundpackSize)
+                    .filter_by(soundpacks_dir=soundpacks_dir)
+                    .all()):
+        if db_size.path not in paths:
+            session.delete(db_size)
+
+    session.commit()
+
+
 def config_true(value):
     return value == 'True' or value == '1'
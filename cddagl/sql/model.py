@@ -43,3 +43,84 @@ class GameBuild(Base):
     released_on = sa.Column(sa.DateTime, nullable=False)
     discovered_on = sa.Column(sa.DateTime, nullable=False,
         default=datetime.utcnow)
+
+
+class HttpCache(Base):
+    __tablename__ = 'http_cache'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    url = sa.Column(sa.String(255), nullable=False)
+    etag = sa.Column(sa.String(255), nullable=True)
+    last_modified = sa.Column(sa.String(64), nullable=True)
+    body = sa.Column(sa.LargeBinary, nullable=False)
+    fetched_on = sa.Column(sa.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class RemoteBuild(Base):
+    __tablename__ = 'remote_build'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    number = sa.Column(sa.String(16), nullable=False)
+    released_on = sa.Column(sa.DateTime, nullable=False)
+
+    assets = relationship('RemoteBuildAsset')
+
+    discovered_on = sa.Column(sa.DateTime, nullable=False,
+        default=datetime.utcnow)
+
+
+class RemoteBuildAsset(Base):
+    __tablename__ = 'remote_build_asset'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    build = sa.Column(sa.Integer, sa.ForeignKey(RemoteBuild.id),
+        nullable=False)
+    name = sa.Column(sa.String(255), nullable=False)
+    url = sa.Column(sa.Text(), nullable=False)
+    size = sa.Column(sa.Integer, nullable=True)
+
+
+class ChangelogBuild(Base):
+    __tablename__ = 'changelog_build'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    number = sa.Column(sa.Integer, nullable=False)
+    status = sa.Column(sa.String(16), nullable=False)
+    locale = sa.Column(sa.String(16), nullable=False)
+    html = sa.Column(sa.Text(), nullable=False)
+    cached_on = sa.Column(sa.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ModScan(Base):
+    __tablename__ = 'mod_scan'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    mods_dir = sa.Column(sa.Text(), nullable=False)
+    path = sa.Column(sa.Text(), nullable=False)
+    mtime = sa.Column(sa.Float, nullable=False)
+    info = sa.Column(sa.Text(), nullable=True)
+    size = sa.Column(sa.Integer, nullable=True)
+    scanned_on = sa.Column(sa.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class RemoteSize(Base):
+    __tablename__ = 'remote_size'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    url = sa.Column(sa.Text(), nullable=False)
+    size = sa.Column(sa.Integer, nullable=False)
+    etag = sa.Column(sa.String(255), nullable=True)
+    last_modified = sa.Column(sa.String(64), nullable=True)
+    checked_on = sa.Column(sa.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class SoundpackSize(Base):
+    __tablename__ = 'soundpack_size'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    soundpacks_dir = sa.Column(sa.Text(), nullable=False)
+    path = sa.Column(sa.Text(), nullable=False)
+    mtime = sa.Column(sa.Float, nullable=False)
+    size = sa.Column(sa.Integer, nullable=False)
+    recorded_on = sa.Column(sa.DateTime, nullable=False,
+        default=datetime.utcnow)
@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+logger = logging.getLogger('cddagl')
+
+TRACE_ENV_VAR = 'CDDAGL_TRACE_STARTUP'
+TRACE_ARG = '--trace-startup'
+TRACE_FILE_NAME = 'startup_trace.json'
+
+# None while tracing is disabled, so marking a phase is a single check
+_phases = None
+_started = None
+
+
+def init_startup_trace(argv=None):
+    """Start the startup trace if it was requested with the environment
+    variable or the command line flag."""
+    global _phases, _started
+
+    if argv is None:
+        argv = sys.argv
+
+    if os.environ.get(TRACE_ENV_VAR, '') in ('', '0') and TRACE_ARG not in argv:
+        return False
+
+    _started = time.perf_counter()
+    _phases = []
+
+    return True
+
+
+def mark_startup_phase(name):
+    """Record the end of a named startup phase. Only the first mark of a name
+    is kept."""
+    if _phases is None:
+        return
+
+    if any(phase_name == name for phase_name, _ in _phases):
+        return
+
+    _phases.append((name, time.perf_counter()))
+
+
+def get_trace_path():
+    local_app_data = os.environ.get('LOCALAPPDATA', os.environ.get('APPDATA'))
+    if local_app_data is None or not os.path.isdir(local_app_data):
+        local_app_data = ''
+
+    trace_dir = os.path.join(local_app_data, 'CDDA Game Launcher')
+
+    if not os.path.isdir(trace_dir):
+        os.makedirs(trace_dir)
+
+    return os.path.join(trace_dir, TRACE_FILE_NAME)
+
+
+def finish_startup_trace():
+    """Stop the startup trace and write its summary in the log and in a JSON
+    file next to it."""
+    global _phases
+
+    if _phases is None:
+        return
+
+    phases = []
+    previous = _started
+    for name, timestamp in _phases:
+        phases.append({
+            'name': name,
+            'at_ms': round((timestamp - _started) * 1000, 3),
+            'duration_ms': round((timestamp - previous) * 1000, 3)
+        })
+        previous = timestamp
+
+    _phases = None
+
+    lines = ['Startup trace:']
+    for phase in phases:
+        lines.append('  {name:<24} {duration:9.1f} ms {at:9.1f} ms'.format(
+            name=phase['name'], duration=phase['duration_ms'],
+            at=phase['at_ms']))
+    logger.info('\n'.join(lines))
+
+    trace_path = get_trace_path()
+    try:
+        with open(trace_path, 'w', encoding='utf8') as trace_file:
+            json.dump({
+                'recorded_on': datetime.now().isoformat(),
+                'frozen': getattr(sys, 'frozen', False),
+                'phases': phases
+            }, trace_file, indent=2)
+    except OSError:
+        logger.exception('Could not write startup trace to {path}'.format(
+            path=trace_path))
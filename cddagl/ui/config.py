@@ -0,0 +1,13 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from cddagl.sql.functions import add_config_listener
+
+
+# Forward config changes as a Qt signal. The signal is queued to the GUI thread
+# when a value is changed from another thread.
+class ConfigSignals(QObject):
+    changed = pyqtSignal(str, str)
+
+
+config_signals = ConfigSignals()
+add_config_listener(config_signals.changed.emit)
@@ -0,0 +1,40 @@
+from PyQt5.QtCore import QPoint, QSortFilterProxyModel
+
+
+class SearchFilterProxyModel(QSortFilterProxyModel):
+    """Only show the rows of the source model matching a query on a
+    SearchIndex built from the same entries."""
+
+    def __init__(self, search_index):
+        super(SearchFilterProxyModel, self).__init__()
+
+        self.search_index = search_index
+        self.matches = None
+
+    def set_query(self, query):
+        matches = self.search_index.search(query)
+        if matches != self.matches:
+            self.matches = matches
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.matches is None or source_row in self.matches
+
+
+def visible_source_rows(list_view):
+    """Return the source model rows shown in a list view using a proxy
+    model."""
+    model = list_view.model()
+    if model is None or model.rowCount() == 0:
+        return []
+
+    first = list_view.indexAt(QPoint(0, 0)).row()
+    if first == -1:
+        first = 0
+    last = list_view.indexAt(QPoint(0, list_view.viewport().height() - 1)
+        ).row()
+    if last == -1:
+        last = model.rowCount() - 1
+
+    return [model.mapToSource(model.index(row, 0)).row()
+        for row in range(first, last + 1)]
@@ -0,0 +1,138 @@
+import time
+
+from collections import deque
+
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+
+import cddagl.constants as cons
+from cddagl.functions import tryint
+from cddagl.sql.functions import get_remote_sizes, set_remote_size
+
+
+class RemoteSizeFetcher(QObject):
+    """Find the size of remote files with HEAD requests, a few at a time.
+
+    Sizes found are kept in the config database for REMOTE_SIZE_TTL seconds
+    so the next sessions know them without asking again. After that, they are
+    revalidated with their ETag or Last-Modified. size_found is emitted with
+    None as the size when it could not be found, and that url is not asked
+    again for REMOTE_SIZE_RETRY_DELAY seconds.
+    """
+
+    size_found = pyqtSignal(str, object)
+
+    def __init__(self):
+        super(RemoteSizeFetcher, self).__init__()
+
+        self.qnam = QNetworkAccessManager()
+        self.pending = deque()
+        self.replies = {}
+        self.sizes = {}
+        self.stale_sizes = {}
+        self.failed_on = {}
+
+    def load_cached(self, urls):
+        """Return the sizes of urls which are still in the config
+        database."""
+        cached_sizes, stale_sizes = get_remote_sizes(urls)
+        self.sizes.update(cached_sizes)
+        self.stale_sizes.update(stale_sizes)
+        return cached_sizes
+
+    def size_unknown(self, url):
+        """Return True when the size of url could not be found a moment
+        ago."""
+        failed_on = self.failed_on.get(url, None)
+        return (failed_on is not None
+            and time.monotonic() - failed_on < cons.REMOTE_SIZE_RETRY_DELAY)
+
+    def fetch(self, urls, first=False):
+        """Queue the urls which size is not known yet. With first, they are
+        requested before the ones already waiting."""
+        running = set(self.replies.values())
+        new_urls = [url for url in urls if url not in self.sizes
+            and url not in running and not self.size_unknown(url)]
+
+        if first:
+            for url in new_urls:
+                if url in self.pending:
+                    self.pending.remove(url)
+            self.pending.extendleft(reversed(new_urls))
+        else:
+            self.pending.extend(url for url in new_urls
+                if url not in self.pending)
+
+        self.start_requests()
+
+    def stop(self):
+        self.pending.clear()
+
+        replies = self.replies
+        self.replies = {}
+        for reply in replies:
+            reply.abort()
+
+    def start_requests(self):
+        while (len(self.replies) < cons.REMOTE_SIZE_MAX_REQUESTS
+            and len(self.pending) > 0):
+            url = self.pending.popleft()
+
+            request = QNetworkRequest(QUrl(url))
+            request.setRawHeader(b'User-Agent', cons.FAKE_USER_AGENT)
+            request.setAttribute(QNetworkRequest.FollowRedirectsAttribute,
+                True)
+            if url in self.stale_sizes:
+                size, etag, last_modified = self.stale_sizes[url]
+                if etag is not None:
+                    request.setRawHeader(b'If-None-Match',
+                        etag.encode('ascii'))
+                if last_modified is not None:
+                    request.setRawHeader(b'If-Modified-Since',
+                        last_modified.encode('ascii'))
+
+            reply = self.qnam.head(request)
+            reply.finished.connect(lambda reply=reply:
+                self.reply_finished(reply))
+            self.replies[reply] = url
+
+    def reply_finished(self, reply):
+        reply.deleteLater()
+
+        url = self.replies.pop(reply, None)
+        if url is None:
+            # Stopped
+            return
+
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        size = None
+        etag = None
+        last_modified = None
+        if status == 304 and url in self.stale_sizes:
+            # Not modified since the size was found
+            size, etag, last_modified = self.stale_sizes[url]
+        elif status == 200 and reply.hasRawHeader(b'Content-Length'):
+            size = tryint(bytes(reply.rawHeader(b'Content-Length')
+                ).decode('ascii', 'replace'))
+            if not isinstance(size, int):
+                size = None
+
+        if size is not None:
+            if reply.hasRawHeader(b'ETag'):
+                etag = bytes(reply.rawHeader(b'ETag')).decode('ascii',
+                    'replace')
+            if reply.hasRawHeader(b'Last-Modified'):
+                last_modified = bytes(reply.rawHeader(b'Last-Modified')
+                    ).decode('ascii', 'replace')
+
+            set_remote_size(url, size, etag, last_modified)
+
+            self.sizes[url] = size
+            self.stale_sizes.pop(url, None)
+            self.failed_on.pop(url, None)
+        else:
+            self.failed_on[url] = time.monotonic()
+
+        self.size_found.emit(url, size)
+
+        self.start_requests()
@@ -2,7 +2,6 @@ import html
 import json
 import logging
 import os
-import random
 import zipfile
 from collections import deque
 from datetime import datetime, timedelta
@@ -18,9 +17,12 @@ from PyQt5.QtWidgets import (
 from babel.dates import format_datetime
 from babel.numbers import format_percent
 
-import cddagl.constants as cons
 from cddagl.functions import sizeof_fmt, safe_filename, alphanum_key, delete_path
+from cddagl.fileops import (backup_summary, backup_file_name,
+    tree_entries, SavesArchive, saves_backup_dir, restored_backup_path,
+    temp_save_path)
 from cddagl.i18n import proxy_gettext as _
+from cddagl.metrics import metrics
 from cddagl.sql.functions import get_config_value, set_config_value, config_true
 from cddagl.win32 import find_process_with_file_handle
 
@@ -43,6 +45,9 @@ class BackupsTab(QTabWidget):
 
         self.compressing_timer = None
 
+        self.compress_span = None
+        self.extract_span = None
+
         current_backups_gb = QGroupBox()
         self.current_backups_gb = current_backups_gb
 
@@ -393,38 +398,13 @@ class BackupsTab(QTabWidget):
                 If restoring the before_last_restore, we rename it to make sure
                 we make a proper backup first.
                 '''
-                model = selection_model.model()
-                backup_name = model.data(model.index(selected.row(), 0))
-
                 before_last_restore_name = _('before_last_restore')
 
-                if backup_name.lower() == before_last_restore_name.lower():
-                    backup_dir = os.path.join(self.game_dir, 'save_backups')
-
-                    name_lower = backup_name.lower()
-                    name_key = alphanum_key(name_lower)
-                    max_counter = 1
-
-                    for entry in scandir(backup_dir):
-                        filename, ext = os.path.splitext(entry.name)
-                        if ext.lower() == '.zip':
-                            filename_lower = filename.lower()
-
-                            filename_key = alphanum_key(filename_lower)
-
-                            counter = filename_key[-1:][0]
-                            if len(filename_key) > 1 and isinstance(counter,
-                                int):
-                                filename_key = filename_key[:-1]
-
-                                if name_key == filename_key:
-                                    max_counter = max(max_counter, counter)
-
-                    new_backup_name = (before_last_restore_name +
-                        str(max_counter + 1))
-                    new_backup_path = os.path.join(backup_dir,
-                        new_backup_name + '.zip')
+                backup_dir = os.path.join(self.game_dir, 'save_backups')
+                new_backup_path = restored_backup_path(selected_info['path'],
+                    backup_dir, before_last_restore_name)
 
+                if new_backup_path is not None:
                     if not retry_rename(selected_info['path'], new_backup_path):
                         return
 
@@ -463,11 +443,7 @@ class BackupsTab(QTabWidget):
         self.temp_save_dir = None
         save_dir = os.path.join(self.game_dir, 'save')
         if os.path.isdir(save_dir):
-            temp_save_dir = os.path.join(self.game_dir, 'save-{0}'.format(
-                '%08x' % random.randrange(16**8)))
-            while os.path.exists(temp_save_dir):
-                temp_save_dir = os.path.join(self.game_dir, 'save-{0}'.format(
-                    '%08x' % random.randrange(16**8)))
+            temp_save_dir = temp_save_path(self.game_dir)
 
             if not retry_rename(save_dir, temp_save_dir):
                 status_bar.showMessage(_('Could not rename the save directory'))
@@ -567,6 +543,7 @@ class BackupsTab(QTabWidget):
             except IndexError:
                 self.extracting_backup = False
                 self.extracting_thread = None
+                self.extract_span.finish()
 
                 self.finish_restore_backup()
 
@@ -578,6 +555,7 @@ class BackupsTab(QTabWidget):
 
         def completed_extract():
             self.extract_size += self.next_extract_file.file_size
+            self.extract_span.add_bytes(self.next_extract_file.file_size)
             self.extracting_progress_bar.setValue(self.extract_size)
 
             self.extracting_size_label.setText(
@@ -602,6 +580,8 @@ class BackupsTab(QTabWidget):
 
         self.extracting_zipfile = zipfile.ZipFile(selected_info['path'])
         self.extracting_infolist = deque(self.extracting_zipfile.infolist())
+        self.extract_span = metrics.start_span('restore',
+            path=selected_info['path'])
         extract_next_file()
 
     def finish_restore_backup(self):
@@ -617,6 +597,10 @@ class BackupsTab(QTabWidget):
 
         self.extracting_backup = False
 
+        # Only still running when the restore was cancelled
+        if self.extract_span is not None:
+            self.extract_span.finish(False)
+
         if self.extracting_zipfile is not None:
             self.extracting_zipfile.close()
 
@@ -789,12 +773,7 @@ class BackupsTab(QTabWidget):
             return
         self.save_dir = save_dir
 
-        backup_dir = os.path.join(self.game_dir, 'save_backups')
-        if not os.path.isdir(backup_dir):
-            if os.path.isfile(backup_dir):
-                os.remove(backup_dir)
-
-            os.makedirs(backup_dir)
+        backup_dir = saves_backup_dir(self.game_dir)
 
         if single:
             backup_filename = name + '.zip'
@@ -805,56 +784,10 @@ class BackupsTab(QTabWidget):
                         'backup archive'))
                     return
         else:
-            '''
-            Finding a backup filename which does not already exists or is the
-            next backup name based on an incremental counter placed at the end
-            of the filename without the extension.
-            '''
-
-            name_lower = name.lower()
-            name_key = alphanum_key(name_lower)
-            if len(name_key) > 1 and isinstance(name_key[-1:][0], int):
-                name_key = name_key[:-1]
-
-            duplicate_name = False
-            duplicate_basename = False
-            max_counter = 0
-
-            for entry in scandir(backup_dir):
-                filename, ext = os.path.splitext(entry.name)
-                if entry.is_file() and ext.lower() == '.zip':
-                    filename_lower = filename.lower()
-
-                    if filename_lower == name_lower:
-                        duplicate_name = True
-                    else:
-                        filename_key = alphanum_key(filename_lower)
-
-                        counter = filename_key[-1:][0]
-                        if len(filename_key) > 1 and isinstance(counter, int):
-                            filename_key = filename_key[:-1]
-
-                            if name_key == filename_key:
-                                duplicate_basename = True
-                                max_counter = max(max_counter, counter)
-
-            if duplicate_basename:
-                name_key = alphanum_key(name)
-                if len(name_key) > 1 and isinstance(name_key[-1:][0], int):
-                    name_key = name_key[:-1]
-
-                name_key.append(max_counter + 1)
-                backup_filename = ''.join(map(lambda x: str(x), name_key))
-            elif duplicate_name:
-                backup_filename = name + '2'
-            else:
-                backup_filename = name
-
-            backup_filename = backup_filename + '.zip'
-
+            backup_filename = backup_file_name(backup_dir, name)
             self.backup_path = os.path.join(backup_dir, backup_filename)
 
-        self.backup_file = None
+        self.saves_archive = SavesArchive(self.game_dir, self.backup_path)
 
         status_bar.clearMessage()
         status_bar.busy += 1
@@ -873,14 +806,7 @@ class BackupsTab(QTabWidget):
         self.backup_searching = True
         self.backup_compressing = False
 
-        self.backup_files = deque()
-        self.backup_file_sizes = {}
-
-        self.backup_scan = None
-        self.next_backup_scans = deque()
-
-        self.total_backup_size = 0
-        self.total_files = 0
+        self.backup_entries = tree_entries(self.save_dir)
 
         self.disable_tab()
         self.get_main_tab().disable_tab()
@@ -896,69 +822,53 @@ class BackupsTab(QTabWidget):
         compressing_label.setText(_('Searching for save files'))
 
         def timeout():
-            if self.backup_scan is None:
-                self.backup_scan = scandir(self.save_dir)
-            else:
-                try:
-                    entry = next(self.backup_scan)
-
-                    if entry.is_file():
-                        self.compressing_label.setText(
-                            _('Found {filename} in {path}').format(
-                                filename=entry.name,
-                                path=os.path.dirname(entry.path)))
-                        self.backup_files.append(entry.path)
-                        self.total_backup_size += entry.stat().st_size
-                        self.backup_file_sizes[entry.path
-                            ] = entry.stat().st_size
-                        self.total_files += 1
-                    elif entry.is_dir():
-                        self.next_backup_scans.append(entry.path)
-                except StopIteration:
-                    try:
-                        self.backup_scan = scandir(
-                            self.next_backup_scans.popleft())
-                    except IndexError:
-                        self.backup_searching = False
-                        self.backup_compressing = True
-
-                        self.compressing_label.setText(
-                            _('Compressing save files'))
-
-                        compressing_speed_label = QLabel()
-                        compressing_speed_label.setText(_('{bytes_sec}/s'
-                            ).format(bytes_sec=sizeof_fmt(0)))
-                        status_bar.addWidget(compressing_speed_label)
-                        self.compressing_speed_label = (
-                            compressing_speed_label)
-
-                        compressing_size_label = QLabel()
-                        compressing_size_label.setText(
-                            '{bytes_read}/{total_bytes}'
-                            .format(bytes_read=sizeof_fmt(0),
-                                    total_bytes=sizeof_fmt(self.total_backup_size))
-                        )
-                        status_bar.addWidget(compressing_size_label)
-                        self.compressing_size_label = (
-                            compressing_size_label)
-
-                        progress_bar = QProgressBar()
-                        progress_bar.setRange(0, self.total_backup_size)
-                        progress_bar.setValue(0)
-                        status_bar.addWidget(progress_bar)
-                        self.compressing_progress_bar = progress_bar
-
-                        self.comp_size = 0
-                        self.comp_files = 0
-                        self.last_comp_bytes = 0
-                        self.last_comp = datetime.utcnow()
-                        self.next_backup_file = None
-
-                        if self.compressing_timer is not None:
-                            self.compressing_timer.stop()
-                            self.compressing_timer = None
+            try:
+                entry = next(self.backup_entries)
 
-                        self.backup_saves_step2()
+                if entry.is_file():
+                    self.compressing_label.setText(
+                        _('Found {filename} in {path}').format(
+                            filename=entry.name,
+                            path=os.path.dirname(entry.path)))
+                    self.saves_archive.add_file(entry)
+            except StopIteration:
+                self.backup_searching = False
+                self.backup_compressing = True
+
+                self.compressing_label.setText(_('Compressing save files'))
+
+                compressing_speed_label = QLabel()
+                compressing_speed_label.setText(_('{bytes_sec}/s'
+                    ).format(bytes_sec=sizeof_fmt(0)))
+                status_bar.addWidget(compressing_speed_label)
+                self.compressing_speed_label = compressing_speed_label
+
+                compressing_size_label = QLabel()
+                compressing_size_label.setText(
+                    '{bytes_read}/{total_bytes}'
+                    .format(bytes_read=sizeof_fmt(0),
+                        total_bytes=sizeof_fmt(self.saves_archive.total_size))
+                )
+                status_bar.addWidget(compressing_size_label)
+                self.compressing_size_label = compressing_size_label
+
+                progress_bar = QProgressBar()
+                progress_bar.setRange(0, self.saves_archive.total_size)
+                progress_bar.setValue(0)
+                status_bar.addWidget(progress_bar)
+                self.compressing_progress_bar = progress_bar
+
+                self.comp_size = 0
+                self.comp_files = 0
+                self.last_comp_bytes = 0
+                self.last_comp = datetime.utcnow()
+                self.next_backup_file = None
+
+                if self.compressing_timer is not None:
+                    self.compressing_timer.stop()
+                    self.compressing_timer = None
+
+                self.backup_saves_step2()
 
         timer.timeout.connect(timeout)
         timer.start(0)
@@ -968,32 +878,31 @@ class BackupsTab(QTabWidget):
         class CompressThread(QThread):
             completed = pyqtSignal()
 
-            def __init__(self, zfile, filename, arcname):
+            def __init__(self, saves_archive, filename):
                 super(CompressThread, self).__init__()
 
-                self.zfile = zfile
+                self.saves_archive = saves_archive
                 self.filename = filename
-                self.arcname = arcname
 
             def __del__(self):
                 self.wait()
 
             def run(self):
-                self.zfile.write(self.filename, self.arcname)
+                self.saves_archive.compress(self.filename)
                 self.completed.emit()
 
         def backup_next_file():
             try:
                 if self.backup_compressing:
-                    next_file = self.backup_files.popleft()
+                    next_file = self.saves_archive.files.popleft()
                     relpath = os.path.relpath(next_file, self.game_dir)
                     self.next_backup_file = next_file
 
                     self.compressing_label.setText(
                         _('Compressing {filename}').format(filename=relpath))
 
-                    compress_thread = CompressThread(self.backup_file,
-                        next_file, relpath)
+                    compress_thread = CompressThread(self.saves_archive,
+                        next_file)
                     compress_thread.completed.connect(completed_compress)
                     self.compress_thread = compress_thread
 
@@ -1002,6 +911,7 @@ class BackupsTab(QTabWidget):
             except IndexError:
                 self.backup_compressing = False
                 self.compress_thread = None
+                self.compress_span.finish()
 
                 self.finish_backup_saves()
 
@@ -1017,13 +927,15 @@ class BackupsTab(QTabWidget):
                 self.update_backups_table()
 
         def completed_compress():
-            self.comp_size += self.backup_file_sizes[self.next_backup_file]
+            file_size = self.saves_archive.file_sizes[self.next_backup_file]
+            self.comp_size += file_size
+            self.compress_span.add_bytes(file_size)
             self.compressing_progress_bar.setValue(self.comp_size)
 
             self.compressing_size_label.setText(
                 '{bytes_read}/{total_bytes}'
                 .format(bytes_read=sizeof_fmt(self.comp_size),
-                        total_bytes=sizeof_fmt(self.total_backup_size))
+                        total_bytes=sizeof_fmt(self.saves_archive.total_size))
             )
 
             delta_bytes = self.comp_size - self.last_comp_bytes
@@ -1040,13 +952,17 @@ class BackupsTab(QTabWidget):
 
             backup_next_file()
 
-        self.backup_file = zipfile.ZipFile(self.backup_path, 'w',
-            zipfile.ZIP_DEFLATED)
+        self.saves_archive.open()
+        self.compress_span = metrics.start_span('backup',
+            path=self.backup_path)
         backup_next_file()
 
     def finish_backup_saves(self):
-        if self.backup_file is not None:
-            self.backup_file.close()
+        self.saves_archive.close()
+
+        # Only still running when the backup was cancelled
+        if self.compress_span is not None:
+            self.compress_span.finish(False)
 
         main_window = self.get_main_window()
         status_bar = main_window.statusBar()
@@ -1155,27 +1071,13 @@ class BackupsTab(QTabWidget):
                 entry = next(self.backups_scan)
                 filename, ext = os.path.splitext(entry.name)
                 if ext.lower() == '.zip':
-                    uncompressed_size = 0
-                    character_count = 0
-                    worlds_set = set()
-                    try:
-                        with zipfile.ZipFile(entry.path) as zfile:
-                            for info in zfile.infolist():
-                                if not info.filename.startswith('save/'):
-                                    return
-
-                                uncompressed_size += info.file_size
-
-                                path_items = info.filename.split('/')
-
-                                if len(path_items) == 3:
-                                    save_file = path_items[-1]
-                                    if save_file.endswith('.sav'):
-                                        character_count += 1
-                                    if save_file in cons.WORLD_FILES:
-                                        worlds_set.add(path_items[1])
-                    except zipfile.BadZipFile:
-                        pass
+                    summary = backup_summary(entry.path)
+                    if summary is None:
+                        return
+
+                    uncompressed_size = summary['uncompressed_size']
+                    character_count = summary['character_count']
+                    worlds_set = summary['worlds']
 
                     # We found a valid backup
 
@@ -9,14 +9,16 @@ from urllib.parse import urlencode
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
     QWidget, QGridLayout, QLabel, QLineEdit, QPushButton, QFileDialog, QToolButton,
-    QDialog, QTextBrowser, QMessageBox, QHBoxLayout, QTextEdit
+    QDialog, QTextBrowser, QMessageBox, QHBoxLayout, QTextEdit, QTableWidget,
+    QTableWidgetItem, QAbstractItemView, QHeaderView
 )
 
 import cddagl.constants as cons
 from cddagl import __version__ as version
 from cddagl.constants import get_resource_path
-from cddagl.functions import clean_qt_path, bitness
+from cddagl.functions import clean_qt_path, bitness, sizeof_fmt
 from cddagl.i18n import proxy_gettext as _
+from cddagl.metrics import metrics
 from cddagl.win32 import get_downloads_directory
 
 logger = logging.getLogger('cddagl')
@@ -226,6 +228,118 @@ class AboutDialog(QDialog):
         self.text_content.setHtml(m)
 
 
+class DiagnosticsDialog(QDialog):
+    def __init__(self, parent=0, f=0):
+        super(DiagnosticsDialog, self).__init__(parent, f)
+
+        layout = QGridLayout()
+
+        operations_label = QLabel()
+        layout.addWidget(operations_label, 0, 0, 1, 3)
+        self.operations_label = operations_label
+
+        operations_table = QTableWidget()
+        operations_table.setColumnCount(7)
+        operations_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        operations_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        operations_table.verticalHeader().setVisible(False)
+        operations_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeToContents)
+        operations_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(operations_table, 1, 0, 1, 3)
+        self.operations_table = operations_table
+
+        refresh_button = QPushButton()
+        refresh_button.clicked.connect(self.refresh)
+        layout.addWidget(refresh_button, 2, 0, Qt.AlignLeft)
+        self.refresh_button = refresh_button
+
+        export_button = QPushButton()
+        export_button.clicked.connect(self.export)
+        layout.addWidget(export_button, 2, 1, Qt.AlignLeft)
+        self.export_button = export_button
+
+        ok_button = QPushButton()
+        ok_button.clicked.connect(self.done)
+        layout.addWidget(ok_button, 2, 2, Qt.AlignRight)
+        self.ok_button = ok_button
+
+        layout.setRowStretch(1, 100)
+        layout.setColumnStretch(2, 100)
+
+        self.setMinimumSize(760, 400)
+
+        self.setLayout(layout)
+        self.set_text()
+        self.refresh()
+
+    def set_text(self):
+        self.setWindowTitle(_('Diagnostics'))
+        self.operations_label.setText(_('Recent operations'))
+        self.operations_table.setHorizontalHeaderLabels((_('Operation'),
+            _('Started'), _('Duration'), _('Size'), _('Speed'), _('Result'),
+            _('Target')))
+        self.refresh_button.setText(_('Refresh'))
+        self.export_button.setText(_('Export...'))
+        self.ok_button.setText(_('OK'))
+
+    def operation_name(self, name):
+        if name == 'download': return _('Download')
+        if name == 'extract': return _('Extraction')
+        if name == 'copy': return _('Copy')
+        if name == 'hash': return _('Hashing')
+        if name == 'backup': return _('Backup')
+        if name == 'restore': return _('Restore')
+        return name
+
+    def refresh(self):
+        operations = metrics.recent_operations()
+
+        self.operations_table.setRowCount(len(operations))
+        for row, span in enumerate(operations):
+            if span.throughput is not None:
+                speed = _('{bytes_sec}/s').format(
+                    bytes_sec=sizeof_fmt(span.throughput))
+            else:
+                speed = ''
+
+            target = (span.details.get('url') or span.details.get('path')
+                or span.details.get('src') or '')
+
+            values = (
+                self.operation_name(span.name),
+                span.started_on.strftime('%Y-%m-%d %H:%M:%S'),
+                _('{seconds:.1f} s').format(seconds=span.duration),
+                sizeof_fmt(span.bytes),
+                speed,
+                _('Completed') if span.success else _('Cancelled or failed'),
+                target
+            )
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 6:
+                    item.setToolTip(value)
+                self.operations_table.setItem(row, column, item)
+
+    def export(self):
+        export_path, selected_filter = QFileDialog.getSaveFileName(self,
+            _('Export diagnostics'), 'cddagl-diagnostics.json',
+            _('JSON files (*.json)'))
+
+        if export_path == '':
+            return
+
+        try:
+            metrics.export_json(clean_qt_path(export_path))
+        except OSError as e:
+            error_msgbox = QMessageBox()
+            error_msgbox.setWindowTitle(_('Cannot export diagnostics'))
+            error_msgbox.setText(html.escape(str(e)))
+            error_msgbox.addButton(_('OK'), QMessageBox.YesRole)
+            error_msgbox.setIcon(QMessageBox.Critical)
+            error_msgbox.exec()
+
+
 class ExceptionWindow(QWidget):
     def __init__(self, app, extype, value, tb):
         super(ExceptionWindow, self).__init__()
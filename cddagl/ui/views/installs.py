@@ -0,0 +1,435 @@
+import logging
+import os
+import tempfile
+from collections import deque
+
+from PyQt5.QtCore import QObject, QThread, QUrl, QFileInfo, pyqtSignal
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PyQt5.QtWidgets import (
+    QWidget, QGroupBox, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar,
+    QPushButton
+)
+
+import cddagl.constants as cons
+from cddagl.archives import ArchiveError, extract_dirs
+from cddagl.fileops import InstallError
+from cddagl.functions import sizeof_fmt, delete_path
+from cddagl.i18n import proxy_gettext as _
+from cddagl.sql.functions import get_config_value
+
+logger = logging.getLogger('cddagl')
+
+QUEUED = 'queued'
+DOWNLOADING = 'downloading'
+WAITING_EXTRACTION = 'waiting_extraction'
+EXTRACTING = 'extracting'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class ArchiveExtractThread(QThread):
+    '''Extract the parts of an archive picked by plan_function straight
+    into install_dir, see extract_dirs. plan_function can also raise
+    InstallError.'''
+
+    # Sizes in bytes, which can be over the range of int
+    progress = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, archive_path, install_dir, plan_function,
+        target_dirs, target_sizes):
+        super(ArchiveExtractThread, self).__init__()
+
+        self.archive_path = archive_path
+        self.install_dir = install_dir
+        self.plan_function = plan_function
+        self.target_dirs = target_dirs
+        self.target_sizes = target_sizes
+
+    def __del__(self):
+        self.wait()
+
+    def run(self):
+        try:
+            extract_dirs(self.archive_path, self.install_dir,
+                self.plan_function, self.target_dirs, self.target_sizes,
+                self.progress.emit, self.isInterruptionRequested)
+        except (ArchiveError, InstallError, OSError) as e:
+            self.failed.emit(str(e))
+
+
+class InstallItem(QObject):
+    '''A repository entry going through an InstallQueue. Entries downloaded
+    from a browser start with their downloaded_file and skip the download.'''
+
+    changed = pyqtSignal()
+    extracted = pyqtSignal()
+
+    def __init__(self, repo_info, install_dir, downloaded_file=None):
+        super(InstallItem, self).__init__()
+
+        self.repo_info = repo_info
+        self.install_dir = install_dir
+        self.downloaded_file = downloaded_file
+
+        self.state = QUEUED
+        self.message = ''
+        self.progress_value = 0
+        self.progress_maximum = 0
+
+        self.download_dir = None
+        self.download_reply = None
+        self.downloading_file = None
+        self.download_first_ready = True
+        self.extract_thread = None
+        self.target_dirs = []
+        self.target_sizes = {}
+        self.failure = None
+
+    @property
+    def name(self):
+        return self.repo_info.get('viewname', self.repo_info.get('name', ''))
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    def set_state(self, state, message=''):
+        self.state = state
+        self.message = message
+        self.changed.emit()
+
+    def set_progress(self, value, maximum):
+        self.progress_value = value
+        self.progress_maximum = maximum
+        self.changed.emit()
+
+    def set_failure(self, message):
+        self.failure = message
+
+    def extract_thread_finished(self):
+        self.extract_thread = None
+        self.extracted.emit()
+
+
+class InstallQueue(QObject):
+    '''Download and extract repository entries in parallel.
+
+    Downloads run up to the max_parallel_installs config value at a time.
+    Archives are extracted on worker threads directly in the install
+    directory of the items, see ArchiveExtractThread for plan_function.
+    install_function is then called on the GUI thread to add the item to
+    the tab. It returns the message to show for the item or raises
+    InstallError.
+    '''
+
+    item_added = pyqtSignal(object)
+    item_finished = pyqtSignal(object)
+    started = pyqtSignal()
+    emptied = pyqtSignal()
+
+    def __init__(self, plan_function, install_function):
+        super(InstallQueue, self).__init__()
+
+        self.plan_function = plan_function
+        self.install_function = install_function
+
+        self.qnam = QNetworkAccessManager()
+        self.items = []
+        self.pending_extractions = deque()
+
+    def has_url(self, url):
+        return any(item.repo_info.get('url', None) == url
+            for item in self.items)
+
+    def add(self, item):
+        started = len(self.items) == 0
+        self.items.append(item)
+        item.extracted.connect(lambda item=item:
+            self.extraction_finished(item))
+        self.item_added.emit(item)
+        if started:
+            self.started.emit()
+
+        if item.downloaded_file is not None:
+            self.queue_extraction(item)
+        else:
+            self.start_downloads()
+
+    def cancel(self, item):
+        if item.finished:
+            return
+
+        if item.state == DOWNLOADING:
+            reply = item.download_reply
+            item.download_reply = None
+            reply.abort()
+        elif item.state == EXTRACTING:
+            item.extract_thread.requestInterruption()
+            item.extract_thread.wait()
+        elif item.state == WAITING_EXTRACTION:
+            self.pending_extractions.remove(item)
+
+        self.finish(item, CANCELLED, _('Installation of {name} cancelled'
+            ).format(name=item.name))
+
+    def cancel_all(self):
+        for item in list(self.items):
+            self.cancel(item)
+
+    def start_downloads(self):
+        max_downloads = int(get_config_value('max_parallel_installs',
+            str(cons.MAX_PARALLEL_INSTALLS)))
+        downloading = sum(1 for item in self.items
+            if item.state == DOWNLOADING)
+        for item in self.items:
+            if downloading >= max_downloads:
+                break
+            if item.state == QUEUED and item.downloaded_file is None:
+                self.start_download(item)
+                downloading += 1
+
+    def start_download(self, item):
+        download_dir = tempfile.mkdtemp(prefix=cons.TEMP_PREFIX)
+        item.download_dir = download_dir
+
+        url = QUrl(item.repo_info['url'])
+        file_name = QFileInfo(url.path()).fileName()
+        item.downloaded_file = os.path.join(download_dir, file_name)
+
+        request = QNetworkRequest(url)
+        request.setRawHeader(b'User-Agent', cons.FAKE_USER_AGENT)
+        request.setAttribute(QNetworkRequest.FollowRedirectsAttribute, True)
+
+        reply = self.qnam.get(request)
+        reply.readyRead.connect(lambda item=item:
+            self.download_ready_read(item))
+        reply.downloadProgress.connect(lambda bytes_read, total_bytes,
+            item=item: self.download_progress(item, bytes_read, total_bytes))
+        reply.finished.connect(lambda item=item, reply=reply:
+            self.download_finished(item, reply))
+        item.download_reply = reply
+
+        item.set_state(DOWNLOADING, _('Downloading'))
+
+    def download_ready_read(self, item):
+        reply = item.download_reply
+        if reply is None:
+            return
+
+        if item.download_first_ready:
+            item.download_first_ready = False
+
+            # Inspect headers for file name
+            for header_name, header_value in reply.rawHeaderPairs():
+                header_name = header_name.data().decode('iso-8859-1',
+                    'ignore')
+                if header_name.lower() == 'content-disposition':
+                    from rfc6266 import parse_headers as parse_cd_headers
+                    parsed_cd = parse_cd_headers(header_value.data())
+                    extension = os.path.splitext(
+                        parsed_cd.filename_unsafe)[1]
+                    if extension.startswith('.'):
+                        extension = extension[1:]
+                    file_name = parsed_cd.filename_sanitized(extension)
+                    item.downloaded_file = os.path.join(item.download_dir,
+                        file_name)
+
+            item.downloading_file = open(item.downloaded_file, 'wb')
+
+        while True:
+            data = reply.read(cons.READ_BUFFER_SIZE)
+            if not data:
+                break
+            item.downloading_file.write(data)
+
+    def download_progress(self, item, bytes_read, total_bytes):
+        if item.state != DOWNLOADING:
+            return
+
+        if total_bytes > 0:
+            item.message = '{bytes_read}/{total_bytes}'.format(
+                bytes_read=sizeof_fmt(bytes_read),
+                total_bytes=sizeof_fmt(total_bytes))
+        else:
+            item.message = sizeof_fmt(bytes_read)
+        item.set_progress(bytes_read, max(total_bytes, 0))
+
+    def download_finished(self, item, reply):
+        reply.deleteLater()
+
+        if item.downloading_file is not None:
+            item.downloading_file.close()
+            item.downloading_file = None
+
+        if item.download_reply is None:
+            # Cancelled
+            return
+        item.download_reply = None
+
+        if reply.error() != QNetworkReply.NoError:
+            self.finish(item, FAILED, _('Could not download {name}: '
+                '{error}').format(name=item.name, error=reply.errorString()))
+        elif not os.path.isfile(item.downloaded_file):
+            self.finish(item, FAILED, _('Could not find downloaded archive '
+                '({file})').format(file=item.downloaded_file))
+        else:
+            self.queue_extraction(item)
+
+        self.start_downloads()
+
+    def queue_extraction(self, item):
+        self.pending_extractions.append(item)
+        item.set_state(WAITING_EXTRACTION, _('Waiting'))
+        self.start_extractions()
+
+    def start_extractions(self):
+        extracting = sum(1 for item in self.items
+            if item.state == EXTRACTING)
+        while (extracting < cons.INSTALL_EXTRACT_WORKERS
+            and len(self.pending_extractions) > 0):
+            self.start_extraction(self.pending_extractions.popleft())
+            extracting += 1
+
+    def start_extraction(self, item):
+        extract_thread = ArchiveExtractThread(item.downloaded_file,
+            item.install_dir, self.plan_function, item.target_dirs,
+            item.target_sizes)
+        # The item lives in this thread so these are queued connections
+        extract_thread.progress.connect(item.set_progress)
+        extract_thread.failed.connect(item.set_failure)
+        extract_thread.finished.connect(item.extract_thread_finished)
+        item.extract_thread = extract_thread
+
+        item.set_state(EXTRACTING, _('Extracting'))
+        item.set_progress(0, 0)
+        extract_thread.start()
+
+    def extraction_finished(self, item):
+        if item.state == EXTRACTING:
+            if item.failure is not None:
+                self.finish(item, FAILED, item.failure)
+            else:
+                try:
+                    message = self.install_function(item)
+                except (InstallError, OSError) as e:
+                    self.finish(item, FAILED, str(e))
+                else:
+                    self.finish(item, COMPLETED, message)
+
+        self.start_extractions()
+
+    def finish(self, item, state, message):
+        if item.download_dir is not None:
+            delete_path(item.download_dir)
+            item.download_dir = None
+        if state != COMPLETED:
+            # Remove what was extracted
+            for target_dir in item.target_dirs:
+                if os.path.exists(target_dir):
+                    delete_path(target_dir)
+            del item.target_dirs[:]
+            item.target_sizes.clear()
+
+        item.set_state(state, message)
+
+        self.items.remove(item)
+        self.item_finished.emit(item)
+
+        if len(self.items) == 0:
+            self.emptied.emit()
+        else:
+            self.start_downloads()
+
+
+class InstallItemWidget(QWidget):
+    def __init__(self, queue, item):
+        super(InstallItemWidget, self).__init__()
+
+        self.queue = queue
+        self.item = item
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        name_label = QLabel()
+        name_label.setText(item.name)
+        layout.addWidget(name_label, 100)
+        self.name_label = name_label
+
+        message_label = QLabel()
+        layout.addWidget(message_label)
+        self.message_label = message_label
+
+        progress_bar = QProgressBar()
+        progress_bar.setMinimum(0)
+        layout.addWidget(progress_bar)
+        self.progress_bar = progress_bar
+
+        cancel_button = QPushButton()
+        cancel_button.setText(_('Cancel'))
+        cancel_button.clicked.connect(self.cancel_clicked)
+        layout.addWidget(cancel_button)
+        self.cancel_button = cancel_button
+
+        self.setLayout(layout)
+
+        item.changed.connect(self.item_changed)
+        self.item_changed()
+
+    def item_changed(self):
+        self.message_label.setText(self.item.message)
+
+        # QProgressBar only takes int values
+        value = self.item.progress_value
+        maximum = self.item.progress_maximum
+        while maximum > 0x7fffffff:
+            value //= 1024
+            maximum //= 1024
+        self.progress_bar.setMaximum(maximum)
+        self.progress_bar.setValue(value)
+
+    def cancel_clicked(self):
+        self.queue.cancel(self.item)
+
+
+class InstallsGroupBox(QGroupBox):
+    '''List the items of an InstallQueue with their own progress and
+    cancel button. Hidden when the queue is empty.'''
+
+    def __init__(self, queue):
+        super(InstallsGroupBox, self).__init__()
+
+        self.queue = queue
+        self.item_widgets = {}
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        self.items_layout = layout
+
+        queue.item_added.connect(self.item_added)
+        queue.item_finished.connect(self.item_finished)
+
+        self.set_text()
+        self.hide()
+
+    def set_text(self):
+        self.setTitle(_('Installations'))
+        for item_widget in self.item_widgets.values():
+            item_widget.cancel_button.setText(_('Cancel'))
+
+    def item_added(self, item):
+        item_widget = InstallItemWidget(self.queue, item)
+        self.items_layout.addWidget(item_widget)
+        self.item_widgets[item] = item_widget
+        self.show()
+
+    def item_finished(self, item):
+        item_widget = self.item_widgets.pop(item)
+        self.items_layout.removeWidget(item_widget)
+        item_widget.deleteLater()
+        if len(self.item_widgets) == 0:
+            self.hide()
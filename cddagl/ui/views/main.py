@@ -1,11 +1,8 @@
-import hashlib
 import html
 import json
 import logging
 import os
-import re
 import shutil
-import stat
 import subprocess
 import sys
 import tempfile
@@ -14,14 +11,15 @@ import zipfile
 import random
 
 from collections import deque
-from datetime import datetime, timedelta, timezone
-from io import BytesIO, StringIO, TextIOWrapper
+from datetime import datetime, timedelta
+from io import BytesIO
 from os import scandir
-from urllib.parse import urljoin
+from urllib.parse import urljoin, quote
 
 import arrow
 from PyQt5.QtCore import Qt, QTimer, QUrl, QFileInfo, pyqtSignal, QStringListModel, QThread
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QGridLayout, QGroupBox, QVBoxLayout, QLabel, QLineEdit,
     QPushButton, QFileDialog, QToolButton, QProgressBar, QButtonGroup, QRadioButton,
@@ -35,12 +33,23 @@ from cddagl.constants import get_cddagl_path, get_cdda_uld_path
 from cddagl import __version__ as version
 from cddagl.functions import (
     tryint, move_path, is_64_windows, sizeof_fmt, delete_path,
-    clean_qt_path, unique, log_exception, ensure_slash
+    clean_qt_path, log_exception, ensure_slash, parse_link_header
 )
+from cddagl.fileops import (ExeFingerprint, SavesScan, custom_content,
+    copy_custom_content, tree_entries, copy_entry, remove_entry,
+    previous_version_entries, previous_version_dirs, previous_version_skips)
 from cddagl.i18n import proxy_ngettext as ngettext, proxy_gettext as _
+from cddagl.metrics import metrics
+from cddagl.changelog import iter_changelog_builds
+from cddagl.ui.config import config_signals
+from cddagl.releases import ReleaseStreamParser, catalog_builds, releases_url
+from cddagl.tracing import mark_startup_phase, finish_startup_trace
 from cddagl.sql.functions import (
     get_config_value, set_config_value, new_version, get_build_from_sha256,
-    new_build, config_true
+    new_build, config_true, get_http_cache, set_http_cache,
+    save_remote_builds, get_remote_builds, get_remote_builds_backfill_page,
+    set_remote_builds_backfill_page, get_changelog_builds,
+    save_changelog_builds, clear_changelog_builds
 )
 from cddagl.win32 import (
     find_process_with_file_handle, activate_window, process_id_from_path, wait_for_pid
@@ -102,6 +111,7 @@ class GameDirGroupBox(QGroupBox):
         self.current_build = None
 
         self.exe_reading_timer = None
+        self.exe_hash_span = None
         self.update_saves_timer = None
         self.saves_size = 0
 
@@ -177,6 +187,8 @@ class GameDirGroupBox(QGroupBox):
         layout.addWidget(saves_warning_label, 3, 2)
         self.saves_warning_label = saves_warning_label
 
+        config_signals.changed.connect(self.config_changed)
+
         buttons_container = QWidget()
         buttons_layout = QGridLayout()
         buttons_layout.setContentsMargins(0, 0, 0, 0)
@@ -702,6 +714,7 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
         if (self.exe_reading_timer is not None
             and self.exe_reading_timer.isActive()):
             self.exe_reading_timer.stop()
+            self.exe_hash_span.finish(False)
 
             status_bar = main_window.statusBar()
             status_bar.removeWidget(self.reading_label)
@@ -727,18 +740,18 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
         exe_size = os.path.getsize(self.exe_path)
 
         progress_bar.setRange(0, exe_size)
-        self.exe_total_read = 0
 
-        self.exe_sha256 = hashlib.sha256()
-        self.last_bytes = None
+        self.exe_fingerprint = ExeFingerprint()
         self.game_version = ''
         self.opened_exe = open(self.exe_path, 'rb')
+        self.exe_hash_span = metrics.start_span('hash', path=self.exe_path)
 
         def timeout():
             bytes = self.opened_exe.read(cons.READ_BUFFER_SIZE)
             if len(bytes) == 0:
                 self.opened_exe.close()
                 self.exe_reading_timer.stop()
+                self.exe_hash_span.finish()
                 main_window = self.get_main_window()
                 status_bar = main_window.statusBar()
 
@@ -756,14 +769,15 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
                 if status_bar.busy == 0 and self.game_started:
                     status_bar.showMessage(_('Game process is running'))
 
-                sha256 = self.exe_sha256.hexdigest()
+                sha256 = self.exe_fingerprint.hexdigest()
+                self.game_version = self.exe_fingerprint.version
 
                 stable_version = cons.STABLE_SHA256.get(sha256, None)
                 is_stable = stable_version is not None
 
                 if is_stable:
                     self.game_version = stable_version
-                
+
                 if self.game_version == '':
                     self.game_version = _('Unknown')
                 else:
@@ -811,22 +825,10 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
                     self.current_build = None
 
             else:
-                last_frame = bytes
-                if self.last_bytes is not None:
-                    last_frame = self.last_bytes + last_frame
-
-                match = re.search(
-                    b'(?P<version>[01]\\.[A-F](-\\d+-g[0-9a-f]+)?)\\x00',
-                    last_frame)
-                if match is not None:
-                    game_version = match.group('version').decode('ascii')
-                    if len(game_version) > len(self.game_version):
-                        self.game_version = game_version
-
-                self.exe_total_read += len(bytes)
-                self.reading_progress_bar.setValue(self.exe_total_read)
-                self.exe_sha256.update(bytes)
-                self.last_bytes = bytes
+                self.exe_fingerprint.update(bytes)
+                self.reading_progress_bar.setValue(
+                    self.exe_fingerprint.total_read)
+                self.exe_hash_span.add_bytes(len(bytes))
 
         timer.timeout.connect(timeout)
         timer.start(0)
@@ -958,31 +960,14 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
         self.saves_size = 0
         self.saves_worlds = 0
         self.saves_characters = 0
-        self.world_dirs = set()
 
-        self.saves_scan = scandir(save_dir)
-        self.next_scans = []
-        self.save_dir = save_dir
+        self.saves_scan = SavesScan(save_dir)
 
         def timeout():
-            try:
-                entry = next(self.saves_scan)
-                if entry.is_dir():
-                    self.next_scans.append(entry.path)
-                elif entry.is_file():
-                    self.saves_size += entry.stat().st_size
-
-                    if entry.name.endswith('.sav'):
-                        world_dir = os.path.dirname(entry.path)
-                        if self.save_dir == os.path.dirname(world_dir):
-                            self.saves_characters += 1
-
-                    if entry.name in cons.WORLD_FILES:
-                        world_dir = os.path.dirname(entry.path)
-                        if (world_dir not in self.world_dirs
-                                and self.save_dir == os.path.dirname(world_dir)):
-                            self.world_dirs.add(world_dir)
-                            self.saves_worlds += 1
+            if self.saves_scan.step():
+                self.saves_size = self.saves_scan.size
+                self.saves_worlds = self.saves_scan.worlds
+                self.saves_characters = self.saves_scan.characters
 
                 worlds_text = ngettext('World', 'Worlds', self.saves_worlds)
                 characters_text = ngettext('Character', 'Characters',self.saves_characters)
@@ -996,36 +981,40 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
                         characters=characters_text
                     )
                 )
-            except StopIteration:
-                if len(self.next_scans) > 0:
-                    self.saves_scan = scandir(self.next_scans.pop())
-                else:
-                    # End of the tree
-                    self.update_saves_timer.stop()
-                    self.update_saves_timer = None
-
-                    # no more path to scan but still 0 chars/worlds
-                    if self.saves_worlds == 0 and self.saves_characters == 0:
-                        self.saves_value_edit.setText(
-                            '{world_count} {worlds} - {character_count} {characters}'
-                            .format(
-                                world_count=0,
-                                character_count=0,
-                                worlds=ngettext('World', 'Worlds', 0),
-                                characters=ngettext('Character', 'Characters', 0)
-                            )
+            else:
+                # End of the tree
+                self.update_saves_timer.stop()
+                self.update_saves_timer = None
+
+                # no more path to scan but still 0 chars/worlds
+                if self.saves_worlds == 0 and self.saves_characters == 0:
+                    self.saves_value_edit.setText(
+                        '{world_count} {worlds} - {character_count} {characters}'
+                        .format(
+                            world_count=0,
+                            character_count=0,
+                            worlds=ngettext('World', 'Worlds', 0),
+                            characters=ngettext('Character', 'Characters', 0)
                         )
+                    )
 
-                    # Warning about saves size
-                    if (self.saves_size > cons.SAVES_WARNING_SIZE and
-                        not config_true(get_config_value('prevent_save_move', 'False'))):
-                        self.saves_warning_label.show()
-                    else:
-                        self.saves_warning_label.hide()
+                self.update_saves_warning()
 
         timer.timeout.connect(timeout)
         timer.start(0)
 
+    def update_saves_warning(self):
+        # Warning about saves size
+        if (self.saves_size > cons.SAVES_WARNING_SIZE and
+            not config_true(get_config_value('prevent_save_move', 'False'))):
+            self.saves_warning_label.show()
+        else:
+            self.saves_warning_label.hide()
+
+    def config_changed(self, name, value):
+        if name == 'prevent_save_move':
+            self.update_saves_warning()
+
     def analyse_new_build(self, build):
         game_dir = self.dir_combo.currentText()
 
@@ -1064,6 +1053,7 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
             if (self.exe_reading_timer is not None
                 and self.exe_reading_timer.isActive()):
                 self.exe_reading_timer.stop()
+                self.exe_hash_span.finish(False)
 
                 main_window = self.get_main_window()
                 status_bar = main_window.statusBar()
@@ -1099,18 +1089,19 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
             exe_size = os.path.getsize(self.exe_path)
 
             progress_bar.setRange(0, exe_size)
-            self.exe_total_read = 0
 
-            self.exe_sha256 = hashlib.sha256()
-            self.last_bytes = None
+            self.exe_fingerprint = ExeFingerprint()
             self.game_version = ''
             self.opened_exe = open(self.exe_path, 'rb')
+            self.exe_hash_span = metrics.start_span('hash',
+                path=self.exe_path)
 
             def timeout():
                 bytes = self.opened_exe.read(cons.READ_BUFFER_SIZE)
                 if len(bytes) == 0:
                     self.opened_exe.close()
                     self.exe_reading_timer.stop()
+                    self.exe_hash_span.finish()
                     main_window = self.get_main_window()
                     status_bar = main_window.statusBar()
 
@@ -1127,7 +1118,8 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
 
                     status_bar.busy -= 1
 
-                    sha256 = self.exe_sha256.hexdigest()
+                    sha256 = self.exe_fingerprint.hexdigest()
+                    self.game_version = self.exe_fingerprint.version
 
                     stable_version = cons.STABLE_SHA256.get(sha256, None)
                     is_stable = stable_version is not None
@@ -1151,22 +1143,10 @@ antivirus whitelist or select the action to trust this binary when detected.</p>
                     update_group_box.post_extraction()
 
                 else:
-                    last_frame = bytes
-                    if self.last_bytes is not None:
-                        last_frame = self.last_bytes + last_frame
-
-                    match = re.search(
-                        b'(?P<version>[01]\\.[A-F](-\\d+-g[0-9a-f]+)?)\\x00',
-                        last_frame)
-                    if match is not None:
-                        game_version = match.group('version').decode('ascii')
-                        if len(game_version) > len(self.game_version):
-                            self.game_version = game_version
-
-                    self.exe_total_read += len(bytes)
-                    self.reading_progress_bar.setValue(self.exe_total_read)
-                    self.exe_sha256.update(bytes)
-                    self.last_bytes = bytes
+                    self.exe_fingerprint.update(bytes)
+                    self.reading_progress_bar.setValue(
+                        self.exe_fingerprint.total_read)
+                    self.exe_hash_span.add_bytes(len(bytes))
 
             timer.timeout.connect(timeout)
             timer.start(0)
@@ -1182,11 +1162,13 @@ class UpdateGroupBox(QGroupBox):
         self.builds = []
         self.progress_rmtree = None
         self.progress_copy = None
+        self.custom_content_thread = None
 
         self.qnam = QNetworkAccessManager()
         self.http_reply = None
 
         self.changelog_http_reply = None
+        self.changelog_parsing_thread = None
         self.changelog_http_data = None
 
         layout = QGridLayout()
@@ -1270,7 +1252,7 @@ class UpdateGroupBox(QGroupBox):
         self.changelog_groupbox = changelog_groupbox
         self.changelog_layout = changelog_layout
 
-        changelog_content = QTextBrowser()
+        changelog_content = ChangelogBrowser()
         changelog_content.setReadOnly(True)
         changelog_content.setOpenExternalLinks(True)
         self.changelog_layout.addWidget(changelog_content)
@@ -1524,6 +1506,7 @@ class UpdateGroupBox(QGroupBox):
 
             elif self.extracting_new_build:
                 self.extracting_timer.stop()
+                self.extracting_span.finish(False)
 
                 main_window = self.get_main_window()
                 status_bar = main_window.statusBar()
@@ -1554,6 +1537,7 @@ class UpdateGroupBox(QGroupBox):
             elif self.analysing_new_build:
                 game_dir_group_box.opened_exe.close()
                 game_dir_group_box.exe_reading_timer.stop()
+                game_dir_group_box.exe_hash_span.finish(False)
 
                 main_window = self.get_main_window()
                 status_bar = main_window.statusBar()
@@ -1581,6 +1565,7 @@ class UpdateGroupBox(QGroupBox):
 
                 if self.progress_copy is not None:
                     self.progress_copy.stop()
+                self.stop_custom_content()
 
                 main_window = self.get_main_window()
                 status_bar = main_window.statusBar()
@@ -1662,6 +1647,10 @@ class UpdateGroupBox(QGroupBox):
     def get_main_window(self):
         return self.get_main_tab().get_main_window()
 
+    @property
+    def app_locale(self):
+        return QApplication.instance().app_locale
+
     def disable_controls(self, update_button=False):
         self.stable_radio_button.setEnabled(False)
         self.experimental_radio_button.setEnabled(False)
@@ -1700,6 +1689,8 @@ class UpdateGroupBox(QGroupBox):
         status_bar = main_window.statusBar()
         status_bar.clearMessage()
 
+        self.download_span = metrics.start_span('download', url=url)
+
         status_bar.busy += 1
 
         downloading_label = QLabel()
@@ -1757,6 +1748,7 @@ class UpdateGroupBox(QGroupBox):
         status_bar.busy -= 1
 
         if self.download_aborted:
+            self.download_span.finish(False)
             download_dir = os.path.dirname(self.downloaded_file)
             delete_path(download_dir)
         else:
@@ -1806,6 +1798,9 @@ class UpdateGroupBox(QGroupBox):
 
                 return
 
+            self.download_span.finish(self.download_http_reply.error() ==
+                QNetworkReply.NoError)
+
             # Test downloaded file
             status_bar.showMessage(_('Testing downloaded file archive'))
 
@@ -1911,21 +1906,10 @@ class UpdateGroupBox(QGroupBox):
 
         backup_dir = os.path.join(game_dir, 'previous_version')
 
-        dir_list = os.listdir(game_dir)
+        dir_list = previous_version_entries(game_dir, config_true(
+            get_config_value('prevent_save_move', 'False')))
         self.backup_dir_list = dir_list
 
-        if (config_true(get_config_value('prevent_save_move', 'False'))
-            and 'save' in dir_list):
-            dir_list.remove('save')
-
-        if getattr(sys, 'frozen', False):
-            launcher_exe = os.path.abspath(sys.executable)
-            launcher_dir = os.path.dirname(launcher_exe)
-            if os.path.abspath(game_dir) == launcher_dir:
-                launcher_name = os.path.basename(launcher_exe)
-                if launcher_name in dir_list:
-                    dir_list.remove(launcher_name)
-
         if len(dir_list) > 0:
             status_bar.showMessage(_('Backing up current game'))
 
@@ -2015,6 +1999,8 @@ class UpdateGroupBox(QGroupBox):
 
         self.extracting_infolist = z.infolist()
         self.extracting_index = 0
+        self.extracting_span = metrics.start_span('extract',
+            path=self.downloaded_file)
 
         main_window = self.get_main_window()
         status_bar = main_window.statusBar()
@@ -2039,6 +2025,7 @@ class UpdateGroupBox(QGroupBox):
 
             if self.extracting_index == len(self.extracting_infolist):
                 self.extracting_timer.stop()
+                self.extracting_span.finish()
 
                 main_window = self.get_main_window()
                 status_bar = main_window.statusBar()
@@ -2079,6 +2066,7 @@ class UpdateGroupBox(QGroupBox):
                 try:
                     self.extracting_zipfile.extract(extracting_element,
                         self.game_dir)
+                    self.extracting_span.add_bytes(extracting_element.file_size)
                 except OSError as e:
                     # Display the error and stop the update process
                     error_msgbox = QMessageBox()
@@ -2103,71 +2091,18 @@ class UpdateGroupBox(QGroupBox):
         timer.timeout.connect(timeout)
         timer.start(0)
 
-    def asset_name(self, path, filename):
-        asset_file = os.path.join(path, filename)
-
-        if not os.path.isfile(asset_file):
-            disabled_asset_file = os.path.join(path, filename + '.disabled')
-            if not os.path.isfile(disabled_asset_file):
-                return None
-            else:
-                asset_file_path = disabled_asset_file
-        else:
-            asset_file_path = asset_file
-
-        try:
-            with open(asset_file_path, 'r', encoding='latin1') as f:
-                for line in f:
-                    if line.startswith('NAME'):
-                        space_index = line.find(' ')
-                        name = line[space_index:].strip().replace(
-                            ',', '')
-                        return name
-        except FileNotFoundError:
-            return None
-        return None
-
-    def mod_ident(self, path):
-        json_file = os.path.join(path, 'modinfo.json')
-        if not os.path.isfile(json_file):
-            json_file = os.path.join(path, 'modinfo.json.disabled')
-        if os.path.isfile(json_file):
-            try:
-                with open(json_file, 'r', encoding='utf8') as f:
-                    try:
-                        values = json.load(f)
-                        if isinstance(values, dict):
-                            if values.get('type', '') == 'MOD_INFO':
-                                return values.get('ident', None)
-                        elif isinstance(values, list):
-                            for item in values:
-                                if (isinstance(item, dict)
-                                    and item.get('type', '') == 'MOD_INFO'):
-                                        return item.get('ident', None)
-                    except ValueError:
-                        pass
-            except FileNotFoundError:
-                return None
-
-        return None
-
     def copy_next_dir(self):
         if self.in_post_extraction and len(self.previous_dirs) > 0:
-            next_dir = self.previous_dirs.pop()
-            src_path = os.path.join(self.previous_version_dir, next_dir)
-            dst_path = os.path.join(self.game_dir, next_dir)
-            if os.path.isdir(src_path) and not os.path.exists(dst_path):
-                main_window = self.get_main_window()
-                status_bar = main_window.statusBar()
+            next_dir, src_path, dst_path = self.previous_dirs.pop()
+            main_window = self.get_main_window()
+            status_bar = main_window.statusBar()
 
-                progress_copy = ProgressCopyTree(src_path, dst_path,
-                    self.previous_dirs_skips, status_bar,
-                    _('{0} directory').format(next_dir))
-                progress_copy.completed.connect(self.copy_next_dir)
-                self.progress_copy = progress_copy
-                progress_copy.start()
-            else:
-                self.copy_next_dir()
+            progress_copy = ProgressCopyTree(src_path, dst_path,
+                self.previous_dirs_skips, status_bar,
+                _('{0} directory').format(next_dir))
+            progress_copy.completed.connect(self.copy_next_dir)
+            self.progress_copy = progress_copy
+            progress_copy.start()
         elif self.in_post_extraction:
             self.progress_copy = None
             self.post_extraction_step2()
@@ -2184,21 +2119,12 @@ class UpdateGroupBox(QGroupBox):
         previous_version_dir = os.path.join(self.game_dir, 'previous_version')
         if os.path.isdir(previous_version_dir) and self.in_post_extraction:
 
-            previous_dirs = ['config', 'save', 'templates', 'memorial',
-                'graveyard', 'save_backups']
-            if (config_true(get_config_value('prevent_save_move', 'False')) and
-                'save' in previous_dirs):
-                previous_dirs.remove('save')
-
-            self.previous_dirs = previous_dirs
+            self.previous_dirs = previous_version_dirs(self.game_dir,
+                config_true(get_config_value('prevent_save_move', 'False')))
             self.previous_version_dir = previous_version_dir
 
             # Skip debug files
-            self.previous_dirs_skips = set()
-            self.previous_dirs_skips.update((
-                 os.path.join(previous_version_dir, 'config', 'debug.log'),
-                 os.path.join(previous_version_dir, 'config', 'debug.log.prev')
-            ))
+            self.previous_dirs_skips = previous_version_skips(self.game_dir)
 
             self.progress_copy = None
             self.copy_next_dir()
@@ -2211,239 +2137,125 @@ class UpdateGroupBox(QGroupBox):
         main_window = self.get_main_window()
         status_bar = main_window.statusBar()
 
-        # Copy custom tilesets and soundpack from previous version
-        # tilesets
-        tilesets_dir = os.path.join(self.game_dir, 'gfx')
-        previous_tilesets_dir = os.path.join(self.game_dir, 'previous_version',
-            'gfx')
-
-        if (os.path.isdir(tilesets_dir) and os.path.isdir(previous_tilesets_dir)
-            and self.in_post_extraction):
-            status_bar.showMessage(_('Restoring custom tilesets'))
-
-            official_set = {}
-            for entry in os.listdir(tilesets_dir):
-                if not self.in_post_extraction:
-                    break
-
-                entry_path = os.path.join(tilesets_dir, entry)
-                if os.path.isdir(entry_path):
-                    name = self.asset_name(entry_path, 'tileset.txt')
-                    if name is not None and name not in official_set:
-                        official_set[name] = entry_path
-
-            previous_set = {}
-            for entry in os.listdir(previous_tilesets_dir):
-                if not self.in_post_extraction:
-                    break
-
-                entry_path = os.path.join(previous_tilesets_dir, entry)
-                if os.path.isdir(entry_path):
-                    name = self.asset_name(entry_path, 'tileset.txt')
-                    if name is not None and name not in previous_set:
-                        previous_set[name] = entry_path
-
-            custom_set = set(previous_set.keys()) - set(official_set.keys())
-            for item in custom_set:
-                if not self.in_post_extraction:
-                    break
-
-                target_dir = os.path.join(tilesets_dir, os.path.basename(
-                    previous_set[item]))
-                if not os.path.exists(target_dir):
-                    shutil.copytree(previous_set[item], target_dir)
-
-            status_bar.clearMessage()
-
-        # soundpacks
-        soundpack_dir = os.path.join(self.game_dir, 'data', 'sound')
-        previous_soundpack_dir = os.path.join(self.game_dir, 'previous_version',
-            'data', 'sound')
-
-        if (os.path.isdir(soundpack_dir) and os.path.isdir(
-            previous_soundpack_dir) and self.in_post_extraction):
-            status_bar.showMessage(_('Restoring custom soundpacks'))
+        # Copy custom tilesets, soundpacks, mods, user mods and fonts from
+        # previous version. They are found and copied in the background.
+        status_bar.clearMessage()
+        status_bar.busy += 1
 
-            official_set = {}
-            for entry in os.listdir(soundpack_dir):
-                if not self.in_post_extraction:
-                    break
+        restoring_label = QLabel()
+        restoring_label.setText(_('Looking for custom content'))
+        status_bar.addWidget(restoring_label, 100)
+        self.restoring_label = restoring_label
+
+        restoring_size_label = QLabel()
+        status_bar.addWidget(restoring_size_label)
+        self.restoring_size_label = restoring_size_label
+
+        restoring_progress_bar = QProgressBar()
+        restoring_progress_bar.setRange(0, 0)
+        status_bar.addWidget(restoring_progress_bar)
+        self.restoring_progress_bar = restoring_progress_bar
+
+        self.restoring_error = None
+        self.restored_size = 0
+        self.restoring_span = metrics.start_span('copy',
+            src=os.path.join(self.game_dir, 'previous_version'),
+            dst=self.game_dir)
+
+        custom_content_thread = CustomContentThread(self.game_dir,
+            os.path.join(self.game_dir, 'previous_version'))
+        custom_content_thread.copying.connect(self.custom_content_copying)
+        custom_content_thread.progress.connect(self.custom_content_progress)
+        custom_content_thread.failed.connect(self.custom_content_failed)
+        custom_content_thread.finished.connect(self.custom_content_finished)
+        self.custom_content_thread = custom_content_thread
+        custom_content_thread.start()
+
+    def custom_content_copying(self, kind, name):
+        messages = {
+            'tilesets': _('Restoring custom tilesets'),
+            'soundpacks': _('Restoring custom soundpacks'),
+            'mods': _('Restoring custom mods'),
+            'user_mods': _('Restoring user custom mods'),
+            'fonts': _('Restoring custom fonts'),
+        }
+        if kind in messages:
+            message = messages[kind]
+        else:
+            message = _('Restoring {0}').format(kind)
+        if name is not None:
+            message = message + ' - ' + name
 
-                entry_path = os.path.join(soundpack_dir, entry)
-                if os.path.isdir(entry_path):
-                    name = self.asset_name(entry_path, 'soundpack.txt')
-                    if name is not None and name not in official_set:
-                        official_set[name] = entry_path
+        self.restoring_label.setText(message)
 
-            previous_set = {}
-            for entry in os.listdir(previous_soundpack_dir):
-                if not self.in_post_extraction:
-                    break
+    def custom_content_progress(self, copied_size, total_size):
+        self.restoring_span.add_bytes(copied_size - self.restored_size)
+        self.restored_size = copied_size
 
-                entry_path = os.path.join(previous_soundpack_dir, entry)
-                if os.path.isdir(entry_path):
-                    name = self.asset_name(entry_path, 'soundpack.txt')
-                    if name is not None and name not in previous_set:
-                        previous_set[name] = entry_path
+        self.restoring_size_label.setText('{bytes_read}/{total_bytes}'.format(
+            bytes_read=sizeof_fmt(copied_size),
+            total_bytes=sizeof_fmt(total_size)))
 
-            custom_set = set(previous_set.keys()) - set(official_set.keys())
-            if len(custom_set) > 0:
-                self.soundpack_dir = soundpack_dir
-                self.previous_soundpack_set = previous_set
-                self.custom_soundpacks = list(custom_set)
+        # Progress bars only take int values
+        while total_size > 0x7fffffff:
+            copied_size //= 1024
+            total_size //= 1024
+        self.restoring_progress_bar.setRange(0, total_size)
+        self.restoring_progress_bar.setValue(copied_size)
 
-                self.copy_next_soundpack()
-            else:
-                status_bar.clearMessage()
-                self.post_extraction_step3()
+    def custom_content_failed(self, error):
+        self.restoring_error = error
 
-        else:
-            self.post_extraction_step3()
-
-    def copy_next_soundpack(self):
-        if self.in_post_extraction and len(self.custom_soundpacks) > 0:
-            next_item = self.custom_soundpacks.pop()
-            dst_path = os.path.join(self.soundpack_dir, os.path.basename(
-                self.previous_soundpack_set[next_item]))
-            src_path = self.previous_soundpack_set[next_item]
-            if os.path.isdir(src_path) and not os.path.exists(dst_path):
-                main_window = self.get_main_window()
-                status_bar = main_window.statusBar()
+    def custom_content_finished(self):
+        self.custom_content_thread = None
+        self.remove_restoring_widgets(self.restoring_error is None)
 
-                progress_copy = ProgressCopyTree(src_path, dst_path, None,
-                    status_bar, _('{name} soundpack').format(name=next_item))
-                progress_copy.completed.connect(self.copy_next_soundpack)
-                self.progress_copy = progress_copy
-                progress_copy.start()
-            else:
-                self.copy_next_soundpack()
-        elif self.in_post_extraction:
-            self.progress_copy = None
+        if self.restoring_error is not None:
+            # Display the error but keep what was updated
+            error_msgbox = QMessageBox()
+            error_msgbox.setWindowTitle(_('Cannot restore custom content'))
 
-            main_window = self.get_main_window()
-            status_bar = main_window.statusBar()
-            status_bar.clearMessage()
+            text = _('''
+<p>The launcher failed to restore the custom content of the previous version.</p>
+<p>It received the following error from the operating system: {error}</p>'''
+                ).format(error=html.escape(self.restoring_error))
 
-            self.post_extraction_step3()
+            error_msgbox.setText(text)
+            error_msgbox.addButton(_('OK'), QMessageBox.YesRole)
+            error_msgbox.setIcon(QMessageBox.Warning)
 
-    def post_extraction_step3(self):
-        if not self.in_post_extraction:
-            return
+            error_msgbox.exec()
 
+        self.post_extraction_step3()
+
+    def stop_custom_content(self):
+        if self.custom_content_thread is not None:
+            self.custom_content_thread.copying.disconnect(
+                self.custom_content_copying)
+            self.custom_content_thread.progress.disconnect(
+                self.custom_content_progress)
+            self.custom_content_thread.failed.disconnect(
+                self.custom_content_failed)
+            self.custom_content_thread.finished.disconnect(
+                self.custom_content_finished)
+            self.custom_content_thread.requestInterruption()
+            self.custom_content_thread.wait()
+            self.custom_content_thread = None
+
+            self.remove_restoring_widgets(False)
+
+    def remove_restoring_widgets(self, completed):
         main_window = self.get_main_window()
         status_bar = main_window.statusBar()
 
-        # Copy custom mods from previous version
-        # mods
-        mods_dir = os.path.join(self.game_dir, 'data', 'mods')
-        previous_mods_dir = os.path.join(self.game_dir, 'previous_version',
-            'data', 'mods')
-
-        if (os.path.isdir(mods_dir) and os.path.isdir(previous_mods_dir) and
-            self.in_post_extraction):
-            status_bar.showMessage(_('Restoring custom mods'))
-
-            official_set = {}
-            for entry in os.listdir(mods_dir):
-                entry_path = os.path.join(mods_dir, entry)
-                if os.path.isdir(entry_path):
-                    name = self.mod_ident(entry_path)
-                    if name is not None and name not in official_set:
-                        official_set[name] = entry_path
-            previous_set = {}
-            for entry in os.listdir(previous_mods_dir):
-                entry_path = os.path.join(previous_mods_dir, entry)
-                if os.path.isdir(entry_path):
-                    name = self.mod_ident(entry_path)
-                    if name is not None and name not in previous_set:
-                        previous_set[name] = entry_path
-
-            custom_set = set(previous_set.keys()) - set(official_set.keys())
-            for item in custom_set:
-                target_dir = os.path.join(mods_dir, os.path.basename(
-                    previous_set[item]))
-                if not os.path.exists(target_dir):
-                    shutil.copytree(previous_set[item], target_dir)
-
-            status_bar.clearMessage()
-
-        if not self.in_post_extraction:
-            return
-
-        # user mods
-        user_mods_dir = os.path.join(self.game_dir, 'mods')
-        previous_user_mods_dir = os.path.join(self.game_dir, 'previous_version',
-            'mods')
-
-        if (os.path.isdir(previous_user_mods_dir) and self.in_post_extraction):
-            status_bar.showMessage(_('Restoring user custom mods'))
-
-            if not os.path.exists(user_mods_dir):
-                os.makedirs(user_mods_dir)
-
-            official_set = {}
-            for entry in os.listdir(user_mods_dir):
-                entry_path = os.path.join(user_mods_dir, entry)
-                if os.path.isdir(entry_path):
-                    name = self.mod_ident(entry_path)
-                    if name is not None and name not in official_set:
-                        official_set[name] = entry_path
-            previous_set = {}
-            for entry in os.listdir(previous_user_mods_dir):
-                entry_path = os.path.join(previous_user_mods_dir, entry)
-                if os.path.isdir(entry_path):
-                    name = self.mod_ident(entry_path)
-                    if name is not None and name not in previous_set:
-                        previous_set[name] = entry_path
-
-            custom_set = set(previous_set.keys()) - set(official_set.keys())
-            for item in custom_set:
-                target_dir = os.path.join(user_mods_dir, os.path.basename(
-                    previous_set[item]))
-                if not os.path.exists(target_dir):
-                    shutil.copytree(previous_set[item], target_dir)
-
-            status_bar.clearMessage()
-
-        if not self.in_post_extraction:
-            return
-
-        # Copy user-default-mods.json if present
-        user_default_mods_file = os.path.join(mods_dir, 'user-default-mods.json')
-        previous_user_default_mods_file = os.path.join(previous_mods_dir, 'user-default-mods.json')
-
-        if (not os.path.exists(user_default_mods_file)
-            and os.path.isfile(previous_user_default_mods_file)):
-            status_bar.showMessage(_('Restoring {0}').format('user-default-mods.json'))
-
-            shutil.copy2(previous_user_default_mods_file,
-                user_default_mods_file)
-
-            status_bar.clearMessage()
-
-        # Copy custom fonts
-        fonts_dir = os.path.join(self.game_dir, 'data', 'font')
-        previous_fonts_dir = os.path.join(self.game_dir, 'previous_version',
-            'data', 'font')
-
-        if (os.path.isdir(fonts_dir) and os.path.isdir(previous_fonts_dir) and
-            self.in_post_extraction):
-            status_bar.showMessage(_('Restoring custom fonts'))
-
-            official_set = set(os.listdir(fonts_dir))
-            previous_set = set(os.listdir(previous_fonts_dir))
-
-            custom_set = previous_set - official_set
-            for entry in custom_set:
-                source = os.path.join(previous_fonts_dir, entry)
-                target = os.path.join(fonts_dir, entry)
-                if os.path.isfile(source):
-                    shutil.copy2(source, target)
-                elif os.path.isdir(source):
-                    shutil.copytree(source, target)
+        status_bar.removeWidget(self.restoring_label)
+        status_bar.removeWidget(self.restoring_size_label)
+        status_bar.removeWidget(self.restoring_progress_bar)
+        status_bar.busy -= 1
 
-            status_bar.clearMessage()
+        self.restoring_span.finish(completed)
 
+    def post_extraction_step3(self):
         if not self.in_post_extraction:
             return
 
@@ -2537,6 +2349,7 @@ class UpdateGroupBox(QGroupBox):
     def download_dl_progress(self, bytes_read, total_bytes):
         self.downloading_progress_bar.setMaximum(total_bytes)
         self.downloading_progress_bar.setValue(bytes_read)
+        self.download_span.bytes = bytes_read
 
         self.download_speed_count += 1
 
@@ -2567,11 +2380,39 @@ class UpdateGroupBox(QGroupBox):
 
         status_bar.busy += 1
 
+        self.base_asset = base_asset
+
+        # Show the builds from the catalog right away while we ask GitHub for
+        # the releases published since then
         self.builds_combo.clear()
-        self.builds_combo.addItem(_('Fetching remote builds'))
+        remote_builds = get_remote_builds()
+        if len(remote_builds) > 0:
+            self.show_builds(catalog_builds(remote_builds,
+                base_asset['Platform'], base_asset['Graphics']))
+            self.builds_combo.setEnabled(False)
 
-        url = cons.GITHUB_REST_API_URL + cons.CDDA_RELEASES
-        self.base_asset = base_asset
+            url = releases_url(cons.CDDA_RELEASES_PER_PAGE)
+            self.lb_backfill_page = None
+        else:
+            self.builds_combo.addItem(_('Fetching remote builds'))
+
+            # Backfill the catalog from the newest releases
+            set_remote_builds_backfill_page(0, False)
+            url = releases_url(cons.CDDA_RELEASES_BACKFILL_PER_PAGE, 1)
+            self.lb_backfill_page = 1
+
+        self.lb_request_url = url
+        # Backfill requests are not made again once they succeed, so they
+        # are not worth caching
+        self.lb_use_cache = len(remote_builds) > 0
+        self.lb_page = 1
+        self.lb_backfill_first_page = self.lb_backfill_page
+        self.lb_cache_entry = None
+        self.start_lb_http_request(url)
+
+    def start_lb_http_request(self, url):
+        main_window = self.get_main_window()
+        status_bar = main_window.statusBar()
 
         fetching_label = QLabel()
         fetching_label.setText(_('Fetching: {url}').format(url=url))
@@ -2585,23 +2426,35 @@ class UpdateGroupBox(QGroupBox):
 
         progress_bar.setMinimum(0)
 
-        self.lb_html = BytesIO()
+        self.lb_parser = ReleaseStreamParser()
 
         request = QNetworkRequest(QUrl(url))
         request.setRawHeader(b'User-Agent',
             b'CDDA-Game-Launcher/' + version.encode('utf8'))
         request.setRawHeader(b'Accept', cons.GITHUB_API_VERSION)
 
+        # Conditional requests answered with 304 Not Modified do not count
+        # against the GitHub API rate limit
+        cached_response = None
+        if self.lb_page == 1 and self.lb_use_cache:
+            cached_response = get_http_cache(self.lb_request_url)
+        if cached_response is not None:
+            if cached_response['etag'] is not None:
+                request.setRawHeader(b'If-None-Match',
+                    cached_response['etag'].encode('utf8'))
+            if cached_response['last_modified'] is not None:
+                request.setRawHeader(b'If-Modified-Since',
+                    cached_response['last_modified'].encode('utf8'))
+
         self.http_reply = self.qnam.get(request)
         self.http_reply.finished.connect(self.lb_http_finished)
         self.http_reply.readyRead.connect(self.lb_http_ready_read)
         self.http_reply.downloadProgress.connect(self.lb_dl_progress)
 
-    @property
-    def app_locale(self):
-        return QApplication.instance().app_locale
-
     def lb_http_finished(self):
+        mark_startup_phase('first network reply')
+        finish_startup_trace()
+
         main_window = self.get_main_window()
 
         status_bar = main_window.statusBar()
@@ -2615,30 +2468,71 @@ class UpdateGroupBox(QGroupBox):
                 self.http_reply.request().url().toString(),
                 redirect.toString())
 
-            fetching_label = QLabel()
-            fetching_label.setText(_('Fetching: {url}').format(
-                url=redirected_url))
-            self.base_url = redirected_url
-            status_bar.addWidget(fetching_label, 100)
-            self.fetching_label = fetching_label
-
-            progress_bar = QProgressBar()
-            status_bar.addWidget(progress_bar)
-            self.fetching_progress_bar = progress_bar
-
-            progress_bar.setMinimum(0)
-
-            self.lb_html = BytesIO()
+            self.start_lb_http_request(redirected_url)
+            return
 
-            request = QNetworkRequest(QUrl(redirected_url))
-            request.setRawHeader(b'User-Agent',
-                b'CDDA-Game-Launcher/' + version.encode('utf8'))
-            request.setRawHeader(b'Accept', cons.GITHUB_API_VERSION)
+        status_code = self.http_reply.attribute(
+            QNetworkRequest.HttpStatusCodeAttribute)
 
-            self.http_reply = self.qnam.get(request)
-            self.http_reply.finished.connect(self.lb_http_finished)
-            self.http_reply.readyRead.connect(self.lb_http_ready_read)
-            self.http_reply.downloadProgress.connect(self.lb_dl_progress)
+        next_url = None
+        if status_code == 200:
+            known_builds = save_remote_builds(self.lb_parser.close())
+            releases_valid = self.lb_parser.valid
+            self.lb_parser = None
+
+            if self.lb_page == 1 and self.lb_use_cache and releases_valid:
+                etag = None
+                if self.http_reply.hasRawHeader(b'ETag'):
+                    etag = bytes(self.http_reply.rawHeader(b'ETag')
+                        ).decode('utf8')
+
+                last_modified = None
+                if self.http_reply.hasRawHeader(b'Last-Modified'):
+                    last_modified = bytes(self.http_reply.rawHeader(
+                        b'Last-Modified')).decode('utf8')
+
+                if etag is not None or last_modified is not None:
+                    self.lb_cache_entry = (etag, last_modified)
+
+            if self.http_reply.hasRawHeader(b'Link'):
+                links = parse_link_header(bytes(self.http_reply.rawHeader(
+                    b'Link')).decode('utf8'))
+                next_url = links.get('next')
+
+            if self.lb_backfill_page is not None:
+                # Remember how far the backfill went so it goes on from
+                # there if it is interrupted
+                if releases_valid:
+                    set_remote_builds_backfill_page(self.lb_backfill_page,
+                        next_url is None)
+                if (releases_valid
+                    and next_url is not None
+                    and self.lb_backfill_page - self.lb_backfill_first_page
+                        + 1 < cons.CDDA_RELEASES_MAX_PAGES):
+                    self.lb_backfill_page += 1
+                else:
+                    next_url = None
+            elif (len(known_builds) > 0
+                or self.lb_page >= cons.CDDA_RELEASES_MAX_PAGES):
+                # Keep walking through newer releases until we reach builds
+                # which are already in the catalog
+                next_url = None
+
+        if (next_url is None
+            and status_code in (200, 304)
+            and self.lb_backfill_page is None):
+            # Then go on with the older releases where the last backfill
+            # stopped
+            backfill_page = get_remote_builds_backfill_page()
+            if backfill_page is not None:
+                self.lb_backfill_page = backfill_page
+                self.lb_backfill_first_page = backfill_page
+                next_url = releases_url(cons.CDDA_RELEASES_BACKFILL_PER_PAGE,
+                    backfill_page)
+
+        if next_url is not None:
+            self.lb_page += 1
+            self.start_lb_http_request(next_url)
             return
 
         main_tab = self.get_main_tab()
@@ -2686,9 +2580,7 @@ class UpdateGroupBox(QGroupBox):
                 datetime=reset_dt_display
             ))
 
-        status_code = self.http_reply.attribute(
-            QNetworkRequest.HttpStatusCodeAttribute)
-        if status_code != 200:
+        if status_code not in (200, 304) and self.lb_page == 1:
             reason = self.http_reply.attribute(
                 QNetworkRequest.HttpReasonPhraseAttribute)
             url = self.http_reply.request().url().toString()
@@ -2706,57 +2598,55 @@ class UpdateGroupBox(QGroupBox):
             self.builds_combo.addItem(msg)
             self.builds_combo.setEnabled(False)
 
-            self.lb_html = None
+            self.lb_parser = None
             return
 
-        self.lb_html.seek(0)
-        try:
-            releases = json.loads(TextIOWrapper(self.lb_html, encoding='utf8'
-                ).read())
-        except json.decoder.JSONDecodeError:
-            releases = []
-        self.lb_html = None
+        self.lb_parser = None
 
-        builds = []
+        if status_code not in (200, 304):
+            url = self.http_reply.request().url().toString()
+            logger.warning('Could not fetch older releases when requesting '
+                f'{url}. Error: [HTTP {status_code}]')
+        elif self.lb_cache_entry is not None:
+            # Only remember the first page once the catalog is complete so
+            # an interrupted walk is retried on the next refresh
+            etag, last_modified = self.lb_cache_entry
+            set_http_cache(self.lb_request_url, etag, last_modified)
+            self.lb_cache_entry = None
+
+        self.show_builds(catalog_builds(get_remote_builds(),
+            self.base_asset['Platform'], self.base_asset['Graphics']))
+
+        if self.builds is not None:
+            if not game_dir_group_box.game_started:
+                self.builds_combo.setEnabled(True)
+            else:
+                self.previous_bc_enabled = True
 
-        asset_platform = self.base_asset['Platform']
-        asset_graphics = self.base_asset['Graphics']
+            if game_dir_group_box.exe_path is not None:
+                self.update_button.setText(_('Update game'))
 
-        target_regex = re.compile(r'cataclysmdda-(?P<major>.+)-' +
-            re.escape(asset_platform) + r'-' +
-            re.escape(asset_graphics) + r'-' +
-            r'(?P<build>\d+)\.zip'
-            )
+                if (game_dir_group_box.current_build is not None
+                    and status_bar.busy == 0
+                    and not game_dir_group_box.game_started):
+                    last_build = self.builds[0]
 
-        build_regex = re.compile(r'build #(?P<build>\d+)')
-
-        for release in releases:
-            if any(x not in release for x in ('name', 'created_at')):
-                continue
-
-            build_match = build_regex.search(release['name'])
-            if build_match is not None:
-                asset = None
-                if 'assets' in release:
-                    asset_iter = (
-                        x for x in release['assets']
-                        if 'browser_download_url' in x
-                           and 'name' in x
-                           and target_regex.search(x['name']) is not None
-                    )
-                    asset = next(asset_iter, None)
+                    message = status_bar.currentMessage()
+                    if message != '':
+                        message = message + ' - '
 
-                build = {
-                    'url': asset['browser_download_url'] if asset is not None
-                                                         else None,
-                    'name': asset['name'] if asset is not None else None,
-                    'number': build_match.group('build'),
-                    'date': arrow.get(release['created_at']).datetime
-                }
-                builds.append(build)
+                    if last_build['number'] == game_dir_group_box.current_build:
+                        message = message + _('Your game is up to date')
+                    else:
+                        message = message + _('There is a new update available')
+                    status_bar.showMessage(message)
+            else:
+                self.update_button.setText(_('Install game'))
 
+    def show_builds(self, builds):
         if len(builds) > 0:
-            builds.sort(key=lambda x: (x['number'], x['date']), reverse=True)
+            builds.sort(key=lambda x: (tryint(x['number']), x['date']),
+                reverse=True)
             self.builds = builds
 
             self.builds_combo.clear()
@@ -2786,31 +2676,6 @@ class UpdateGroupBox(QGroupBox):
                     combo_model.item(x).setText(combo_model.item(x).text() +
                         _(' - latest build available'))
 
-            if not game_dir_group_box.game_started:
-                self.builds_combo.setEnabled(True)
-            else:
-                self.previous_bc_enabled = True
-
-            if game_dir_group_box.exe_path is not None:
-                self.update_button.setText(_('Update game'))
-
-                if (game_dir_group_box.current_build is not None
-                    and status_bar.busy == 0
-                    and not game_dir_group_box.game_started):
-                    last_build = self.builds[0]
-
-                    message = status_bar.currentMessage()
-                    if message != '':
-                        message = message + ' - '
-
-                    if last_build['number'] == game_dir_group_box.current_build:
-                        message = message + _('Your game is up to date')
-                    else:
-                        message = message + _('There is a new update available')
-                    status_bar.showMessage(message)
-            else:
-                self.update_button.setText(_('Install game'))
-
         else:
             self.builds = None
 
@@ -2819,7 +2684,7 @@ class UpdateGroupBox(QGroupBox):
             self.builds_combo.setEnabled(False)
 
     def lb_http_ready_read(self):
-        self.lb_html.write(self.http_reply.readAll())
+        self.lb_parser.feed(bytes(self.http_reply.readAll()))
 
     def lb_dl_progress(self, bytes_read, total_bytes):
         self.fetching_progress_bar.setMaximum(total_bytes)
@@ -2904,7 +2769,27 @@ class UpdateGroupBox(QGroupBox):
 
         status_bar = main_window.statusBar()
         status_bar.clearMessage()
-        self.changelog_content.setHtml(_('<h3>Loading changelog...</h3>'))
+
+        # Show the cached changelog right away and only ask for the builds we
+        # do not know about yet or which were still in progress
+        changelog_builds = get_changelog_builds()
+        if any(x['locale'] != self.app_locale for x in changelog_builds):
+            clear_changelog_builds()
+            changelog_builds = []
+
+        if len(changelog_builds) > 0:
+            self.show_changelog(changelog_builds)
+
+            conditions = ['number>{number}'.format(
+                number=changelog_builds[0]['number'])]
+            conditions.extend('number={number}'.format(number=x['number'])
+                for x in changelog_builds if x['status'] == 'IN_PROGRESS')
+            changelog_url = cons.CHANGELOG_API_URL + quote(
+                '//build[{conditions}]'.format(
+                    conditions=' or '.join(conditions)))
+        else:
+            self.changelog_content.setHtml(_('<h3>Loading changelog...</h3>'))
+            changelog_url = cons.CHANGELOG_URL
 
         status_bar.busy += 1
 
@@ -2921,7 +2806,7 @@ class UpdateGroupBox(QGroupBox):
 
         self.changelog_http_data = BytesIO()
 
-        request = QNetworkRequest(QUrl(cons.CHANGELOG_URL))
+        request = QNetworkRequest(QUrl(changelog_url))
         request.setRawHeader(b'User-Agent',
             b'CDDA-Game-Launcher/' + version.encode('utf8'))
 
@@ -2933,6 +2818,9 @@ class UpdateGroupBox(QGroupBox):
             self.changelog_dl_progress)
 
     def changelog_http_finished(self):
+        mark_startup_phase('first network reply')
+        finish_startup_trace()
+
         main_window = self.get_main_window()
 
         status_bar = main_window.statusBar()
@@ -2952,17 +2840,36 @@ class UpdateGroupBox(QGroupBox):
                 status_bar.showMessage(_('Game process is running'))
 
         if self.changelog_http_data is not None:
-            self.changelog_content.setHtml(_('<h3>Parsing changelog...</h3>'))
+            if len(get_changelog_builds()) == 0:
+                self.changelog_content.setHtml(
+                    _('<h3>Parsing changelog...</h3>'))
 
             # Use thread to avoid blocking UI during parsing
             parsing_thread = ChangelogParsingThread(self.changelog_http_data)
-            parsing_thread.completed.connect(
-                lambda x: self.changelog_content.setHtml(x.getvalue()))
+            parsing_thread.parsed.connect(self.changelog_parsed)
+            parsing_thread.completed.connect(self.changelog_parsing_completed)
             parsing_thread.start()
+            self.changelog_parsing_thread = parsing_thread
 
         self.changelog_http_data = None
         self.changelog_http_reply = None
 
+    def changelog_parsed(self, changelog_builds):
+        save_changelog_builds(changelog_builds, self.app_locale,
+            cons.MAX_CHANGELOG_BUILDS)
+
+        if self.experimental_radio_button.isChecked():
+            self.show_changelog(get_changelog_builds())
+
+    def changelog_parsing_completed(self, success):
+        if not success and len(get_changelog_builds()) == 0:
+            self.changelog_content.setHtml(
+                '<h3 style="color:red">{0}</h3>'.format(
+                    _('Error parsing Changelog data. Retry later.')))
+
+    def show_changelog(self, changelog_builds):
+        self.changelog_content.set_changelog_builds(changelog_builds)
+
     def changelog_http_ready_read(self):
         self.changelog_http_data.write(self.changelog_http_reply.readAll())
 
@@ -3000,7 +2907,8 @@ class UpdateGroupBox(QGroupBox):
 
 
 class ChangelogParsingThread(QThread):
-    completed = pyqtSignal(StringIO)
+    parsed = pyqtSignal(list)
+    completed = pyqtSignal(bool)
 
     def __init__(self, changelog_http_data):
         super(ChangelogParsingThread, self).__init__()
@@ -3009,124 +2917,228 @@ class ChangelogParsingThread(QThread):
     def __del__(self):
         self.wait()
 
-    def get_results_by_platform(self, build_data):
-        regex = re.compile(r'.*\b'
-                           r'(?P<ui>Curses|Tiles),'
-                           r'(?P<plat>Linux_x64|Windows(?:_x64)?)'
-                           r'\b.*')
-
-        def platform_display_name(code_name):
-            code_name = regex.sub(r'\g<ui>-\g<plat>',
-                                  code_name.find('fullDisplayName').text)
-
-            if code_name == 'Tiles-Windows': return _('Windows x86')
-            if code_name == 'Tiles-Windows_x64': return _('Windows x64')
-            if code_name == 'Curses-Linux_x64': return _('All Platforms')
-            return None
-
-        build_platforms = build_data.findall(r'.//run')
-        build_platforms = filter(
-            lambda x: x.find('result') is not None and
-                      x.find('fullDisplayName') is not None and
-                      regex.search(x.find('fullDisplayName').text) is not None,
-            build_platforms
-        )
-
-        return tuple({'result': x.find('result').text,
-                      'platform': platform_display_name(x)}
-                     for x in build_platforms
-                     if platform_display_name(x) is not None)
-
     @property
     def app_locale(self):
         return QApplication.instance().app_locale
 
     def run(self):
-        changelog_html = StringIO()
         self.changelog_http_data.seek(0)
+
+        # Send the builds in batches so the first ones can be shown while the
+        # rest is being parsed
+        changelog_builds = []
         try:
-            changelog_xml = xml.etree.ElementTree.fromstring(
-                                self.changelog_http_data.read())
-        except xml.etree.ElementTree.ParseError as err:
+            for changelog_build in iter_changelog_builds(
+                self.changelog_http_data, self.app_locale):
+                changelog_builds.append(changelog_build)
+                if len(changelog_builds) >= cons.CHANGELOG_BATCH_SIZE:
+                    self.parsed.emit(changelog_builds)
+                    changelog_builds = []
+        except xml.etree.ElementTree.ParseError:
             log_exception(*sys.exc_info())
-            changelog_html.write(
-                '<h3 style="color:red">{0}</h3>'.format(
-                    _('Error parsing Changelog data. Retry later.')))
-            self.completed.emit(changelog_html)
+            if len(changelog_builds) > 0:
+                self.parsed.emit(changelog_builds)
+            self.completed.emit(False)
             return
 
+        if len(changelog_builds) > 0:
+            self.parsed.emit(changelog_builds)
+        self.completed.emit(True)
 
-        ### "((?<![\w#])(?=[\w#])|(?<=[\w#])(?![\w#]))" is like a \b
-        ### that accepts "#" as word char too.
-        ### regex used to match issues / PR IDs like "#43151"
-        id_regex = re.compile(r'((?<![\w#])(?=[\w#])|(?<=[\w#])(?![\w#]))'
-                              r'#(?P<id>\d+)\b')
 
-        for build_data in changelog_xml:
-            build_by_platform = self.get_results_by_platform(build_data)
-            if build_data.find('building').text == 'true':
-                build_status = 'IN_PROGRESS'
-            elif any(x['result'] == 'FAILURE' for x in build_by_platform):
-                build_status = 'FAILURE'
-            else:
-                ### possible "result" values: 'SUCCESS' or 'FAILURE'
-                build_status = 'SUCCESS'
-
-            build_timestamp = int(build_data.find('timestamp').text) // 1000
-            build_date_utc = datetime.utcfromtimestamp(build_timestamp)
-            build_date_utc = build_date_utc.replace(tzinfo=timezone.utc)
-            build_date_local = build_date_utc.astimezone(tz=None)
-            build_date_text = format_datetime(build_date_local,
-                format='long', locale=self.app_locale)
-
-            build_changes = build_data.findall(r'.//changeSet/item/msg')
-            build_changes = map(lambda x: html.escape(x.text.strip(), True),
-                                build_changes)
-            build_changes = list(unique(build_changes))
-            build_number = int(build_data.find('number').text)
-            build_desc = _('Build #{build_number}').format(build_number=build_number)
-            build_link = f'<a href="{cons.BUILD_CHANGES_URL(build_number)}">{build_desc}</a>'
-
-            if build_status == 'IN_PROGRESS':
-                changelog_html.write(
-                    '<h4>{0} - {1} <span style="color:purple">{2}</span></h4>'
-                    .format(
-                        build_link,
-                        build_date_text,
-                        _('build still in progress!')
-                    )
-                )
-            elif build_status == 'SUCCESS':
-                changelog_html.write(
-                    '<h4>{0} - {1}</h4>'
-                    .format(build_link, build_date_text)
-                )
-            else:   ### build_status == 'FAILURE'
-                changelog_html.write(
-                    '<h4>{0} - {1} <span style="color:red">{2} {3}</span></h4>'
-                    .format(
-                        build_link,
-                        build_date_text,
-                        _('but build failed for:'),
-                        ', '.join(map(lambda x: x['platform'],
-                                      filter(lambda y: y['result'] == 'FAILURE',
-                                             build_by_platform)))
-                    )
-                )
+class CustomContentThread(QThread):
+    '''Find the custom content of previous_version_dir which is missing from
+    game_dir and copy it there.'''
 
-            changelog_html.write('<ul>')
-            if len(build_changes) < 1:
-                changelog_html.write(
-                    '<li><span style="color:green">{0}</span></li>'
-                    .format(_('No changes, same code as previous build!')))
-            else:
-                for change in build_changes:
-                    link_repl = rf'<a href="{cons.CDDA_ISSUE_URL_ROOT}\g<id>">#\g<id></a>'
-                    change = id_regex.sub(link_repl, change)
-                    changelog_html.write(f'<li>{change}</li>')
-            changelog_html.write('</ul>')
+    copying = pyqtSignal(str, object)
+    # Sizes in bytes, which can be over the range of int
+    progress = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, game_dir, previous_version_dir):
+        super(CustomContentThread, self).__init__()
+
+        self.game_dir = game_dir
+        self.previous_version_dir = previous_version_dir
+
+    def __del__(self):
+        self.wait()
+
+    def run(self):
+        try:
+            copies = custom_content(self.game_dir, self.previous_version_dir)
+            copy_custom_content(copies, self.copying.emit,
+                self.progress.emit, self.isInterruptionRequested)
+        except OSError as e:
+            self.failed.emit(str(e))
+
+
+# Changelog view which only lays out a window of a few pages of builds around
+# the visible part. Pages are added on the side being scrolled to and dropped
+# on the other side, so the layout cost does not depend on the number of
+# builds kept.
+class ChangelogBrowser(QTextBrowser):
+    def __init__(self):
+        super(ChangelogBrowser, self).__init__()
 
-        self.completed.emit(changelog_html)
+        self.changelog_builds = []
+        self.first_build = 0
+        # Builds and characters of each rendered page. The pages are
+        # separated by a block separator in the document.
+        self.pages = deque()
+        self.rendering = False
+        self.filling = False
+
+        self.verticalScrollBar().valueChanged.connect(self.scrolled)
+
+    def setHtml(self, text):
+        self.changelog_builds = []
+        self.first_build = 0
+        self.pages.clear()
+        super(ChangelogBrowser, self).setHtml(text)
+
+    @property
+    def last_build(self):
+        return self.first_build + sum(x[0] for x in self.pages)
+
+    def set_changelog_builds(self, changelog_builds):
+        scroll_bar = self.verticalScrollBar()
+        scroll_value = scroll_bar.value()
+
+        # Render the same window again with the new builds
+        first_build = min(self.first_build, max(len(changelog_builds) -
+            cons.CHANGELOG_PAGE_SIZE, 0))
+        page_count = max(len(self.pages), 1)
+
+        super(ChangelogBrowser, self).setHtml('')
+        self.changelog_builds = changelog_builds
+        self.first_build = first_build
+        self.pages.clear()
+
+        self.rendering = True
+        for index in range(page_count):
+            if not self.append_page():
+                break
+        self.rendering = False
+
+        scroll_bar.setValue(scroll_value)
+        self.fill_viewport()
+
+    def page_html(self, start, end):
+        return ''.join(x['html'] for x in self.changelog_builds[start:end])
+
+    def append_page(self):
+        start = self.last_build
+        end = min(start + cons.CHANGELOG_PAGE_SIZE, len(self.changelog_builds))
+        if start >= end:
+            return False
+
+        document = self.document()
+        characters = document.characterCount()
+
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.End)
+        if len(self.pages) > 0:
+            # A new block keeps the last page from being merged with this one
+            cursor.insertBlock()
+            characters += 1
+        cursor.insertHtml(self.page_html(start, end))
+
+        self.pages.append((end - start, document.characterCount() -
+            characters))
+
+        if len(self.pages) > cons.CHANGELOG_WINDOW_PAGES:
+            self.drop_first_page()
+
+        return True
+
+    def prepend_page(self):
+        end = self.first_build
+        start = max(end - cons.CHANGELOG_PAGE_SIZE, 0)
+        if start >= end:
+            return False
+
+        document = self.document()
+        characters = document.characterCount()
+        height = document.size().height()
+
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.Start)
+        cursor.insertBlock()
+        cursor.movePosition(QTextCursor.Start)
+        cursor.insertHtml(self.page_html(start, end))
+
+        self.pages.appendleft((end - start, document.characterCount() -
+            characters - 1))
+        self.first_build = start
+
+        self.scroll_by(document.size().height() - height)
+
+        if len(self.pages) > cons.CHANGELOG_WINDOW_PAGES:
+            self.drop_last_page()
+
+        return True
+
+    def drop_first_page(self):
+        builds, characters = self.pages.popleft()
+
+        document = self.document()
+        height = document.size().height()
+
+        # Remove the page and the separator after it
+        cursor = QTextCursor(document)
+        cursor.setPosition(0)
+        cursor.setPosition(characters + 1, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+
+        self.first_build += builds
+
+        self.scroll_by(document.size().height() - height)
+
+    def drop_last_page(self):
+        builds, characters = self.pages.pop()
+
+        # Remove the page and the separator before it
+        end = self.document().characterCount() - 1
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(end - characters - 1)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+
+    def scroll_by(self, height):
+        # Keep the same builds in view when the content above them changes
+        if not self.rendering:
+            scroll_bar = self.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.value() + round(height))
+
+    def fill_viewport(self):
+        if self.filling:
+            return
+
+        scroll_bar = self.verticalScrollBar()
+        self.filling = True
+        try:
+            # Moving the whole window at most once keeps a short window from
+            # going back and forth
+            for index in range(cons.CHANGELOG_WINDOW_PAGES):
+                if (scroll_bar.value() >= scroll_bar.maximum() -
+                    scroll_bar.pageStep()):
+                    if not self.append_page():
+                        break
+                elif scroll_bar.value() <= scroll_bar.pageStep():
+                    if not self.prepend_page():
+                        break
+                else:
+                    break
+        finally:
+            self.filling = False
+
+    def scrolled(self, value):
+        self.fill_viewport()
+
+    def resizeEvent(self, event):
+        super(ChangelogBrowser, self).resizeEvent(event)
+        self.fill_viewport()
 
 
 # Recursively delete an entire directory tree while showing progress in a
@@ -3157,45 +3169,37 @@ class ProgressRmTree(QTimer):
 
     def step(self):
         if self.analysing:
-            if self.current_scan is None:
-                self.current_scan = scandir(self.src)
-            else:
-                try:
-                    entry = next(self.current_scan)
-                    self.source_entries.append(entry)
-                    if entry.is_dir():
-                        self.next_scans.append(entry.path)
-                    elif entry.is_file():
-                        self.total_files += 1
+            try:
+                entry = next(self.entries)
+                self.source_entries.append(entry)
+                if entry.is_file():
+                    self.total_files += 1
 
-                        files_text = ngettext('file', 'files', self.total_files)
+                    files_text = ngettext('file', 'files', self.total_files)
 
-                        self.status_label.setText(_('Analysing {name} - Found '
-                            '{file_count} {files}').format(
-                                name=self.name,
-                                file_count=self.total_files,
-                                files=files_text))
+                    self.status_label.setText(_('Analysing {name} - Found '
+                        '{file_count} {files}').format(
+                            name=self.name,
+                            file_count=self.total_files,
+                            files=files_text))
 
-                except StopIteration:
-                    if len(self.next_scans) > 0:
-                        self.current_scan = scandir(self.next_scans.popleft())
-                    else:
-                        self.analysing = False
+            except StopIteration:
+                self.analysing = False
 
-                        if len(self.source_entries) > 0:
-                            self.deleting = True
+                if len(self.source_entries) > 0:
+                    self.deleting = True
 
-                            progress_bar = QProgressBar()
-                            progress_bar.setRange(0, self.total_files)
-                            progress_bar.setValue(0)
-                            self.status_bar.addWidget(progress_bar)
-                            self.progress_bar = progress_bar
+                    progress_bar = QProgressBar()
+                    progress_bar.setRange(0, self.total_files)
+                    progress_bar.setValue(0)
+                    self.status_bar.addWidget(progress_bar)
+                    self.progress_bar = progress_bar
 
-                            self.deleted_files = 0
-                            self.current_entry = None
-                        else:
-                            self.delete_completed = True
-                            self.stop()
+                    self.deleted_files = 0
+                    self.current_entry = None
+                else:
+                    self.delete_completed = True
+                    self.stop()
 
         elif self.deleting:
             if self.current_entry is None:
@@ -3206,12 +3210,7 @@ class ProgressRmTree(QTimer):
                     # Remove the source directory
                     while os.path.exists(self.src):
                         try:
-                            try:
-                                os.rmdir(self.src)
-                            except OSError:
-                                # Remove read-only and try again
-                                os.chmod(self.src, stat.S_IWRITE)
-                                os.rmdir(self.src)
+                            remove_entry(self.src, True)
                         except OSError as e:
                             retry_msgbox = QMessageBox()
                             retry_msgbox.setWindowTitle(
@@ -3262,20 +3261,8 @@ that file or directory. You might need to end it if you want to retry.</p>'''
             else:
                 while os.path.exists(self.current_entry.path):
                     try:
-                        if self.current_entry.is_dir():
-                            try:
-                                os.rmdir(self.current_entry.path)
-                            except OSError:
-                                # Remove read-only and try again
-                                os.chmod(self.current_entry.path, stat.S_IWRITE)
-                                os.rmdir(self.current_entry.path)
-                        elif self.current_entry.is_file():
-                            try:
-                                os.unlink(self.current_entry.path)
-                            except OSError:
-                                # Remove read-only and try again
-                                os.chmod(self.current_entry.path, stat.S_IWRITE)
-                                os.unlink(self.current_entry.path)
+                        remove_entry(self.current_entry.path,
+                            self.current_entry.is_dir())
                     except OSError as e:
                         retry_msgbox = QMessageBox()
                         retry_msgbox.setWindowTitle(
@@ -3344,8 +3331,7 @@ that file or directory. You might need to end it if you want to retry.</p>'''
 
         self.timeout.connect(self.step)
 
-        self.current_scan = None
-        self.next_scans = deque()
+        self.entries = tree_entries(self.src)
         self.source_entries = deque()
 
         super(ProgressRmTree, self).start(0)
@@ -3395,121 +3381,97 @@ class ProgressCopyTree(QTimer):
         self.copying_size_label = None
         self.progress_bar = None
 
-        self.source_file = None
-        self.destination_file = None
+        self.entry_copy = None
 
         self.analysing = False
         self.copying = False
         self.copy_completed = False
 
+        self.copy_span = None
+
     def step(self):
         if self.analysing:
-            if self.current_scan is None:
-                self.current_scan = scandir(self.src)
-            else:
-                try:
-                    entry = next(self.current_scan)
-                    if self.skips is None or entry.path not in self.skips:
-                        self.source_entries.append(entry)
-                        if entry.is_dir():
-                            self.next_scans.append(entry.path)
-                        elif entry.is_file():
-                            self.total_files += 1
-                            self.total_copy_size += entry.stat().st_size
-
-                            files_text = ngettext('file', 'files',
-                                self.total_files)
-
-                            self.status_label.setText(_('Analysing {name} - '
-                                'Found {file_count} {files} ({size})').format(
-                                    name=self.name,
-                                    file_count=self.total_files,
-                                    files=files_text,
-                                    size=sizeof_fmt(self.total_copy_size)))
+            try:
+                entry = next(self.entries)
+                self.source_entries.append(entry)
+                if entry.is_file():
+                    self.total_files += 1
+                    self.total_copy_size += entry.stat().st_size
 
-                except StopIteration:
-                    if len(self.next_scans) > 0:
-                        self.current_scan = scandir(self.next_scans.popleft())
-                    else:
-                        self.analysing = False
-
-                        os.makedirs(self.dst)
-
-                        if len(self.source_entries) > 0:
-                            self.copying = True
-
-                            copying_speed_label = QLabel()
-                            copying_speed_label.setText(_('{bytes_sec}/s'
-                                ).format(bytes_sec=sizeof_fmt(0)))
-                            self.status_bar.addWidget(copying_speed_label)
-                            self.copying_speed_label = copying_speed_label
-
-                            copying_size_label = QLabel()
-                            copying_size_label.setText(
-                                '{bytes_read}/{total_bytes}'
-                                .format(bytes_read=sizeof_fmt(0),
-                                        total_bytes=sizeof_fmt(self.total_copy_size))
-                            )
-                            self.status_bar.addWidget(copying_size_label)
-                            self.copying_size_label = copying_size_label
-
-                            progress_bar = QProgressBar()
-                            progress_bar.setRange(0, self.total_copy_size)
-                            progress_bar.setValue(0)
-                            self.status_bar.addWidget(progress_bar)
-                            self.progress_bar = progress_bar
-
-                            self.copied_size = 0
-                            self.copied_files = 0
-                            self.copy_speed_count = 0
-                            self.last_copied_bytes = 0
-                            self.last_copied = datetime.utcnow()
-                            self.current_entry = None
-                            self.source_file = None
-                            self.destination_file = None
-                        else:
-                            self.copy_completed = True
-                            self.stop()
+                    files_text = ngettext('file', 'files', self.total_files)
+
+                    self.status_label.setText(_('Analysing {name} - Found '
+                        '{file_count} {files} ({size})').format(
+                            name=self.name,
+                            file_count=self.total_files,
+                            files=files_text,
+                            size=sizeof_fmt(self.total_copy_size)))
+
+            except StopIteration:
+                self.analysing = False
+
+                os.makedirs(self.dst)
+
+                if len(self.source_entries) > 0:
+                    self.copying = True
+
+                    copying_speed_label = QLabel()
+                    copying_speed_label.setText(_('{bytes_sec}/s'
+                        ).format(bytes_sec=sizeof_fmt(0)))
+                    self.status_bar.addWidget(copying_speed_label)
+                    self.copying_speed_label = copying_speed_label
+
+                    copying_size_label = QLabel()
+                    copying_size_label.setText(
+                        '{bytes_read}/{total_bytes}'
+                        .format(bytes_read=sizeof_fmt(0),
+                                total_bytes=sizeof_fmt(self.total_copy_size))
+                    )
+                    self.status_bar.addWidget(copying_size_label)
+                    self.copying_size_label = copying_size_label
+
+                    progress_bar = QProgressBar()
+                    progress_bar.setRange(0, self.total_copy_size)
+                    progress_bar.setValue(0)
+                    self.status_bar.addWidget(progress_bar)
+                    self.progress_bar = progress_bar
+
+                    self.copied_size = 0
+                    self.copied_files = 0
+                    self.copy_speed_count = 0
+                    self.last_copied_bytes = 0
+                    self.last_copied = datetime.utcnow()
+                    self.current_entry = None
+                    self.entry_copy = None
+
+                    self.copy_span = metrics.start_span('copy',
+                        src=self.src, dst=self.dst)
+                else:
+                    self.copy_completed = True
+                    self.stop()
 
         elif self.copying:
             if self.current_entry is None:
                 if len(self.source_entries) > 0:
                     self.current_entry = self.source_entries.popleft()
                     self.display_entry(self.current_entry)
+                    self.entry_copy = copy_entry(self.current_entry,
+                        self.src, self.dst)
                 else:
                     self.copying = False
                     self.copy_completed = True
                     self.stop()
-            elif self.source_file is None and self.destination_file is None:
-                relpath = os.path.relpath(self.current_entry.path, self.src)
-                dstpath = os.path.join(self.dst, relpath)
-                self.dstpath = dstpath
-
-                if self.current_entry.is_dir():
-                    os.makedirs(dstpath)
-                    self.current_entry = None
-                elif self.current_entry.is_file():
-                    filedir = os.path.dirname(dstpath)
-                    if not os.path.isdir(filedir):
-                        os.makedirs(filedir)
-                    self.source_file = open(self.current_entry.path, 'rb')
-                    self.destination_file = open(dstpath, 'wb')
             else:
-                buf = self.source_file.read(cons.READ_BUFFER_SIZE)
-                buf_len = len(buf)
-                if buf_len == 0:
-                    self.source_file.close()
-                    self.destination_file.close()
-                    shutil.copystat(self.current_entry.path, self.dstpath)
-                    self.source_file = None
-                    self.destination_file = None
+                try:
+                    buf_len = next(self.entry_copy)
+                except StopIteration:
+                    if self.current_entry.is_file():
+                        self.copied_files += 1
+                    self.entry_copy = None
                     self.current_entry = None
-
-                    self.copied_files += 1
                 else:
-                    self.destination_file.write(buf)
-
                     self.copied_size += buf_len
+                    self.copy_span.add_bytes(buf_len)
                     self.progress_bar.setValue(self.copied_size)
 
                     self.copy_speed_count += 1
@@ -3557,8 +3519,7 @@ class ProgressCopyTree(QTimer):
 
         self.timeout.connect(self.step)
 
-        self.current_scan = None
-        self.next_scans = deque()
+        self.entries = tree_entries(self.src, self.skips)
         self.source_entries = deque()
 
         super(ProgressCopyTree, self).start(0)
@@ -3577,10 +3538,11 @@ class ProgressCopyTree(QTimer):
             if self.copying_size_label is not None:
                 self.status_bar.removeWidget(self.copying_size_label)
 
-            if self.source_file is not None:
-                self.source_file.close()
-            if self.destination_file is not None:
-                self.destination_file.close()
+            if self.entry_copy is not None:
+                self.entry_copy.close()
+
+        if self.copy_span is not None:
+            self.copy_span.finish(self.copy_completed)
 
         if self.copy_completed:
             self.completed.emit()
@@ -1,38 +1,40 @@
+import bisect
 import html
 import json
 import logging
 import os
-import random
 import shutil
-import sys
-import tempfile
-import zipfile
-from collections import deque
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from os import scandir
-from urllib.parse import urljoin, urlencode
+from urllib.parse import urlencode
 
-import rarfile
-from PyQt5.QtCore import Qt, QTimer, QUrl, QFileInfo, QStringListModel
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt5.QtCore import (
+    Qt, QTimer, QStringListModel, QThread, pyqtSignal
+)
 from PyQt5.QtWidgets import (
-    QWidget, QGridLayout, QGroupBox, QVBoxLayout, QLabel, QLineEdit, QPushButton, QProgressBar, QTextBrowser,
+    QWidget, QGridLayout, QGroupBox, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTextBrowser,
     QTabWidget, QMessageBox, QHBoxLayout, QListView, QAbstractItemView, QTextEdit
 )
-from py7zlib import Archive7z, NoPasswordGivenError, FormatError
-from rfc6266 import parse_headers as parse_cd_headers
 
 import cddagl.constants as cons
 from cddagl import __version__ as version
-from cddagl.constants import get_data_path, get_cddagl_path
+from cddagl.constants import get_data_path
+from cddagl.fileops import new_mod_dirs, scan_mod_dir
 from cddagl.functions import sizeof_fmt, delete_path
 from cddagl.i18n import proxy_gettext as _
+from cddagl.sql.functions import get_mod_scans, save_mod_scans
+from cddagl.search import SearchIndex
+from cddagl.ui.models import SearchFilterProxyModel, visible_source_rows
+from cddagl.ui.network import RemoteSizeFetcher
 from cddagl.ui.views.dialogs import BrowserDownloadDialog
+from cddagl.ui.views.installs import (
+    InstallItem, InstallQueue, InstallsGroupBox
+)
 
 logger = logging.getLogger('cddagl')
 
-if getattr(sys, 'frozen', False):
-    rarfile.UNRAR_TOOL = get_cddagl_path('UnRAR.exe')
+REPOSITORY_SEARCH_FIELDS = ('name', 'ident', 'author', 'authors',
+    'category', 'description')
 
 
 class ModsTab(QTabWidget):
@@ -40,23 +42,26 @@ class ModsTab(QTabWidget):
         super(ModsTab, self).__init__()
 
         self.tab_disabled = False
-        self.qnam = QNetworkAccessManager()
 
-        self.http_reply = None
-        self.current_repo_info = None
+        size_fetcher = RemoteSizeFetcher()
+        size_fetcher.size_found.connect(self.remote_size_found)
+        self.size_fetcher = size_fetcher
+
+        size_prefetch_timer = QTimer()
+        size_prefetch_timer.setSingleShot(True)
+        size_prefetch_timer.setInterval(cons.REMOTE_SIZE_PREFETCH_DELAY)
+        size_prefetch_timer.timeout.connect(self.prefetch_visible_sizes)
+        self.size_prefetch_timer = size_prefetch_timer
 
         self.mods = []
         self.mods_model = None
+        self.mods_scan_thread = None
 
-        self.installing_new_mod = False
-        self.downloading_new_mod = False
-        self.extracting_new_mod = False
-
-        self.install_type = None
-        self.extracting_file = None
-        self.extracting_zipfile = None
-
-        self.close_after_install = False
+        install_queue = InstallQueue(new_mod_dirs, self.add_new_mods)
+        install_queue.started.connect(self.installs_started)
+        install_queue.item_finished.connect(self.install_finished)
+        install_queue.emptied.connect(self.installs_emptied)
+        self.install_queue = install_queue
 
         self.game_dir = None
         self.mods_dir = None
@@ -111,9 +116,20 @@ class ModsTab(QTabWidget):
         repository_gb.setLayout(repository_gb_layout)
         self.repository_gb_layout = repository_gb_layout
 
+        repository_search_le = QLineEdit()
+        repository_search_le.setClearButtonEnabled(True)
+        repository_search_le.textChanged.connect(
+            self.repository_search_changed)
+        repository_gb_layout.addWidget(repository_search_le)
+        self.repository_search_le = repository_search_le
+
         repository_lv = QListView()
         repository_lv.clicked.connect(self.repository_clicked)
         repository_lv.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        repository_lv.verticalScrollBar().valueChanged.connect(
+            self.schedule_size_prefetch)
+        repository_lv.verticalScrollBar().rangeChanged.connect(
+            self.schedule_size_prefetch)
         repository_gb_layout.addWidget(repository_lv)
         self.repository_lv = repository_lv
 
@@ -132,6 +148,10 @@ class ModsTab(QTabWidget):
         layout.addWidget(top_part)
         self.top_part = top_part
 
+        installs_gb = InstallsGroupBox(install_queue)
+        layout.addWidget(installs_gb)
+        self.installs_gb = installs_gb
+
         details_gb = QGroupBox()
         layout.addWidget(details_gb)
         self.details_gb = details_gb
@@ -247,7 +267,9 @@ class ModsTab(QTabWidget):
         self.suggest_new_label.setText(_('<a href="{url}">Suggest a new mod '
             'on GitHub</a>').format(url=suggest_url))
         self.repository_gb.setTitle(_('Repository'))
+        self.repository_search_le.setPlaceholderText(_('Search'))
         self.install_new_button.setText(_('Install this mod'))
+        self.installs_gb.set_text()
         self.details_gb.setTitle(_('Details'))
         self.name_label.setText(_('Name:'))
         self.ident_label.setText(_('Ident:'))
@@ -314,7 +336,8 @@ class ModsTab(QTabWidget):
         else:
             repository_selected = repository_selection.hasSelection()
 
-        self.install_new_button.setEnabled(repository_selected)
+        self.install_new_button.setEnabled(repository_selected
+            and self.mods_scan_thread is None)
 
     def load_repository(self):
         self.repo_mods = []
@@ -322,9 +345,6 @@ class ModsTab(QTabWidget):
         self.install_new_button.setEnabled(False)
 
         self.repo_mods_model = QStringListModel()
-        self.repository_lv.setModel(self.repo_mods_model)
-        self.repository_lv.selectionModel().currentChanged.connect(
-            self.repository_selection)
 
         json_file = get_data_path('mods.json')
 
@@ -347,602 +367,134 @@ class ModsTab(QTabWidget):
                 except ValueError:
                     pass
 
-    def install_new(self):
-        if not self.installing_new_mod:
-            selection_model = self.repository_lv.selectionModel()
-            if selection_model is None or not selection_model.hasSelection():
-                return
-
-            selected = selection_model.currentIndex()
-            selected_info = self.repo_mods[selected.row()]
-
-            mod_idents = selected_info['ident']
-            if isinstance(mod_idents, list):
-                mod_idents = set(mod_idents)
-            else:
-                mod_idents = set((mod_idents, ))
-
-            # Is it already installed?
-            for mod in self.mods:
-                if mod['ident'] in mod_idents:
-                    confirm_msgbox = QMessageBox()
-                    confirm_msgbox.setWindowTitle(_('Mod already present'))
-                    confirm_msgbox.setText(_('It seems this mod is '
-                        'already installed. The launcher will not overwrite '
-                        'the mod if it has the same directory name. You '
-                        'might want to delete the mod first if you want '
-                        'to update it. Also, there can only be a single '
-                        'mod with the same ident value available in the '
-                        'game.'))
-                    confirm_msgbox.setInformativeText(_('Are you sure you want '
-                        'to install the {name} mod?').format(
-                            name=selected_info['name']))
-                    confirm_msgbox.addButton(_('Install the mod'),
-                        QMessageBox.YesRole)
-                    confirm_msgbox.addButton(_('Do not install again'),
-                        QMessageBox.NoRole)
-                    confirm_msgbox.setIcon(QMessageBox.Warning)
-
-                    if confirm_msgbox.exec() == 1:
-                        return
-                    break
-
-            self.install_type = selected_info['type']
-
-            if selected_info['type'] == 'direct_download':
-                if self.http_reply is not None and self.http_reply.isRunning():
-                    self.http_reply_aborted = True
-                    self.http_reply.abort()
-
-                self.installing_new_mod = True
-                self.download_aborted = False
-
-                download_dir = tempfile.mkdtemp(prefix=cons.TEMP_PREFIX)
-                self.download_dir = download_dir
-
-                download_url = selected_info['url']
-
-                url = QUrl(download_url)
-                file_info = QFileInfo(url.path())
-                file_name = file_info.fileName()
-                self.downloaded_file = os.path.join(self.download_dir,
-                    file_name)
-                self.download_first_ready = True
-                self.downloading_file = None
-
-                main_window = self.get_main_window()
-
-                status_bar = main_window.statusBar()
-                status_bar.clearMessage()
-
-                status_bar.busy += 1
-
-                downloading_label = QLabel()
-                downloading_label.setText(_('Downloading: {0}').format(
-                    selected_info['url']))
-                status_bar.addWidget(downloading_label, 100)
-                self.downloading_label = downloading_label
-
-                dowloading_speed_label = QLabel()
-                status_bar.addWidget(dowloading_speed_label)
-                self.dowloading_speed_label = dowloading_speed_label
-
-                downloading_size_label = QLabel()
-                status_bar.addWidget(downloading_size_label)
-                self.downloading_size_label = downloading_size_label
-
-                progress_bar = QProgressBar()
-                status_bar.addWidget(progress_bar)
-                self.downloading_progress_bar = progress_bar
-                progress_bar.setMinimum(0)
-
-                self.download_last_read = datetime.utcnow()
-                self.download_last_bytes_read = 0
-                self.download_speed_count = 0
-
-                self.downloading_new_mod = True
-
-                request = QNetworkRequest(QUrl(url))
-                request.setRawHeader(b'User-Agent', cons.FAKE_USER_AGENT)
-
-                self.download_http_reply = self.qnam.get(request)
-                self.download_http_reply.finished.connect(
-                    self.download_http_finished)
-                self.download_http_reply.readyRead.connect(
-                    self.download_http_ready_read)
-                self.download_http_reply.downloadProgress.connect(
-                    self.download_dl_progress)
-
-                self.install_new_button.setText(_('Cancel mod installation'))
-                self.installed_lv.setEnabled(False)
-                self.repository_lv.setEnabled(False)
-
-                self.get_main_tab().disable_tab()
-                self.get_soundpacks_tab().disable_tab()
-                self.get_settings_tab().disable_tab()
-                self.get_backups_tab().disable_tab()
-            elif selected_info['type'] == 'browser_download':
-                bd_dialog = BrowserDownloadDialog('mod',
-                    selected_info['url'], selected_info.get('expected_filename',
-                        None))
-                bd_dialog.exec()
-
-                if bd_dialog.downloaded_path is not None:
-
-                    main_window = self.get_main_window()
-                    status_bar = main_window.statusBar()
-
-                    if not os.path.isfile(bd_dialog.downloaded_path):
-                        status_bar.showMessage(_('Could not find downloaded '
-                            'file archive'))
-                    else:
-                        self.installing_new_mod = True
-                        self.downloaded_file = bd_dialog.downloaded_path
-
-                        self.install_new_button.setText(_('Cancel mod '
-                            'installation'))
-                        self.installed_lv.setEnabled(False)
-                        self.repository_lv.setEnabled(False)
-
-                        self.get_main_tab().disable_tab()
-                        self.get_soundpacks_tab().disable_tab()
-                        self.get_settings_tab().disable_tab()
-                        self.get_backups_tab().disable_tab()
-
-                        # Test downloaded file
-                        status_bar.showMessage(_('Testing downloaded file '
-                            'archive'))
-
-                        if self.downloaded_file.lower().endswith('.7z'):
-                            try:
-                                with open(self.downloaded_file, 'rb') as f:
-                                    archive = Archive7z(f)
-                            except FormatError:
-                                status_bar.clearMessage()
-                                status_bar.showMessage(_('Selected file is a '
-                                    'bad archive file'))
-
-                                self.finish_install_new_mod()
-                                return
-                            except NoPasswordGivenError:
-                                status_bar.clearMessage()
-                                status_bar.showMessage(_('Selected file is a '
-                                    'password protected archive file'))
-
-                                self.finish_install_new_mod()
-                                return
-                        else:
-                            if self.downloaded_file.lower().endswith('.zip'):
-                                archive_class = zipfile.ZipFile
-                                archive_exception = zipfile.BadZipFile
-                                test_method = 'testzip'
-                            elif self.downloaded_file.lower().endswith('.rar'):
-                                archive_class = rarfile.RarFile
-                                archive_exception = rarfile.Error
-                                test_method = 'testrar'
-
-                            try:
-                                with archive_class(self.downloaded_file) as z:
-                                    test = getattr(z, test_method)
-                                    if test() is not None:
-                                        status_bar.clearMessage()
-                                        status_bar.showMessage(
-                                            _('Downloaded archive is invalid'))
-
-                                        self.finish_install_new_mod()
-                                        return
-                            except archive_exception:
-                                status_bar.clearMessage()
-                                status_bar.showMessage(_('Selected file is a '
-                                    'bad archive file'))
-
-                                self.finish_install_new_mod()
-                                return
-
-                        status_bar.clearMessage()
-                        self.extract_new_mod()
-        else:
-            main_window = self.get_main_window()
-            status_bar = main_window.statusBar()
-
-            # Cancel installation
-            if self.downloading_new_mod:
-                self.download_aborted = True
-                self.download_http_reply.abort()
-            elif self.extracting_new_mod:
-                self.extracting_timer.stop()
-
-                status_bar.removeWidget(self.extracting_label)
-                status_bar.removeWidget(self.extracting_progress_bar)
-
-                status_bar.busy -= 1
-
-                self.extracting_new_mod = False
-
-                if self.extracting_zipfile is not None:
-                    self.extracting_zipfile.close()
-
-                if self.install_type == 'direct_download':
-                    download_dir = os.path.dirname(self.downloaded_file)
-                    delete_path(download_dir)
-
-                if os.path.isdir(self.extract_dir):
-                    delete_path(self.extract_dir)
+        # Sizes found in the previous sessions
+        cached_sizes = self.size_fetcher.load_cached([x['url']
+            for x in self.repo_mods if x['type'] == 'direct_download'
+            and 'size' not in x])
+        for repo_info in self.repo_mods:
+            if repo_info.get('url', None) in cached_sizes:
+                repo_info['size'] = cached_sizes[repo_info['url']]
+
+        # Searches are made on the entries while the list shows the names
+        search_index = SearchIndex(self.repo_mods, REPOSITORY_SEARCH_FIELDS)
+        repo_mods_proxy = SearchFilterProxyModel(search_index)
+        repo_mods_proxy.setSourceModel(self.repo_mods_model)
+        repo_mods_proxy.set_query(self.repository_search_le.text())
+        self.repo_mods_proxy = repo_mods_proxy
+
+        self.repository_lv.setModel(repo_mods_proxy)
+        self.repository_lv.selectionModel().currentChanged.connect(
+            self.repository_selection)
 
-            status_bar.showMessage(_('Soundpack installation cancelled'))
+    def repository_search_changed(self, text):
+        self.repo_mods_proxy.set_query(text)
+        self.schedule_size_prefetch()
 
-            self.finish_install_new_mod()
+    def install_new(self):
+        selection_model = self.repository_lv.selectionModel()
+        if selection_model is None or not selection_model.hasSelection():
+            return
 
-    def download_http_finished(self):
-        if self.downloading_file is not None:
-            self.downloading_file.close()
+        selected = selection_model.currentIndex()
+        selected_info = self.repo_mods[
+            self.repo_mods_proxy.mapToSource(selected).row()]
 
         main_window = self.get_main_window()
-
         status_bar = main_window.statusBar()
-        status_bar.removeWidget(self.downloading_label)
-        status_bar.removeWidget(self.dowloading_speed_label)
-        status_bar.removeWidget(self.downloading_size_label)
-        status_bar.removeWidget(self.downloading_progress_bar)
 
-        status_bar.busy -= 1
-
-        if self.download_aborted:
-            delete_path(self.download_dir)
+        if self.install_queue.has_url(selected_info['url']):
+            status_bar.showMessage(_('The {name} mod is already being '
+                'installed').format(name=selected_info['name']))
+            return
 
-            self.downloading_new_mod = False
+        mod_idents = selected_info['ident']
+        if isinstance(mod_idents, list):
+            mod_idents = set(mod_idents)
         else:
-            redirect = self.download_http_reply.attribute(
-                QNetworkRequest.RedirectionTargetAttribute)
-            if redirect is not None:
-                delete_path(self.download_dir)
-                os.makedirs(self.download_dir)
-
-                status_bar.busy += 1
-
-                redirected_url = urljoin(
-                    self.download_http_reply.request().url().toString(),
-                    redirect.toString())
-
-                downloading_label = QLabel()
-                downloading_label.setText(_('Downloading: {0}').format(
-                    redirected_url))
-                status_bar.addWidget(downloading_label, 100)
-                self.downloading_label = downloading_label
-
-                dowloading_speed_label = QLabel()
-                status_bar.addWidget(dowloading_speed_label)
-                self.dowloading_speed_label = dowloading_speed_label
-
-                downloading_size_label = QLabel()
-                status_bar.addWidget(downloading_size_label)
-                self.downloading_size_label = downloading_size_label
-
-                progress_bar = QProgressBar()
-                status_bar.addWidget(progress_bar)
-                self.downloading_progress_bar = progress_bar
-                progress_bar.setMinimum(0)
-
-                self.download_last_read = datetime.utcnow()
-                self.download_last_bytes_read = 0
-                self.download_speed_count = 0
-
-                progress_bar.setValue(0)
-
-                self.download_first_ready = True
-                self.downloading_file = None
-
-                request = QNetworkRequest(QUrl(redirected_url))
-                request.setRawHeader(b'User-Agent', cons.FAKE_USER_AGENT)
-
-                self.download_http_reply = self.qnam.get(request)
-                self.download_http_reply.finished.connect(
-                    self.download_http_finished)
-                self.download_http_reply.readyRead.connect(
-                    self.download_http_ready_read)
-                self.download_http_reply.downloadProgress.connect(
-                    self.download_dl_progress)
-            else:
-                if not os.path.exists(self.downloaded_file):
-                    status_bar.clearMessage()
-                    status_bar.showMessage(
-                        _('Could not find downloaded archive ({file})'
-                        ).format(file=self.downloaded_file))
-
-                    self.finish_install_new_mod()
+            mod_idents = set((mod_idents, ))
+
+        # Is it already installed?
+        for mod in self.mods:
+            if mod['ident'] in mod_idents:
+                confirm_msgbox = QMessageBox()
+                confirm_msgbox.setWindowTitle(_('Mod already present'))
+                confirm_msgbox.setText(_('It seems this mod is '
+                    'already installed. The launcher will not overwrite '
+                    'the mod if it has the same directory name. You '
+                    'might want to delete the mod first if you want '
+                    'to update it. Also, there can only be a single '
+                    'mod with the same ident value available in the '
+                    'game.'))
+                confirm_msgbox.setInformativeText(_('Are you sure you want '
+                    'to install the {name} mod?').format(
+                        name=selected_info['name']))
+                confirm_msgbox.addButton(_('Install the mod'),
+                    QMessageBox.YesRole)
+                confirm_msgbox.addButton(_('Do not install again'),
+                    QMessageBox.NoRole)
+                confirm_msgbox.setIcon(QMessageBox.Warning)
+
+                if confirm_msgbox.exec() == 1:
                     return
-
-                # Test downloaded file
-                status_bar.showMessage(_('Testing downloaded file archive'))
-
-                if self.downloaded_file.lower().endswith('.7z'):
-                    try:
-                        with open(self.downloaded_file, 'rb') as f:
-                            archive = Archive7z(f)
-                    except FormatError:
-                        status_bar.clearMessage()
-                        status_bar.showMessage(_('Selected file is a '
-                            'bad archive file'))
-
-                        self.finish_install_new_mod()
-                        return
-                    except NoPasswordGivenError:
-                        status_bar.clearMessage()
-                        status_bar.showMessage(_('Selected file is a '
-                            'password protected archive file'))
-
-                        self.finish_install_new_mod()
-                        return
-                else:
-                    if self.downloaded_file.lower().endswith('.zip'):
-                        archive_class = zipfile.ZipFile
-                        archive_exception = zipfile.BadZipFile
-                        test_method = 'testzip'
-                    elif self.downloaded_file.lower().endswith('.rar'):
-                        archive_class = rarfile.RarFile
-                        archive_exception = rarfile.Error
-                        test_method = 'testrar'
-                    else:
-                        extension = os.path.splitext(self.downloaded_file)[1]
-                        status_bar.clearMessage()
-                        status_bar.showMessage(
-                            _('Unknown downloaded archive format ({extension})'
-                            ).format(extension=extension))
-
-                        self.finish_install_new_mod()
-                        return
-
-                    try:
-                        with archive_class(self.downloaded_file) as z:
-                            test = getattr(z, test_method)
-                            if test() is not None:
-                                status_bar.clearMessage()
-                                status_bar.showMessage(
-                                    _('Downloaded archive is invalid'))
-
-                                self.finish_install_new_mod()
-                                return
-                    except archive_exception:
-                        status_bar.clearMessage()
-                        status_bar.showMessage(_('Selected file is a '
-                            'bad archive file'))
-
-                        self.finish_install_new_mod()
-                        return
-
-                status_bar.clearMessage()
-                self.downloading_new_mod = False
-                self.extract_new_mod()
-
-    def finish_install_new_mod(self):
-        self.installing_new_mod = False
-
-        self.installed_lv.setEnabled(True)
-        self.repository_lv.setEnabled(True)
-
-        self.install_new_button.setText(_('Install this mod'))
-
-        self.get_main_tab().enable_tab()
-        self.get_soundpacks_tab().enable_tab()
-        self.get_settings_tab().enable_tab()
-        self.get_backups_tab().enable_tab()
-
-        if self.close_after_install:
-            self.get_main_window().close()
-
-    def download_http_ready_read(self):
-        if self.download_first_ready:
-            self.download_first_ready = False
-
-            # Inspect headers for file name
-            header_pairs = self.download_http_reply.rawHeaderPairs()
-
-            for pair in header_pairs:
-                header_name = pair[0].data().decode('iso-8859-1', 'ignore')
-                if header_name.lower() == 'content-disposition':
-                    parsed_cd = parse_cd_headers(pair[1].data())
-                    extension = os.path.splitext(parsed_cd.filename_unsafe)[1]
-                    if extension.startswith('.'):
-                        extension = extension[1:]
-                    file_name = parsed_cd.filename_sanitized(extension)
-                    self.downloaded_file = os.path.join(self.download_dir,
-                        file_name)
-
-            self.downloading_file = open(self.downloaded_file, 'wb')
-
-        while True:
-            data = self.download_http_reply.read(cons.READ_BUFFER_SIZE)
-            if not data:
                 break
-            self.downloading_file.write(data)
-
-    def download_dl_progress(self, bytes_read, total_bytes):
-        self.downloading_progress_bar.setMaximum(total_bytes)
-        self.downloading_progress_bar.setValue(bytes_read)
-
-        self.download_speed_count += 1
-
-        self.downloading_size_label.setText(
-            '{bytes_read}/{total_bytes}'
-            .format(bytes_read=sizeof_fmt(bytes_read), total_bytes=sizeof_fmt(total_bytes))
-        )
 
-        if self.download_speed_count % 5 == 0:
-            delta_bytes = bytes_read - self.download_last_bytes_read
-            delta_time = datetime.utcnow() - self.download_last_read
+        if selected_info['type'] == 'direct_download':
+            self.size_fetcher.stop()
 
-            bytes_secs = delta_bytes / delta_time.total_seconds()
-            self.dowloading_speed_label.setText(_('{bytes_sec}/s').format(
-                bytes_sec=sizeof_fmt(bytes_secs)))
+            self.install_queue.add(InstallItem(selected_info, self.mods_dir))
+        elif selected_info['type'] == 'browser_download':
+            bd_dialog = BrowserDownloadDialog('mod',
+                selected_info['url'], selected_info.get('expected_filename',
+                    None))
+            bd_dialog.exec()
 
-            self.download_last_bytes_read = bytes_read
-            self.download_last_read = datetime.utcnow()
-
-    def extract_new_mod(self):
-        self.extracting_new_mod = True
-
-        if self.downloaded_file.lower().endswith('.7z'):
-            self.extracting_zipfile = open(self.downloaded_file, 'rb')
-            self.extracting_archive = Archive7z(self.extracting_zipfile)
-
-            self.extracting_infolist = self.extracting_archive.getmembers()
-        else:
-            if self.downloaded_file.lower().endswith('.zip'):
-                archive_class = zipfile.ZipFile
-            elif self.downloaded_file.lower().endswith('.rar'):
-                archive_class = rarfile.RarFile
-
-            z = archive_class(self.downloaded_file)
-            self.extracting_zipfile = z
-
-            self.extracting_infolist = z.infolist()
-
-        self.extract_dir = os.path.join(self.game_dir, 'newmod')
-        while os.path.exists(self.extract_dir):
-            self.extract_dir = os.path.join(self.game_dir,
-                'newmod-{0}'.format('%08x' % random.randrange(16**8)))
-        os.makedirs(self.extract_dir)
-
-        self.extracting_index = 0
+            if bd_dialog.downloaded_path is not None:
+                if not os.path.isfile(bd_dialog.downloaded_path):
+                    status_bar.showMessage(_('Could not find downloaded '
+                        'file archive'))
+                else:
+                    self.install_queue.add(InstallItem(selected_info,
+                        self.mods_dir, bd_dialog.downloaded_path))
 
+    def installs_started(self):
         main_window = self.get_main_window()
         status_bar = main_window.statusBar()
-
         status_bar.busy += 1
 
-        extracting_label = QLabel()
-        status_bar.addWidget(extracting_label, 100)
-        self.extracting_label = extracting_label
-
-        progress_bar = QProgressBar()
-        status_bar.addWidget(progress_bar)
-        self.extracting_progress_bar = progress_bar
-
-        timer = QTimer(self)
-        self.extracting_timer = timer
-
-        progress_bar.setRange(0, len(self.extracting_infolist))
-
-        def timeout():
-            self.extracting_progress_bar.setValue(self.extracting_index)
-
-            if self.extracting_index == len(self.extracting_infolist):
-                self.extracting_timer.stop()
-
-                main_window = self.get_main_window()
-                status_bar = main_window.statusBar()
-
-                status_bar.removeWidget(self.extracting_label)
-                status_bar.removeWidget(self.extracting_progress_bar)
-
-                status_bar.busy -= 1
-
-                self.extracting_new_mod = False
-
-                self.extracting_zipfile.close()
-                self.extracting_zipfile = None
-
-                if self.downloaded_file.lower().endswith('.7z'):
-                    self.extracting_archive = None
-
-                if self.install_type == 'direct_download':
-                    download_dir = os.path.dirname(self.downloaded_file)
-                    delete_path(download_dir)
-
-                self.move_new_mod()
-
-            else:
-                extracting_element = self.extracting_infolist[
-                    self.extracting_index]
-
-                self.extracting_label.setText(_('Extracting {0}').format(
-                    extracting_element.filename))
-
-                if self.downloaded_file.lower().endswith('.7z'):
-                    destination = os.path.join(self.extract_dir,
-                        *extracting_element.filename.split('/'))
-                    dest_dir = os.path.dirname(destination)
-                    if not os.path.isdir(dest_dir):
-                        os.makedirs(dest_dir)
-                    with open(destination, 'wb') as f:
-                        f.write(extracting_element.read())
-                else:
-                    self.extracting_zipfile.extract(extracting_element,
-                        self.extract_dir)
-
-                self.extracting_index += 1
-
-        timer.timeout.connect(timeout)
-        timer.start(0)
-
-    def move_new_mod(self):
-        # Find the mod(s) in the self.extract_dir
-        # Move the mod(s) from that location into self.mods_dir
-
-        self.moving_new_mod = True
+        # The game directory stays the same while installing
+        main_window.asset_installs += 1
+        if main_window.asset_installs == 1:
+            self.get_main_tab().disable_tab()
+            self.get_settings_tab().disable_tab()
+            self.get_backups_tab().disable_tab()
 
+    def installs_emptied(self):
         main_window = self.get_main_window()
         status_bar = main_window.statusBar()
+        status_bar.busy -= 1
 
-        status_bar.showMessage(_('Finding the mod(s)'))
-
-        next_scans = deque()
-        current_scan = scandir(self.extract_dir)
-
-        mod_dirs = set()
-
-        while True:
-            try:
-                entry = next(current_scan)
-                dirname, basename = os.path.split(entry.path)
-
-                # Don't include submod dir/files in mod dir search
-                if dirname in mod_dirs:
-                    continue
-
-                if entry.is_dir():
-                    next_scans.append(entry.path)
-                elif entry.is_file():
-                    if basename.lower() == 'modinfo.json':
-                        mod_dirs.add(dirname)
-            except StopIteration:
-                if len(next_scans) > 0:
-                    current_scan = scandir(next_scans.popleft())
-                else:
-                    break
-
-        for item in current_scan:
-            pass
-
-        if len(mod_dirs) == 0:
-            status_bar.showMessage(_('Mod installation cancelled - There '
-                'is no mod in the downloaded archive'))
-            delete_path(self.extract_dir)
-            self.moving_new_mod = False
-
-            self.finish_install_new_mod()
-        else:
-            all_moved = True
-            for mod_dir in mod_dirs:
-                mod_dir_name = os.path.basename(mod_dir)
-                target_dir = os.path.join(self.mods_dir, mod_dir_name)
-                if os.path.exists(target_dir):
-                    status_bar.showMessage(_('Mod installation cancelled - '
-                        'There is already a {basename} directory in '
-                        '{mods_dir}').format(basename=mod_dir_name,
-                            mods_dir=self.mods_dir))
-                    all_moved = False
-                    break
-                else:
-                    shutil.move(mod_dir, self.mods_dir)
-            if all_moved:
-                status_bar.showMessage(_('Mod installation completed'))
-
-            delete_path(self.extract_dir)
-            self.moving_new_mod = False
-
-            self.game_dir_changed(self.game_dir)
-            self.finish_install_new_mod()
+        main_window.asset_installs -= 1
+        if main_window.asset_installs == 0:
+            self.get_main_tab().enable_tab()
+            self.get_settings_tab().enable_tab()
+            self.get_backups_tab().enable_tab()
+
+    def install_finished(self, item):
+        status_bar = self.get_main_window().statusBar()
+        status_bar.showMessage(item.message)
+
+    def add_new_mods(self, item):
+        for target_dir in item.target_dirs:
+            mod_scan = scan_mod_dir(target_dir)
+            if mod_scan['info'] is not None:
+                mod_info = {
+                    'path': target_dir
+                }
+                mod_info.update(mod_scan['info'])
+                mod_info['size'] = mod_scan['size']
+                self.add_mod(mod_info)
+
+        return _('Mod installation completed')
 
     def disable_existing(self):
         selection_model = self.installed_lv.selectionModel()
@@ -1070,7 +622,8 @@ class ModsTab(QTabWidget):
         selection_model = self.repository_lv.selectionModel()
         if selection_model is not None and selection_model.hasSelection():
             selected = selection_model.currentIndex()
-            selected_info = self.repo_mods[selected.row()]
+            selected_info = self.repo_mods[
+                self.repo_mods_proxy.mapToSource(selected).row()]
 
             self.name_le.setText(selected_info.get('name', ''))
             mod_idents = selected_info.get('ident', '')
@@ -1096,28 +649,14 @@ class ModsTab(QTabWidget):
                 self.path_le.setText(selected_info['url'])
                 self.homepage_tb.setText('<a href="{url}">{url}</a>'.format(
                     url=html.escape(selected_info['homepage'])))
-                if 'size' not in selected_info:
-                    if not (self.current_repo_info is not None
-                        and self.http_reply is not None
-                        and self.http_reply.isRunning()
-                        and self.current_repo_info is selected_info):
-                        if (self.http_reply is not None
-                            and self.http_reply.isRunning()):
-                            self.http_reply_aborted = True
-                            self.http_reply.abort()
-
-                        self.http_reply_aborted = False
-                        self.size_le.setText(_('Getting remote size'))
-                        self.current_repo_info = selected_info
-
-                        request = QNetworkRequest(QUrl(selected_info['url']))
-                        request.setRawHeader(b'User-Agent', cons.FAKE_USER_AGENT)
-
-                        self.http_reply = self.qnam.head(request)
-                        self.http_reply.finished.connect(
-                            self.size_query_finished)
-                else:
+                if 'size' in selected_info:
                     self.size_le.setText(sizeof_fmt(selected_info['size']))
+                elif self.size_fetcher.size_unknown(selected_info['url']):
+                    self.size_le.setText(_('Unknown'))
+                else:
+                    self.size_le.setText(_('Getting remote size'))
+                    self.size_fetcher.fetch([selected_info['url']],
+                        first=True)
             elif selected_info['type'] == 'browser_download':
                 self.path_label.setText(_('Url:'))
                 self.path_le.setText(selected_info['url'])
@@ -1130,6 +669,7 @@ class ModsTab(QTabWidget):
 
         if (self.mods_dir is not None
             and os.path.isdir(self.mods_dir)
+            and self.mods_scan_thread is None
             and not self.tab_disabled):
             self.install_new_button.setEnabled(True)
         self.disable_existing_button.setEnabled(False)
@@ -1139,80 +679,44 @@ class ModsTab(QTabWidget):
         if installed_selection is not None:
             installed_selection.clearSelection()
 
-    def size_query_finished(self):
-        if (not self.http_reply_aborted
-            and self.http_reply.attribute(
-                QNetworkRequest.HttpStatusCodeAttribute) == 200
-            and self.http_reply.hasRawHeader(b'Content-Length')):
+    def schedule_size_prefetch(self, *args):
+        self.size_prefetch_timer.start()
 
-            content_length = int(self.http_reply.rawHeader(b'Content-Length'))
-            self.current_repo_info['size'] = content_length
+    def prefetch_visible_sizes(self):
+        # Sizes of the other rows are fetched when they are scrolled to
+        urls = []
+        for row in visible_source_rows(self.repository_lv):
+            repo_info = self.repo_mods[row]
+            if (repo_info['type'] == 'direct_download'
+                and 'size' not in repo_info):
+                urls.append(repo_info['url'])
 
-            selection_model = self.repository_lv.selectionModel()
-            if selection_model is not None and selection_model.hasSelection():
-                selected = selection_model.currentIndex()
-                selected_info = self.repo_soundpacks[selected.row()]
+        self.size_fetcher.fetch(urls)
 
-                if selected_info is self.current_repo_info:
-                    self.size_le.setText(sizeof_fmt(content_length))
-        else:
-            selection_model = self.repository_lv.selectionModel()
-            if selection_model is not None and selection_model.hasSelection():
-                selected = selection_model.currentIndex()
-                selected_info = self.repo_mods[selected.row()]
+    def remote_size_found(self, url, size):
+        if size is not None:
+            for repo_info in self.repo_mods:
+                if repo_info.get('url', None) == url:
+                    repo_info['size'] = size
 
-                if selected_info is self.current_repo_info:
-                    self.size_le.setText(_('Unknown'))
-
-    def config_info(self, config_file):
-        val = {}
-        keys = ('ident', 'name', 'author', 'authors', 'description', 'category',
-            'version')
-        try:
-            with open(config_file, 'r', encoding='utf8') as f:
-                try:
-                    values = json.load(f)
-                    if isinstance(values, dict):
-                        if values.get('type', '') == 'MOD_INFO':
-                            for key in keys:
-                                val[key] = values.get(key, None)
-                    elif isinstance(values, list):
-                        for item in values:
-                            if (isinstance(item, dict)
-                                and item.get('type', '') == 'MOD_INFO'):
-                                    for key in keys:
-                                        val[key] = item.get(key, None)
-                                    break
-                except ValueError:
-                    pass
-        except FileNotFoundError:
-            return val
-        return val
-
-    def scan_size(self, mod_info):
-        next_scans = deque()
-        current_scan = scandir(mod_info['path'])
-
-        total_size = 0
+        selection_model = self.repository_lv.selectionModel()
+        if selection_model is not None and selection_model.hasSelection():
+            selected = selection_model.currentIndex()
+            selected_info = self.repo_mods[
+                self.repo_mods_proxy.mapToSource(selected).row()]
 
-        while True:
-            try:
-                entry = next(current_scan)
-                if entry.is_dir():
-                    next_scans.append(entry.path)
-                elif entry.is_file():
-                    total_size += entry.stat().st_size
-            except StopIteration:
-                if len(next_scans) > 0:
-                    current_scan = scandir(next_scans.popleft())
+            if selected_info.get('url', None) == url:
+                if size is not None:
+                    self.size_le.setText(sizeof_fmt(size))
                 else:
-                    break
-
-        return total_size
+                    self.size_le.setText(_('Unknown'))
 
     def add_mod(self, mod_info):
-        index = self.mods_model.rowCount()
-        self.mods_model.insertRows(self.mods_model.rowCount(), 1)
+        # Keep the installed mods sorted by name
+        index = bisect.bisect_right([x['name'] or '' for x in self.mods],
+            mod_info['name'] or '')
+        self.mods.insert(index, mod_info)
+        self.mods_model.insertRows(index, 1)
         disabled_text = ''
         if not mod_info['enabled']:
             disabled_text = _(' (Disabled)')
@@ -1232,6 +736,8 @@ class ModsTab(QTabWidget):
         self.version_le.setText('')
 
     def clear_mods(self):
+        self.stop_mods_scan()
+
         self.game_dir = None
         self.mods = []
 
@@ -1250,6 +756,8 @@ class ModsTab(QTabWidget):
         self.clear_details()
 
     def game_dir_changed(self, new_dir):
+        self.stop_mods_scan()
+
         self.game_dir = new_dir
         self.mods = []
 
@@ -1271,99 +779,108 @@ class ModsTab(QTabWidget):
         mods_dir = os.path.join(new_dir, 'data', 'mods')
         user_mods_dir = os.path.join(new_dir, 'mods')
 
+        mods_dirs = []
+
         if os.path.isdir(mods_dir):
             self.mods_dir = mods_dir
-
-            dir_scan = scandir(mods_dir)
-
-            while True:
-                try:
-                    entry = next(dir_scan)
-                    if entry.is_dir():
-                        mod_path = entry.path
-                        config_file = os.path.join(mod_path,
-                            'modinfo.json')
-                        if os.path.isfile(config_file):
-                            info = self.config_info(config_file)
-                            if 'ident' in info:
-                                mod_info = {
-                                    'path': mod_path,
-                                    'enabled': True
-                                }
-                                mod_info.update(info)
-
-                                self.mods.append(mod_info)
-                                mod_info['size'] = (
-                                    self.scan_size(mod_info))
-                                continue
-                        disabled_config_file = os.path.join(mod_path,
-                            'modinfo.json.disabled')
-                        if os.path.isfile(disabled_config_file):
-                            info = self.config_info(disabled_config_file)
-                            if 'ident' in info:
-                                mod_info = {
-                                    'path': mod_path,
-                                    'enabled': False
-                                }
-                                mod_info.update(info)
-
-                                self.mods.append(mod_info)
-                                mod_info['size'] = (
-                                    self.scan_size(mod_info))
-
-                except StopIteration:
-                    break
-
+            mods_dirs.append(mods_dir)
         else:
             self.mods_dir = None
 
         if os.path.isdir(user_mods_dir):
             self.user_mods_dir = user_mods_dir
-
-            dir_scan = scandir(user_mods_dir)
-
-            while True:
-                try:
-                    entry = next(dir_scan)
-                    if entry.is_dir():
-                        mod_path = entry.path
-                        config_file = os.path.join(mod_path,
-                            'modinfo.json')
-                        if os.path.isfile(config_file):
-                            info = self.config_info(config_file)
-                            if 'ident' in info:
-                                mod_info = {
-                                    'path': mod_path,
-                                    'enabled': True
-                                }
-                                mod_info.update(info)
-
-                                self.mods.append(mod_info)
-                                mod_info['size'] = (
-                                    self.scan_size(mod_info))
-                                continue
-                        disabled_config_file = os.path.join(mod_path,
-                            'modinfo.json.disabled')
-                        if os.path.isfile(disabled_config_file):
-                            info = self.config_info(disabled_config_file)
-                            if 'ident' in info:
-                                mod_info = {
-                                    'path': mod_path,
-                                    'enabled': False
-                                }
-                                mod_info.update(info)
-
-                                self.mods.append(mod_info)
-                                mod_info['size'] = (
-                                    self.scan_size(mod_info))
-
-                except StopIteration:
-                    break
-
+            mods_dirs.append(user_mods_dir)
         else:
             self.user_mods_dir = None
 
-        # Sort installed mods
-        self.mods.sort(key=lambda x: x['name'])
-        for mod_info in self.mods:
+        # The mods are added to the list as they are scanned
+        if len(mods_dirs) > 0:
+            mods_scan_thread = ModsScanThread(mods_dirs)
+            mods_scan_thread.scanned.connect(self.mods_scanned)
+            mods_scan_thread.finished.connect(self.mods_scan_finished)
+            self.mods_scan_thread = mods_scan_thread
+            mods_scan_thread.start()
+
+    def stop_mods_scan(self):
+        if self.mods_scan_thread is not None:
+            self.mods_scan_thread.scanned.disconnect(self.mods_scanned)
+            self.mods_scan_thread.finished.disconnect(self.mods_scan_finished)
+            self.mods_scan_thread.requestInterruption()
+            self.mods_scan_thread.wait()
+            self.mods_scan_thread = None
+
+    def mods_scanned(self, mods):
+        for mod_info in mods:
             self.add_mod(mod_info)
+
+    def mods_scan_finished(self):
+        self.mods_scan_thread = None
+
+        # Installing is only allowed once we know which mods are installed
+        repository_selection = self.repository_lv.selectionModel()
+        if (repository_selection is not None
+            and repository_selection.hasSelection()
+            and self.mods_dir is not None
+            and not self.tab_disabled):
+            self.install_new_button.setEnabled(True)
+
+
+class ModsScanThread(QThread):
+    scanned = pyqtSignal(list)
+
+    def __init__(self, mods_dirs):
+        super(ModsScanThread, self).__init__()
+        self.mods_dirs = mods_dirs
+
+    def __del__(self):
+        self.wait()
+
+    def run(self):
+        for mods_dir in self.mods_dirs:
+            if self.isInterruptionRequested():
+                return
+
+            cached_scans = get_mod_scans(mods_dir)
+            try:
+                mod_paths = [entry.path for entry in scandir(mods_dir)
+                    if entry.is_dir()]
+            except OSError:
+                continue
+
+            # Send the mods in batches as they are scanned. Scans of mods
+            # which did not change since the last time come from the cache.
+            mod_scans = {}
+            mods = []
+            with ThreadPoolExecutor(cons.MOD_SCAN_WORKERS) as executor:
+                futures = {executor.submit(scan_mod_dir, path,
+                    cached_scans.get(path)): path for path in mod_paths}
+                for future in as_completed(futures):
+                    if self.isInterruptionRequested():
+                        for pending_future in futures:
+                            pending_future.cancel()
+                        return
+
+                    path = futures[future]
+                    try:
+                        mod_scan = future.result()
+                    except OSError:
+                        # Removed while scanning
+                        continue
+
+                    mod_scans[path] = mod_scan
+                    if mod_scan['info'] is not None:
+                        mod_info = {
+                            'path': path
+                        }
+                        mod_info.update(mod_scan['info'])
+                        mod_info['size'] = mod_scan['size']
+                        mods.append(mod_info)
+
+                        if len(mods) >= cons.MOD_SCAN_BATCH_SIZE:
+                            self.scanned.emit(mods)
+                            mods = []
+
+            if len(mods) > 0:
+                self.scanned.emit(mods)
+
+            save_mod_scans(mods_dir, mod_scans)
@@ -10,8 +10,9 @@ from PyQt5.QtWidgets import (
 )
 from babel.core import Locale
 
-import cddagl.constants as cons
-from cddagl.constants import get_locale_path, get_cdda_uld_path
+from cddagl.constants import (
+    get_locale_path, get_cdda_uld_path, MAX_PARALLEL_INSTALLS
+)
 from cddagl.functions import clean_qt_path
 from cddagl.i18n import load_gettext_locale, get_available_locales, proxy_gettext as _
 from cddagl.sql.functions import get_config_value, set_config_value, config_true
@@ -146,6 +147,29 @@ class LauncherSettingsGroupBox(QGroupBox):
             self.no_launcher_version_check_checkbox = (
                 no_launcher_version_check_checkbox)
 
+        mpi_group = QWidget()
+        mpi_group.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
+        mpi_layout = QHBoxLayout()
+        mpi_layout.setContentsMargins(0, 0, 0, 0)
+
+        max_parallel_installs_label = QLabel()
+        mpi_layout.addWidget(max_parallel_installs_label)
+        self.max_parallel_installs_label = max_parallel_installs_label
+
+        max_parallel_installs_spinbox = QSpinBox()
+        max_parallel_installs_spinbox.setMinimum(1)
+        max_parallel_installs_spinbox.setMaximum(10)
+        max_parallel_installs_spinbox.setValue(int(get_config_value(
+            'max_parallel_installs', str(MAX_PARALLEL_INSTALLS))))
+        max_parallel_installs_spinbox.valueChanged.connect(self.mpis_changed)
+        mpi_layout.addWidget(max_parallel_installs_spinbox)
+        self.max_parallel_installs_spinbox = max_parallel_installs_spinbox
+
+        mpi_group.setLayout(mpi_layout)
+        layout.addWidget(mpi_group, 6, 0, 1, 2)
+        self.mpi_group = mpi_group
+        self.mpi_layout = mpi_layout
+
         self.setLayout(layout)
         self.set_text()
 
@@ -168,6 +192,8 @@ class LauncherSettingsGroupBox(QGroupBox):
                 'directory as the game directory'))
             self.no_launcher_version_check_checkbox.setText(_('Do not check '
                 'for new version of the CDDA Game Launcher on launch'))
+        self.max_parallel_installs_label.setText(_('Simultaneous mod and '
+            'soundpack downloads:'))
         self.setTitle(_('Launcher'))
 
     @property
@@ -239,6 +265,9 @@ class LauncherSettingsGroupBox(QGroupBox):
         checked = state != Qt.Unchecked
         set_config_value('allow_multiple_instances', str(checked))
 
+    def mpis_changed(self, value):
+        set_config_value('max_parallel_installs', value)
+
     def uld_changed(self, state):
         checked = state != Qt.Unchecked
         set_config_value('use_launcher_dir', str(checked))
@@ -417,16 +446,6 @@ class UpdateSettingsGroupBox(QGroupBox):
 
     def psmc_changed(self, state):
         set_config_value('prevent_save_move', str(state != Qt.Unchecked))
-        game_dir_group_box = self.get_main_tab().game_dir_group_box
-        saves_warning_label = game_dir_group_box.saves_warning_label
-
-        if state != Qt.Unchecked:
-            saves_warning_label.hide()
-        else:
-            if game_dir_group_box.saves_size > cons.SAVES_WARNING_SIZE:
-                saves_warning_label.show()
-            else:
-                saves_warning_label.hide()
 
     def rpvc_changed(self, state):
         set_config_value('remove_previous_version', str(state != Qt.Unchecked))
@@ -2,37 +2,40 @@ import html
 import json
 import logging
 import os
-import random
 import shutil
-import sys
-import tempfile
-import zipfile
-from collections import deque
-from datetime import datetime
 from os import scandir
-from urllib.parse import urljoin, urlencode
+from urllib.parse import urlencode
 
-import rarfile
-from PyQt5.QtCore import Qt, QTimer, QUrl, QFileInfo, QStringListModel
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt5.QtCore import Qt, QThread, QTimer, QStringListModel, pyqtSignal
 from PyQt5.QtWidgets import (
     QWidget, QGridLayout, QGroupBox, QVBoxLayout, QLabel, QLineEdit, QPushButton,
-    QProgressBar, QTextBrowser, QTabWidget, QMessageBox, QHBoxLayout,
+    QTextBrowser, QTabWidget, QMessageBox, QHBoxLayout,
     QListView, QAbstractItemView, QTextEdit
 )
-from py7zlib import Archive7z, NoPasswordGivenError, FormatError
 
 import cddagl.constants as cons
 from cddagl import __version__ as version
-from cddagl.constants import get_data_path, get_cddagl_path
+from cddagl.constants import get_data_path
+from cddagl.fileops import (
+    dir_tree_mtime, new_soundpack_dir, soundpack_config_info, tree_size
+)
 from cddagl.functions import sizeof_fmt, delete_path
 from cddagl.i18n import proxy_gettext as _
+from cddagl.search import SearchIndex
+from cddagl.sql.functions import (
+    get_soundpack_sizes, set_soundpack_size, keep_soundpack_sizes
+)
+from cddagl.ui.models import SearchFilterProxyModel, visible_source_rows
+from cddagl.ui.network import RemoteSizeFetcher
 from cddagl.ui.views.dialogs import BrowserDownloadDialog
+from cddagl.ui.views.installs import (
+    InstallItem, InstallQueue, InstallsGroupBox
+)
 
 logger = logging.getLogger('cddagl')
 
-if getattr(sys, 'frozen', False):
-    rarfile.UNRAR_TOOL = get_cddagl_path('UnRAR.exe')
+REPOSITORY_SEARCH_FIELDS = ('name', 'viewname', 'author', 'authors',
+    'description')
 
 
 class SoundpacksTab(QTabWidget):
@@ -41,20 +44,26 @@ class SoundpacksTab(QTabWidget):
 
         self.tab_disabled = False
 
-        self.qnam = QNetworkAccessManager()
+        size_fetcher = RemoteSizeFetcher()
+        size_fetcher.size_found.connect(self.remote_size_found)
+        self.size_fetcher = size_fetcher
 
-        self.http_reply = None
-        self.download_http_reply = None
-        self.current_repo_info = None
+        size_prefetch_timer = QTimer()
+        size_prefetch_timer.setSingleShot(True)
+        size_prefetch_timer.setInterval(cons.REMOTE_SIZE_PREFETCH_DELAY)
+        size_prefetch_timer.timeout.connect(self.prefetch_visible_sizes)
+        self.size_prefetch_timer = size_prefetch_timer
 
         self.soundpacks = []
         self.soundpacks_model = None
+        self.sizes_check_thread = None
 
-        self.installing_new_soundpack = False
-        self.downloading_new_soundpack = False
-        self.extracting_new_soundpack = False
-
-        self.close_after_install = False
+        install_queue = InstallQueue(new_soundpack_dir,
+            self.add_new_soundpack)
+        install_queue.started.connect(self.installs_started)
+        install_queue.item_finished.connect(self.install_finished)
+        install_queue.emptied.connect(self.installs_emptied)
+        self.install_queue = install_queue
 
         self.game_dir = None
         self.soundpacks_dir = None
@@ -108,9 +117,20 @@ class SoundpacksTab(QTabWidget):
         repository_gb.setLayout(repository_gb_layout)
         self.repository_gb_layout = repository_gb_layout
 
+        repository_search_le = QLineEdit()
+        repository_search_le.setClearButtonEnabled(True)
+        repository_search_le.textChanged.connect(
+            self.repository_search_changed)
+        repository_gb_layout.addWidget(repository_search_le)
+        self.repository_search_le = repository_search_le
+
         repository_lv = QListView()
         repository_lv.clicked.connect(self.repository_clicked)
         repository_lv.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        repository_lv.verticalScrollBar().valueChanged.connect(
+            self.schedule_size_prefetch)
+        repository_lv.verticalScrollBar().rangeChanged.connect(
+            self.schedule_size_prefetch)
         repository_gb_layout.addWidget(repository_lv)
         self.repository_lv = repository_lv
 
@@ -129,6 +149,10 @@ class SoundpacksTab(QTabWidget):
         layout.addWidget(top_part)
         self.top_part = top_part
 
+        installs_gb = InstallsGroupBox(install_queue)
+        layout.addWidget(installs_gb)
+        self.installs_gb = installs_gb
+
         details_gb = QGroupBox()
         layout.addWidget(details_gb)
         self.details_gb = details_gb
@@ -197,6 +221,7 @@ class SoundpacksTab(QTabWidget):
         self.disable_existing_button.setText(_('Disable'))
         self.delete_existing_button.setText(_('Delete'))
         self.repository_gb.setTitle(_('Repository'))
+        self.repository_search_le.setPlaceholderText(_('Search'))
         suggest_url = cons.NEW_ISSUE_URL + '?' + urlencode({
             'title': _('Add this new soundpack to the repository'),
             'body': _('''* Name: [Enter the name of the soundpack]
@@ -210,6 +235,7 @@ class SoundpacksTab(QTabWidget):
             _('<a href="{url}">Suggest a new soundpack '
             'on GitHub</a>').format(url=suggest_url))
         self.install_new_button.setText(_('Install this soundpack'))
+        self.installs_gb.set_text()
         self.details_gb.setTitle(_('Details'))
         self.viewname_label.setText(_('View name:'))
         self.name_label.setText(_('Name:'))
@@ -280,9 +306,6 @@ class SoundpacksTab(QTabWidget):
         self.install_new_button.setEnabled(False)
 
         self.repo_soundpacks_model = QStringListModel()
-        self.repository_lv.setModel(self.repo_soundpacks_model)
-        self.repository_lv.selectionModel().currentChanged.connect(
-            self.repository_selection)
 
         json_file = get_data_path('soundpacks.json')
 
@@ -305,561 +328,138 @@ class SoundpacksTab(QTabWidget):
                 except ValueError:
                     pass
 
-    def install_new(self):
-        if not self.installing_new_soundpack:
-            selection_model = self.repository_lv.selectionModel()
-            if selection_model is None or not selection_model.hasSelection():
-                return
-
-            selected = selection_model.currentIndex()
-            selected_info = self.repo_soundpacks[selected.row()]
-
-            # Is it already installed?
-            for soundpack in self.soundpacks:
-                if soundpack['NAME'] == selected_info['name']:
-                    confirm_msgbox = QMessageBox()
-                    confirm_msgbox.setWindowTitle(_('Soundpack already present'
-                        ))
-                    confirm_msgbox.setText(_('It seems this soundpack is '
-                        'already installed. The launcher will not overwrite '
-                        'the soundpack if it has the same directory name. You '
-                        'might want to delete the soundpack first if you want '
-                        'to update it. Also, there can only be a single '
-                        'soundpack with the same name value available in the '
-                        'game.'))
-                    confirm_msgbox.setInformativeText(_('Are you sure you want '
-                        'to install the {view} soundpack?').format(
-                            view=selected_info['viewname']))
-                    confirm_msgbox.addButton(_('Install the soundpack'),
-                        QMessageBox.YesRole)
-                    confirm_msgbox.addButton(_('Do not install again'),
-                        QMessageBox.NoRole)
-                    confirm_msgbox.setIcon(QMessageBox.Warning)
-
-                    if confirm_msgbox.exec() == 1:
-                        return
-                    break
-
-            self.install_type = selected_info['type']
-
-            if selected_info['type'] == 'direct_download':
-                if self.http_reply is not None and self.http_reply.isRunning():
-                    self.http_reply_aborted = True
-                    self.http_reply.abort()
-
-                self.installing_new_soundpack = True
-                self.download_aborted = False
-
-                download_dir = tempfile.mkdtemp(prefix=cons.TEMP_PREFIX)
-
-                download_url = selected_info['url']
-
-                url = QUrl(download_url)
-                file_info = QFileInfo(url.path())
-                file_name = file_info.fileName()
-
-                self.downloaded_file = os.path.join(download_dir, file_name)
-                self.downloading_file = open(self.downloaded_file, 'wb')
-
-                main_window = self.get_main_window()
-
-                status_bar = main_window.statusBar()
-                status_bar.clearMessage()
-
-                status_bar.busy += 1
-
-                downloading_label = QLabel()
-                downloading_label.setText(_('Downloading: {0}').format(
-                    selected_info['url']))
-                status_bar.addWidget(downloading_label, 100)
-                self.downloading_label = downloading_label
-
-                dowloading_speed_label = QLabel()
-                status_bar.addWidget(dowloading_speed_label)
-                self.dowloading_speed_label = dowloading_speed_label
-
-                downloading_size_label = QLabel()
-                status_bar.addWidget(downloading_size_label)
-                self.downloading_size_label = downloading_size_label
-
-                progress_bar = QProgressBar()
-                status_bar.addWidget(progress_bar)
-                self.downloading_progress_bar = progress_bar
-                progress_bar.setMinimum(0)
-
-                self.download_last_read = datetime.utcnow()
-                self.download_last_bytes_read = 0
-                self.download_speed_count = 0
-
-                self.downloading_new_soundpack = True
-
-                request = QNetworkRequest(QUrl(url))
-                request.setRawHeader(b'User-Agent', cons.FAKE_USER_AGENT)
-
-                self.download_http_reply = self.qnam.get(request)
-                self.download_http_reply.finished.connect(
-                    self.download_http_finished)
-                self.download_http_reply.readyRead.connect(
-                    self.download_http_ready_read)
-                self.download_http_reply.downloadProgress.connect(
-                    self.download_dl_progress)
-
-                self.install_new_button.setText(_('Cancel soundpack '
-                    'installation'))
-                self.installed_lv.setEnabled(False)
-                self.repository_lv.setEnabled(False)
-
-                self.get_main_tab().disable_tab()
-                self.get_mods_tab().disable_tab()
-                self.get_settings_tab().disable_tab()
-                self.get_backups_tab().disable_tab()
-            elif selected_info['type'] == 'browser_download':
-                bd_dialog = BrowserDownloadDialog('soundpack',
-                    selected_info['url'], selected_info.get('expected_filename',
-                        None))
-                bd_dialog.exec()
-
-                if bd_dialog.downloaded_path is not None:
-                    self.installing_new_soundpack = True
-                    self.downloaded_file = bd_dialog.downloaded_path
-
-                    self.install_new_button.setText(_('Cancel soundpack '
-                        'installation'))
-                    self.installed_lv.setEnabled(False)
-                    self.repository_lv.setEnabled(False)
-
-                    self.get_main_tab().disable_tab()
-                    self.get_mods_tab().disable_tab()
-                    self.get_settings_tab().disable_tab()
-                    self.get_backups_tab().disable_tab()
-
-                    main_window = self.get_main_window()
-                    status_bar = main_window.statusBar()
-
-                    # Test downloaded file
-                    status_bar.showMessage(_('Testing downloaded file archive'))
-
-                    if self.downloaded_file.lower().endswith('.7z'):
-                        try:
-                            with open(self.downloaded_file, 'rb') as f:
-                                archive = Archive7z(f)
-                        except FormatError:
-                            status_bar.clearMessage()
-                            status_bar.showMessage(_('Selected file is a '
-                                'bad archive file'))
-
-                            self.finish_install_new_soundpack()
-                            return
-                        except NoPasswordGivenError:
-                            status_bar.clearMessage()
-                            status_bar.showMessage(_('Selected file is a '
-                                'password protected archive file'))
-
-                            self.finish_install_new_soundpack()
-                            return
-                    else:
-                        archive_exception = None
-                        if self.downloaded_file.lower().endswith('.zip'):
-                            archive_class = zipfile.ZipFile
-                            archive_exception = zipfile.BadZipFile
-                            test_method = 'testzip'
-                        elif self.downloaded_file.lower().endswith('.rar'):
-                            archive_class = rarfile.RarFile
-                            archive_exception = rarfile.Error
-                            test_method = 'testrar'
-                        else:
-                            extension = os.path.splitext(self.downloaded_file
-                                )[1]
-                            status_bar.clearMessage()
-                            status_bar.showMessage(
-                                _('Unknown downloaded archive format '
-                                '({extension})').format(extension=extension))
-
-                            self.finish_install_new_soundpack()
-                            return
-
-                        try:
-                            with archive_class(self.downloaded_file) as z:
-                                test = getattr(z, test_method)
-                                if test() is not None:
-                                    status_bar.clearMessage()
-                                    status_bar.showMessage(
-                                        _('Downloaded archive is invalid'))
-
-                                    self.finish_install_new_soundpack()
-                                    return
-                        except archive_exception:
-                            status_bar.clearMessage()
-                            status_bar.showMessage(_('Selected file is a '
-                                'bad archive file'))
-
-                            self.finish_install_new_soundpack()
-                            return
-
-                    status_bar.clearMessage()
-                    self.extract_new_soundpack()
-
-        else:
-            main_window = self.get_main_window()
-            status_bar = main_window.statusBar()
-
-            # Cancel installation
-            if self.downloading_new_soundpack:
-                self.download_aborted = True
-                self.download_http_reply.abort()
-            elif self.extracting_new_soundpack:
-                self.extracting_timer.stop()
-
-                status_bar.removeWidget(self.extracting_label)
-                status_bar.removeWidget(self.extracting_progress_bar)
-
-                status_bar.busy -= 1
-
-                self.extracting_new_soundpack = False
-
-                self.extracting_zipfile.close()
-
-                download_dir = os.path.dirname(self.downloaded_file)
-                delete_path(download_dir)
-
-                if os.path.isdir(self.extract_dir):
-                    delete_path(self.extract_dir)
+        # Sizes found in the previous sessions
+        cached_sizes = self.size_fetcher.load_cached([x['url']
+            for x in self.repo_soundpacks if x['type'] == 'direct_download'
+            and 'size' not in x])
+        for repo_info in self.repo_soundpacks:
+            if repo_info.get('url', None) in cached_sizes:
+                repo_info['size'] = cached_sizes[repo_info['url']]
+
+        # Searches are made on the entries while the list shows the names
+        search_index = SearchIndex(self.repo_soundpacks, REPOSITORY_SEARCH_FIELDS)
+        repo_soundpacks_proxy = SearchFilterProxyModel(search_index)
+        repo_soundpacks_proxy.setSourceModel(self.repo_soundpacks_model)
+        repo_soundpacks_proxy.set_query(self.repository_search_le.text())
+        self.repo_soundpacks_proxy = repo_soundpacks_proxy
+
+        self.repository_lv.setModel(repo_soundpacks_proxy)
+        self.repository_lv.selectionModel().currentChanged.connect(
+            self.repository_selection)
 
-            status_bar.showMessage(_('Soundpack installation cancelled'))
+    def repository_search_changed(self, text):
+        self.repo_soundpacks_proxy.set_query(text)
+        self.schedule_size_prefetch()
 
-            self.finish_install_new_soundpack()
+    def install_new(self):
+        selection_model = self.repository_lv.selectionModel()
+        if selection_model is None or not selection_model.hasSelection():
+            return
 
-    def download_http_finished(self):
-        self.downloading_file.close()
+        selected = selection_model.currentIndex()
+        selected_info = self.repo_soundpacks[
+            self.repo_soundpacks_proxy.mapToSource(selected).row()]
 
         main_window = self.get_main_window()
-
         status_bar = main_window.statusBar()
-        status_bar.removeWidget(self.downloading_label)
-        status_bar.removeWidget(self.dowloading_speed_label)
-        status_bar.removeWidget(self.downloading_size_label)
-        status_bar.removeWidget(self.downloading_progress_bar)
-
-        status_bar.busy -= 1
 
-        if self.download_aborted:
-            download_dir = os.path.dirname(self.downloaded_file)
-            delete_path(download_dir)
+        if self.install_queue.has_url(selected_info['url']):
+            status_bar.showMessage(_('The {view} soundpack is already being '
+                'installed').format(view=selected_info['viewname']))
+            return
 
-            self.downloading_new_soundpack = False
-        else:
-            redirect = self.download_http_reply.attribute(
-                QNetworkRequest.RedirectionTargetAttribute)
-            if redirect is not None:
-                download_dir = os.path.dirname(self.downloaded_file)
-                delete_path(download_dir)
-                os.makedirs(download_dir)
-
-                self.downloading_file = open(self.downloaded_file, 'wb')
-
-                status_bar.busy += 1
-
-                redirected_url = urljoin(
-                    self.download_http_reply.request().url().toString(),
-                    redirect.toString())
-
-                downloading_label = QLabel()
-                downloading_label.setText(_('Downloading: {0}').format(
-                    redirected_url))
-                status_bar.addWidget(downloading_label, 100)
-                self.downloading_label = downloading_label
-
-                dowloading_speed_label = QLabel()
-                status_bar.addWidget(dowloading_speed_label)
-                self.dowloading_speed_label = dowloading_speed_label
-
-                downloading_size_label = QLabel()
-                status_bar.addWidget(downloading_size_label)
-                self.downloading_size_label = downloading_size_label
-
-                progress_bar = QProgressBar()
-                status_bar.addWidget(progress_bar)
-                self.downloading_progress_bar = progress_bar
-                progress_bar.setMinimum(0)
-
-                self.download_last_read = datetime.utcnow()
-                self.download_last_bytes_read = 0
-                self.download_speed_count = 0
-
-                progress_bar.setValue(0)
-
-                request = QNetworkRequest(QUrl(redirected_url))
-                request.setRawHeader(b'User-Agent', cons.FAKE_USER_AGENT)
-
-                self.download_http_reply = self.qnam.get(request)
-                self.download_http_reply.finished.connect(
-                    self.download_http_finished)
-                self.download_http_reply.readyRead.connect(
-                    self.download_http_ready_read)
-                self.download_http_reply.downloadProgress.connect(
-                    self.download_dl_progress)
-            else:
-                # Test downloaded file
-                status_bar.showMessage(_('Testing downloaded file archive'))
-
-                if self.downloaded_file.lower().endswith('.7z'):
-                    try:
-                        with open(self.downloaded_file, 'rb') as f:
-                            archive = Archive7z(f)
-                    except FormatError:
-                        status_bar.clearMessage()
-                        status_bar.showMessage(_('Selected file is a '
-                            'bad archive file'))
-
-                        self.finish_install_new_soundpack()
-                        return
-                    except NoPasswordGivenError:
-                        status_bar.clearMessage()
-                        status_bar.showMessage(_('Selected file is a '
-                            'password protected archive file'))
-
-                        self.finish_install_new_soundpack()
-                        return
+        # Is it already installed?
+        for soundpack in self.soundpacks:
+            if soundpack['NAME'] == selected_info['name']:
+                confirm_msgbox = QMessageBox()
+                confirm_msgbox.setWindowTitle(_('Soundpack already present'
+                    ))
+                confirm_msgbox.setText(_('It seems this soundpack is '
+                    'already installed. The launcher will not overwrite '
+                    'the soundpack if it has the same directory name. You '
+                    'might want to delete the soundpack first if you want '
+                    'to update it. Also, there can only be a single '
+                    'soundpack with the same name value available in the '
+                    'game.'))
+                confirm_msgbox.setInformativeText(_('Are you sure you want '
+                    'to install the {view} soundpack?').format(
+                        view=selected_info['viewname']))
+                confirm_msgbox.addButton(_('Install the soundpack'),
+                    QMessageBox.YesRole)
+                confirm_msgbox.addButton(_('Do not install again'),
+                    QMessageBox.NoRole)
+                confirm_msgbox.setIcon(QMessageBox.Warning)
+
+                if confirm_msgbox.exec() == 1:
+                    return
+                break
+
+        if selected_info['type'] == 'direct_download':
+            self.size_fetcher.stop()
+
+            self.install_queue.add(InstallItem(selected_info,
+                self.soundpacks_dir))
+        elif selected_info['type'] == 'browser_download':
+            bd_dialog = BrowserDownloadDialog('soundpack',
+                selected_info['url'], selected_info.get('expected_filename',
+                    None))
+            bd_dialog.exec()
+
+            if bd_dialog.downloaded_path is not None:
+                if not os.path.isfile(bd_dialog.downloaded_path):
+                    status_bar.showMessage(_('Could not find downloaded '
+                        'file archive'))
                 else:
-                    archive_exception = None
-                    if self.downloaded_file.lower().endswith('.zip'):
-                        archive_class = zipfile.ZipFile
-                        archive_exception = zipfile.BadZipFile
-                        test_method = 'testzip'
-                    elif self.downloaded_file.lower().endswith('.rar'):
-                        archive_class = rarfile.RarFile
-                        archive_exception = rarfile.Error
-                        test_method = 'testrar'
-                    else:
-                        extension = os.path.splitext(self.downloaded_file)[1]
-                        status_bar.clearMessage()
-                        status_bar.showMessage(
-                            _('Unknown downloaded archive format ({extension})'
-                            ).format(extension=extension))
-
-                        self.finish_install_new_soundpack()
-                        return
-
-                    try:
-                        with archive_class(self.downloaded_file) as z:
-                            test = getattr(z, test_method)
-                            if test() is not None:
-                                status_bar.clearMessage()
-                                status_bar.showMessage(
-                                    _('Downloaded archive is invalid'))
-
-                                self.finish_install_new_soundpack()
-                                return
-                    except archive_exception:
-                        status_bar.clearMessage()
-                        status_bar.showMessage(_('Selected file is a '
-                            'bad archive file'))
-
-                        self.finish_install_new_soundpack()
-                        return
-
-                status_bar.clearMessage()
-                self.downloading_new_soundpack = False
-                self.extract_new_soundpack()
-
-    def finish_install_new_soundpack(self):
-        self.installing_new_soundpack = False
-
-        self.installed_lv.setEnabled(True)
-        self.repository_lv.setEnabled(True)
-
-        self.install_new_button.setText(_('Install this soundpack'))
-
-        self.get_main_tab().enable_tab()
-        self.get_mods_tab().enable_tab()
-        self.get_settings_tab().enable_tab()
-        self.get_backups_tab().enable_tab()
-
-        if self.close_after_install:
-            self.get_main_window().close()
-
-    def download_http_ready_read(self):
-        self.downloading_file.write(self.download_http_reply.readAll())
-
-    def download_dl_progress(self, bytes_read, total_bytes):
-        self.downloading_progress_bar.setMaximum(total_bytes)
-        self.downloading_progress_bar.setValue(bytes_read)
-
-        self.download_speed_count += 1
-
-        self.downloading_size_label.setText(
-            '{bytes_read}/{total_bytes}'
-            .format(bytes_read=sizeof_fmt(bytes_read), total_bytes=sizeof_fmt(total_bytes))
-        )
-
-        if self.download_speed_count % 5 == 0:
-            delta_bytes = bytes_read - self.download_last_bytes_read
-            delta_time = datetime.utcnow() - self.download_last_read
-
-            bytes_secs = delta_bytes / delta_time.total_seconds()
-            self.dowloading_speed_label.setText(_('{bytes_sec}/s').format(
-                bytes_sec=sizeof_fmt(bytes_secs)))
-
-            self.download_last_bytes_read = bytes_read
-            self.download_last_read = datetime.utcnow()
-
-    def extract_new_soundpack(self):
-        self.extracting_new_soundpack = True
-
-        if self.downloaded_file.lower().endswith('.7z'):
-            self.extracting_zipfile = open(self.downloaded_file, 'rb')
-            self.extracting_archive = Archive7z(self.extracting_zipfile)
-
-            self.extracting_infolist = self.extracting_archive.getmembers()
-        else:
-            if self.downloaded_file.lower().endswith('.zip'):
-                archive_class = zipfile.ZipFile
-            elif self.downloaded_file.lower().endswith('.rar'):
-                archive_class = rarfile.RarFile
-
-            z = archive_class(self.downloaded_file)
-            self.extracting_zipfile = z
-
-            self.extracting_infolist = z.infolist()
-
-        self.extract_dir = os.path.join(self.game_dir, 'newsoundpack')
-        while os.path.exists(self.extract_dir):
-            self.extract_dir = os.path.join(self.game_dir,
-                'newsoundpack-{0}'.format('%08x' % random.randrange(16**8)))
-        os.makedirs(self.extract_dir)
-
-        self.extracting_index = 0
+                    self.install_queue.add(InstallItem(selected_info,
+                        self.soundpacks_dir, bd_dialog.downloaded_path))
 
+    def installs_started(self):
         main_window = self.get_main_window()
         status_bar = main_window.statusBar()
-
         status_bar.busy += 1
 
-        extracting_label = QLabel()
-        status_bar.addWidget(extracting_label, 100)
-        self.extracting_label = extracting_label
-
-        progress_bar = QProgressBar()
-        status_bar.addWidget(progress_bar)
-        self.extracting_progress_bar = progress_bar
-
-        timer = QTimer(self)
-        self.extracting_timer = timer
-
-        progress_bar.setRange(0, len(self.extracting_infolist))
-
-        def timeout():
-            self.extracting_progress_bar.setValue(self.extracting_index)
-
-            if self.extracting_index == len(self.extracting_infolist):
-                self.extracting_timer.stop()
-
-                main_window = self.get_main_window()
-                status_bar = main_window.statusBar()
-
-                status_bar.removeWidget(self.extracting_label)
-                status_bar.removeWidget(self.extracting_progress_bar)
-
-                status_bar.busy -= 1
-
-                self.extracting_new_soundpack = False
-
-                self.extracting_zipfile.close()
-                self.extracting_zipfile = None
-
-                if self.downloaded_file.lower().endswith('.7z'):
-                    self.extracting_archive = None
-
-                if self.install_type == 'direct_download':
-                    download_dir = os.path.dirname(self.downloaded_file)
-                    delete_path(download_dir)
-
-                self.move_new_soundpack()
-
-            else:
-                extracting_element = self.extracting_infolist[
-                    self.extracting_index]
-
-                self.extracting_label.setText(_('Extracting {0}').format(
-                    extracting_element.filename))
-
-                if self.downloaded_file.lower().endswith('.7z'):
-                    destination = os.path.join(self.extract_dir,
-                        *extracting_element.filename.split('/'))
-                    dest_dir = os.path.dirname(destination)
-                    if not os.path.isdir(dest_dir):
-                        os.makedirs(dest_dir)
-                    with open(destination, 'wb') as f:
-                        f.write(extracting_element.read())
-                else:
-                    self.extracting_zipfile.extract(extracting_element,
-                        self.extract_dir)
-
-                self.extracting_index += 1
-
-        timer.timeout.connect(timeout)
-        timer.start(0)
-
-    def move_new_soundpack(self):
-        # Find the soundpack in the self.extract_dir
-        # Move the soundpack from that location into self.soundpacks_dir
-
-        self.moving_new_soundpack = True
+        # The game directory stays the same while installing
+        main_window.asset_installs += 1
+        if main_window.asset_installs == 1:
+            self.get_main_tab().disable_tab()
+            self.get_settings_tab().disable_tab()
+            self.get_backups_tab().disable_tab()
 
+    def installs_emptied(self):
         main_window = self.get_main_window()
         status_bar = main_window.statusBar()
+        status_bar.busy -= 1
 
-        status_bar.showMessage(_('Finding the soundpack'))
+        main_window.asset_installs -= 1
+        if main_window.asset_installs == 0:
+            self.get_main_tab().enable_tab()
+            self.get_settings_tab().enable_tab()
+            self.get_backups_tab().enable_tab()
 
-        next_scans = deque()
-        current_scan = scandir(self.extract_dir)
+    def install_finished(self, item):
+        status_bar = self.get_main_window().statusBar()
+        status_bar.showMessage(item.message)
 
-        soundpack_dir = None
+    def add_new_soundpack(self, item):
+        target_dir = item.target_dirs[0]
 
-        while True:
-            try:
-                entry = next(current_scan)
-                if entry.is_dir():
-                    next_scans.append(entry.path)
-                elif entry.is_file():
-                    dirname, basename = os.path.split(entry.path)
-                    if basename == 'soundpack.txt':
-                        soundpack_dir = dirname
-                        entry = None
-                        break
-            except StopIteration:
-                if len(next_scans) > 0:
-                    current_scan = scandir(next_scans.popleft())
-                else:
-                    break
+        info = soundpack_config_info(os.path.join(target_dir,
+            'soundpack.txt'))
+        if 'NAME' in info and 'VIEW' in info:
+            soundpack_info = {
+                'path': target_dir,
+                'enabled': True
+            }
+            soundpack_info.update(info)
 
-        for item in current_scan:
-            pass
+            self.soundpacks.append(soundpack_info)
+            # No need to walk the files we just extracted
+            soundpack_info['size'] = item.target_sizes[target_dir]
+            self.add_soundpack(soundpack_info)
 
-        if soundpack_dir is None:
-            status_bar.showMessage(_('Soundpack installation cancelled - There '
-                'is no soundpack in the downloaded archive'))
-            delete_path(self.extract_dir)
-            self.moving_new_soundpack = False
+            self.record_soundpack_size(soundpack_info)
 
-            self.finish_install_new_soundpack()
-        else:
-            soundpack_dir_name = os.path.basename(soundpack_dir)
-            target_dir = os.path.join(self.soundpacks_dir, soundpack_dir_name)
-            if os.path.exists(target_dir):
-                status_bar.showMessage(_('Soundpack installation cancelled - '
-                    'There is already a {basename} directory in '
-                    '{soundpacks_dir}').format(basename=soundpack_dir_name,
-                        soundpacks_dir=self.soundpacks_dir))
-            else:
-                shutil.move(soundpack_dir, self.soundpacks_dir)
-                status_bar.showMessage(_('Soundpack installation completed'))
-
-            delete_path(self.extract_dir)
-            self.moving_new_soundpack = False
-
-            self.game_dir_changed(self.game_dir)
-            self.finish_install_new_soundpack()
+        return _('Soundpack installation completed')
 
     def disable_existing(self):
         selection_model = self.installed_lv.selectionModel()
@@ -879,6 +479,10 @@ class SoundpacksTab(QTabWidget):
                 self.soundpacks_model.setData(selected, selected_info['VIEW'] +
                     _(' (Disabled)'))
                 self.disable_existing_button.setText(_('Enable'))
+
+                # Sizes are only known to be right once they are checked
+                if self.sizes_check_thread is None:
+                    self.record_soundpack_size(selected_info)
             except OSError as e:
                 main_window = self.get_main_window()
                 status_bar = main_window.statusBar()
@@ -894,6 +498,10 @@ class SoundpacksTab(QTabWidget):
                 selected_info['enabled'] = True
                 self.soundpacks_model.setData(selected, selected_info['VIEW'])
                 self.disable_existing_button.setText(_('Disable'))
+
+                # Sizes are only known to be right once they are checked
+                if self.sizes_check_thread is None:
+                    self.record_soundpack_size(selected_info)
             except OSError as e:
                 main_window = self.get_main_window()
                 status_bar = main_window.statusBar()
@@ -945,7 +553,10 @@ class SoundpacksTab(QTabWidget):
             self.name_le.setText(selected_info['NAME'])
             self.path_label.setText(_('Path:'))
             self.path_le.setText(selected_info['path'])
-            self.size_le.setText(sizeof_fmt(selected_info['size']))
+            if selected_info['size'] is not None:
+                self.size_le.setText(sizeof_fmt(selected_info['size']))
+            else:
+                self.size_le.setText(_('Unknown'))
             self.homepage_tb.setText('')
 
             if selected_info['enabled']:
@@ -970,7 +581,8 @@ class SoundpacksTab(QTabWidget):
         selection_model = self.repository_lv.selectionModel()
         if selection_model is not None and selection_model.hasSelection():
             selected = selection_model.currentIndex()
-            selected_info = self.repo_soundpacks[selected.row()]
+            selected_info = self.repo_soundpacks[
+                self.repo_soundpacks_proxy.mapToSource(selected).row()]
 
             self.viewname_le.setText(selected_info['viewname'])
             self.name_le.setText(selected_info['name'])
@@ -980,28 +592,14 @@ class SoundpacksTab(QTabWidget):
                 self.path_le.setText(selected_info['url'])
                 self.homepage_tb.setText('<a href="{url}">{url}</a>'.format(
                     url=html.escape(selected_info['homepage'])))
-                if 'size' not in selected_info:
-                    if not (self.current_repo_info is not None
-                        and self.http_reply is not None
-                        and self.http_reply.isRunning()
-                        and self.current_repo_info is selected_info):
-                        if (self.http_reply is not None
-                            and self.http_reply.isRunning()):
-                            self.http_reply_aborted = True
-                            self.http_reply.abort()
-
-                        self.http_reply_aborted = False
-                        self.size_le.setText(_('Getting remote size'))
-                        self.current_repo_info = selected_info
-
-                        request = QNetworkRequest(QUrl(selected_info['url']))
-                        request.setRawHeader(b'User-Agent', cons.FAKE_USER_AGENT)
-
-                        self.http_reply = self.qnam.head(request)
-                        self.http_reply.finished.connect(
-                            self.size_query_finished)
-                else:
+                if 'size' in selected_info:
                     self.size_le.setText(sizeof_fmt(selected_info['size']))
+                elif self.size_fetcher.size_unknown(selected_info['url']):
+                    self.size_le.setText(_('Unknown'))
+                else:
+                    self.size_le.setText(_('Getting remote size'))
+                    self.size_fetcher.fetch([selected_info['url']],
+                        first=True)
             elif selected_info['type'] == 'browser_download':
                 self.path_label.setText(_('Url:'))
                 self.path_le.setText(selected_info['url'])
@@ -1023,72 +621,37 @@ class SoundpacksTab(QTabWidget):
         if installed_selection is not None:
             installed_selection.clearSelection()
 
-    def size_query_finished(self):
-        if (not self.http_reply_aborted
-            and self.http_reply.attribute(
-                QNetworkRequest.HttpStatusCodeAttribute) == 200
-            and self.http_reply.hasRawHeader(b'Content-Length')):
+    def schedule_size_prefetch(self, *args):
+        self.size_prefetch_timer.start()
 
-            content_length = int(self.http_reply.rawHeader(b'Content-Length'))
-            self.current_repo_info['size'] = content_length
+    def prefetch_visible_sizes(self):
+        # Sizes of the other rows are fetched when they are scrolled to
+        urls = []
+        for row in visible_source_rows(self.repository_lv):
+            repo_info = self.repo_soundpacks[row]
+            if (repo_info['type'] == 'direct_download'
+                and 'size' not in repo_info):
+                urls.append(repo_info['url'])
 
-            selection_model = self.repository_lv.selectionModel()
-            if selection_model is not None and selection_model.hasSelection():
-                selected = selection_model.currentIndex()
-                selected_info = self.repo_soundpacks[selected.row()]
+        self.size_fetcher.fetch(urls)
 
-                if selected_info is self.current_repo_info:
-                    self.size_le.setText(sizeof_fmt(content_length))
-        else:
-            selection_model = self.repository_lv.selectionModel()
-            if selection_model is not None and selection_model.hasSelection():
-                selected = selection_model.currentIndex()
-                selected_info = self.repo_soundpacks[selected.row()]
+    def remote_size_found(self, url, size):
+        if size is not None:
+            for repo_info in self.repo_soundpacks:
+                if repo_info.get('url', None) == url:
+                    repo_info['size'] = size
 
-                if selected_info is self.current_repo_info:
-                    self.size_le.setText(_('Unknown'))
+        selection_model = self.repository_lv.selectionModel()
+        if selection_model is not None and selection_model.hasSelection():
+            selected = selection_model.currentIndex()
+            selected_info = self.repo_soundpacks[
+                self.repo_soundpacks_proxy.mapToSource(selected).row()]
 
-    def config_info(self, config_file):
-        val = {}
-        try:
-            with open(config_file, 'r', encoding='latin1') as f:
-                for line in f:
-                    if line.startswith('NAME'):
-                        space_index = line.find(' ')
-                        name = line[space_index:].strip().replace(
-                            ',', '')
-                        val['NAME'] = name
-                    elif line.startswith('VIEW'):
-                        space_index = line.find(' ')
-                        view = line[space_index:].strip()
-                        val['VIEW'] = view
-
-                    if 'NAME' in val and 'VIEW' in val:
-                        break
-        except FileNotFoundError:
-            return val
-        return val
-
-    def scan_size(self, soundpack_info):
-        next_scans = deque()
-        current_scan = scandir(soundpack_info['path'])
-
-        total_size = 0
-
-        while True:
-            try:
-                entry = next(current_scan)
-                if entry.is_dir():
-                    next_scans.append(entry.path)
-                elif entry.is_file():
-                    total_size += entry.stat().st_size
-            except StopIteration:
-                if len(next_scans) > 0:
-                    current_scan = scandir(next_scans.popleft())
+            if selected_info.get('url', None) == url:
+                if size is not None:
+                    self.size_le.setText(sizeof_fmt(size))
                 else:
-                    break
-
-        return total_size
+                    self.size_le.setText(_('Unknown'))
 
     def add_soundpack(self, soundpack_info):
         index = self.soundpacks_model.rowCount()
@@ -1100,6 +663,8 @@ class SoundpacksTab(QTabWidget):
             soundpack_info['VIEW'] + disabled_text)
 
     def clear_soundpacks(self):
+        self.stop_sizes_check()
+
         self.game_dir = None
         self.soundpacks = []
 
@@ -1122,6 +687,8 @@ class SoundpacksTab(QTabWidget):
         self.homepage_tb.setText('')
 
     def game_dir_changed(self, new_dir):
+        self.stop_sizes_check()
+
         self.game_dir = new_dir
         self.soundpacks = []
 
@@ -1158,7 +725,7 @@ class SoundpacksTab(QTabWidget):
                         config_file = os.path.join(soundpack_path,
                             'soundpack.txt')
                         if os.path.isfile(config_file):
-                            info = self.config_info(config_file)
+                            info = soundpack_config_info(config_file)
                             if 'NAME' in info and 'VIEW' in info:
                                 soundpack_info = {
                                     'path': soundpack_path,
@@ -1167,14 +734,12 @@ class SoundpacksTab(QTabWidget):
                                 soundpack_info.update(info)
 
                                 self.soundpacks.append(soundpack_info)
-                                soundpack_info['size'] = (
-                                    self.scan_size(soundpack_info))
                                 self.add_soundpack(soundpack_info)
                                 continue
                         disabled_config_file = os.path.join(soundpack_path,
                             'soundpack.txt.disabled')
                         if os.path.isfile(disabled_config_file):
-                            info = self.config_info(disabled_config_file)
+                            info = soundpack_config_info(disabled_config_file)
                             if 'NAME' in info and 'VIEW' in info:
                                 soundpack_info = {
                                     'path': soundpack_path,
@@ -1183,11 +748,110 @@ class SoundpacksTab(QTabWidget):
                                 soundpack_info.update(info)
 
                                 self.soundpacks.append(soundpack_info)
-                                soundpack_info['size'] = (
-                                    self.scan_size(soundpack_info))
                                 self.add_soundpack(soundpack_info)
 
                 except StopIteration:
                     break
+
+            # Show the sizes recorded at install time or at the last check
+            # right away. The soundpacks which changed since are walked
+            # again in the background.
+            known_sizes = get_soundpack_sizes(soundpacks_dir)
+            for soundpack_info in self.soundpacks:
+                known_size = known_sizes.get(soundpack_info['path'])
+                if known_size is not None:
+                    soundpack_info['size'] = known_size['size']
+                else:
+                    soundpack_info['size'] = None
+
+            keep_soundpack_sizes(soundpacks_dir, (soundpack_info['path']
+                for soundpack_info in self.soundpacks))
+
+            if len(self.soundpacks) > 0:
+                sizes_check_thread = SoundpacksSizeCheckThread(
+                    [soundpack_info['path'] for soundpack_info
+                        in self.soundpacks], known_sizes)
+                sizes_check_thread.size_changed.connect(
+                    self.soundpack_size_changed)
+                sizes_check_thread.finished.connect(
+                    self.sizes_check_finished)
+                self.sizes_check_thread = sizes_check_thread
+                sizes_check_thread.start()
         else:
             self.soundpacks_dir = None
+
+    def stop_sizes_check(self):
+        if self.sizes_check_thread is not None:
+            self.sizes_check_thread.size_changed.disconnect(
+                self.soundpack_size_changed)
+            self.sizes_check_thread.finished.disconnect(
+                self.sizes_check_finished)
+            self.sizes_check_thread.requestInterruption()
+            self.sizes_check_thread.wait()
+            self.sizes_check_thread = None
+
+    def sizes_check_finished(self):
+        self.sizes_check_thread = None
+
+    def soundpack_size_changed(self, path, mtime, size):
+        for index, soundpack_info in enumerate(self.soundpacks):
+            if soundpack_info['path'] == path:
+                soundpack_info['size'] = size
+                set_soundpack_size(self.soundpacks_dir, path, mtime, size)
+
+                selection_model = self.installed_lv.selectionModel()
+                if (selection_model is not None
+                    and selection_model.hasSelection()
+                    and selection_model.currentIndex().row() == index):
+                    self.size_le.setText(sizeof_fmt(size))
+                break
+
+    def record_soundpack_size(self, soundpack_info):
+        # Keep the size until the soundpack directory changes again after
+        # an install or a rename of its config file. The size is not known
+        # when the soundpack could not be walked.
+        if soundpack_info['size'] is None:
+            return
+
+        try:
+            mtime = dir_tree_mtime(soundpack_info['path'])
+        except OSError:
+            return
+
+        set_soundpack_size(self.soundpacks_dir, soundpack_info['path'],
+            mtime, soundpack_info['size'])
+
+
+class SoundpacksSizeCheckThread(QThread):
+    '''Walk the soundpacks which directories changed since their size was
+    recorded. Only directories are looked at for the others.'''
+
+    # Sizes can be over the range of int
+    size_changed = pyqtSignal(str, float, object)
+
+    def __init__(self, paths, known_sizes):
+        super(SoundpacksSizeCheckThread, self).__init__()
+
+        self.paths = paths
+        self.known_sizes = known_sizes
+
+    def __del__(self):
+        self.wait()
+
+    def run(self):
+        for path in self.paths:
+            if self.isInterruptionRequested():
+                return
+
+            try:
+                mtime = dir_tree_mtime(path)
+                known_size = self.known_sizes.get(path)
+                if known_size is not None and known_size['mtime'] == mtime:
+                    continue
+
+                size = tree_size(path)
+            except OSError:
+                # Removed while checking
+                continue
+
+            self.size_changed.emit(path, mtime, size)
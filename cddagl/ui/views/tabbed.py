@@ -7,16 +7,14 @@ import subprocess
 import sys
 import tempfile
 from datetime import datetime
-from distutils.version import LooseVersion
 from io import BytesIO, TextIOWrapper
 from urllib.parse import urljoin
 
-import markdown
 from PyQt5.QtCore import Qt, QUrl, pyqtSignal, QByteArray, QThread
 from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
 from PyQt5.QtWidgets import (
     QGridLayout, QMainWindow, QLabel, QLineEdit, QPushButton, QProgressBar,
-    QAction, QDialog, QTabWidget, QCheckBox, QMessageBox, QMenu
+    QAction, QDialog, QTabWidget, QCheckBox, QMessageBox, QMenu, QWidget
 )
 from pywintypes import error as PyWinError
 
@@ -24,9 +22,12 @@ import cddagl.constants as cons
 from cddagl import __version__ as version
 from cddagl.functions import sizeof_fmt, delete_path
 from cddagl.i18n import proxy_gettext as _
-from cddagl.sql.functions import get_config_value, set_config_value, config_true
+from cddagl.sql.functions import (
+    get_config_value, set_config_value, config_true, flush_config_values
+)
+from cddagl.tracing import mark_startup_phase, finish_startup_trace
 from cddagl.ui.views.backups import BackupsTab
-from cddagl.ui.views.dialogs import AboutDialog
+from cddagl.ui.views.dialogs import AboutDialog, DiagnosticsDialog
 from cddagl.ui.views.fonts import FontsTab
 from cddagl.ui.views.main import MainTab
 from cddagl.ui.views.mods import ModsTab
@@ -53,7 +54,11 @@ class TabbedWindow(QMainWindow):
         self.http_reply = None
         self.in_manual_update_check = False
 
+        # Mods and soundpacks can be installed at the same time
+        self.asset_installs = 0
+
         self.about_dialog = None
+        self.diagnostics_dialog = None
 
         geometry = get_config_value('window_geometry')
         if geometry is not None:
@@ -72,10 +77,13 @@ class TabbedWindow(QMainWindow):
         self.help_menu.setTitle(_('&Help'))
         if getattr(sys, 'frozen', False):
             self.update_action.setText(_('&Check for update'))
+        self.diagnostics_action.setText(_('&Diagnostics'))
         self.about_action.setText(_('&About CDDA Game Launcher'))
 
         if self.about_dialog is not None:
             self.about_dialog.set_text()
+        if self.diagnostics_dialog is not None:
+            self.diagnostics_dialog.set_text()
         self.central_widget.set_text()
 
     def create_status_bar(self):
@@ -109,6 +117,11 @@ class TabbedWindow(QMainWindow):
             self.help_menu.addAction(update_action)
             self.help_menu.addSeparator()
 
+        diagnostics_action = QAction(_('&Diagnostics'), self,
+            triggered=self.show_diagnostics_dialog)
+        self.diagnostics_action = diagnostics_action
+        self.help_menu.addAction(diagnostics_action)
+
         about_action = QAction(_('&About CDDA Game Launcher'), self,
             triggered=self.show_about_dialog)
         self.about_action = about_action
@@ -122,6 +135,16 @@ class TabbedWindow(QMainWindow):
 
         self.about_dialog.exec()
 
+    def show_diagnostics_dialog(self):
+        if self.diagnostics_dialog is None:
+            diagnostics_dialog = DiagnosticsDialog(self, Qt.WindowTitleHint |
+                Qt.WindowCloseButtonHint)
+            self.diagnostics_dialog = diagnostics_dialog
+        else:
+            self.diagnostics_dialog.refresh()
+
+        self.diagnostics_dialog.exec()
+
     def check_new_launcher_version(self):
         self.lv_html = BytesIO()
 
@@ -196,6 +219,9 @@ class TabbedWindow(QMainWindow):
         if 'body' not in latest_release:
             return
 
+        # Only needed once a launcher release was found
+        from distutils.version import LooseVersion
+
         version_text = latest_release['tag_name']
         if version_text.startswith('v'):
             version_text = version_text[1:]
@@ -230,6 +256,7 @@ class TabbedWindow(QMainWindow):
             markdown_desc = re.sub(number_pattern, replacement_pattern,
                 markdown_desc)
 
+            import markdown
             html_desc = markdown.markdown(markdown_desc)
 
             release_html = ('''
@@ -343,6 +370,8 @@ class TabbedWindow(QMainWindow):
 
     def showEvent(self, event):
         if not self.shown:
+            mark_startup_phase('first showEvent')
+
             if not config_true(get_config_value('prevent_version_check_launch',
                 'False')):
                 if getattr(sys, 'frozen', False):
@@ -356,11 +385,11 @@ class TabbedWindow(QMainWindow):
         set_config_value('window_geometry', geometry)
 
         backups_tab = self.central_widget.backups_tab
-        backups_tab.save_geometry()
+        if not isinstance(backups_tab, LazyTab):
+            backups_tab.save_geometry()
 
     def closeEvent(self, event):
         update_group_box = self.central_widget.main_tab.update_group_box
-        soundpacks_tab = self.central_widget.soundpacks_tab
 
         if update_group_box.updating:
             update_group_box.close_after_update = True
@@ -371,19 +400,25 @@ class TabbedWindow(QMainWindow):
                 event.accept()
             else:
                 event.ignore()
-        elif soundpacks_tab.installing_new_soundpack:
-            soundpacks_tab.close_after_install = True
-            soundpacks_tab.install_new()
-
-            if not soundpacks_tab.installing_new_soundpack:
-                self.save_geometry()
-                event.accept()
-            else:
-                event.ignore()
         else:
+            # Unfinished mod and soundpack installations are cancelled
+            for tab in (self.central_widget.mods_tab,
+                self.central_widget.soundpacks_tab):
+                if not isinstance(tab, LazyTab):
+                    tab.install_queue.cancel_all()
+
+            soundpacks_tab = self.central_widget.soundpacks_tab
+            if not isinstance(soundpacks_tab, LazyTab):
+                soundpacks_tab.stop_sizes_check()
+
             self.save_geometry()
             event.accept()
 
+        if event.isAccepted():
+            # The trace is still running if no network reply came back
+            finish_startup_trace()
+            flush_config_values()
+
 
 class CentralWidget(QTabWidget):
     def __init__(self):
@@ -397,6 +432,8 @@ class CentralWidget(QTabWidget):
         #self.create_fonts_tab()
         self.create_settings_tab()
 
+        self.currentChanged.connect(self.current_tab_changed)
+
     def set_text(self):
         self.setTabText(self.indexOf(self.main_tab), _('Main'))
         self.setTabText(self.indexOf(self.backups_tab), _('Backups'))
@@ -420,35 +457,148 @@ class CentralWidget(QTabWidget):
         self.main_tab = main_tab
 
     def create_backups_tab(self):
-        backups_tab = BackupsTab()
+        backups_tab = LazyTab('backups_tab', BackupsTab)
         self.addTab(backups_tab, _('Backups'))
         self.backups_tab = backups_tab
 
     def create_mods_tab(self):
-        mods_tab = ModsTab()
+        mods_tab = LazyTab('mods_tab', ModsTab)
         self.addTab(mods_tab, _('Mods'))
         self.mods_tab = mods_tab
 
     def create_tilesets_tab(self):
-        tilesets_tab = TilesetsTab()
+        tilesets_tab = LazyTab('tilesets_tab', TilesetsTab)
         self.addTab(tilesets_tab, _('Tilesets'))
         self.tilesets_tab = tilesets_tab
 
     def create_soundpacks_tab(self):
-        soundpacks_tab = SoundpacksTab()
+        soundpacks_tab = LazyTab('soundpacks_tab', SoundpacksTab)
         self.addTab(soundpacks_tab, _('Soundpacks'))
         self.soundpacks_tab = soundpacks_tab
 
     def create_fonts_tab(self):
-        fonts_tab = FontsTab()
+        fonts_tab = LazyTab('fonts_tab', FontsTab)
         self.addTab(fonts_tab, _('Fonts'))
         self.fonts_tab = fonts_tab
 
     def create_settings_tab(self):
-        settings_tab = SettingsTab()
+        settings_tab = LazyTab('settings_tab', SettingsTab)
         self.addTab(settings_tab, _('Settings'))
         self.settings_tab = settings_tab
 
+    def current_tab_changed(self, index):
+        tab = self.widget(index)
+        if isinstance(tab, LazyTab):
+            self.load_tab(tab)
+
+    def load_tab(self, lazy_tab):
+        if lazy_tab.tab is not None:
+            return lazy_tab.tab
+
+        tab = lazy_tab.tab_class()
+        lazy_tab.tab = tab
+
+        # Swap the placeholder for the real tab without going through
+        # current_tab_changed again
+        index = self.indexOf(lazy_tab)
+        text = self.tabText(index)
+        current_index = self.currentIndex()
+        self.blockSignals(True)
+        self.removeTab(index)
+        self.insertTab(index, tab, text)
+        self.setCurrentIndex(current_index)
+        self.blockSignals(False)
+        setattr(self, lazy_tab.name, tab)
+        lazy_tab.deleteLater()
+
+        # Replay what happened to the tab while it was not built
+        if lazy_tab.game_dir is not None:
+            tab.game_dir_changed(lazy_tab.game_dir)
+        if lazy_tab.tab_disabled:
+            tab.disable_tab()
+
+        return tab
+
+
+class LazyTab(QWidget):
+    '''Placeholder for a tab which is only built when it is first shown.
+
+    The cross tab calls made before that are remembered and replayed once the
+    tab is built. Accessing anything else builds the tab right away.
+    '''
+
+    # Kept on the placeholder, every other attribute is set on the tab
+    placeholder_attributes = ('name', 'tab_class', 'tab', 'tab_disabled',
+        'game_dir')
+
+    def __init__(self, name, tab_class):
+        super(LazyTab, self).__init__()
+
+        self.name = name
+        self.tab_class = tab_class
+        self.tab = None
+
+        self.tab_disabled = False
+        self.game_dir = None
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the placeholder itself
+        if name.startswith('__') or 'tab' not in self.__dict__:
+            raise AttributeError(name)
+
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name, value):
+        if name in self.placeholder_attributes:
+            super(LazyTab, self).__setattr__(name, value)
+        else:
+            setattr(self.load(), name, value)
+
+    def load(self):
+        # The placeholder is deleted once the tab is built, so anything still
+        # holding on to it goes straight to the tab
+        if self.tab is not None:
+            return self.tab
+
+        central_widget = self.parentWidget().parentWidget()
+        return central_widget.load_tab(self)
+
+    def call_tab(self, name, *args):
+        # Returns False when the tab is not built yet
+        if self.tab is None:
+            return False
+
+        getattr(self.tab, name)(*args)
+        return True
+
+    def set_text(self):
+        self.call_tab('set_text')
+
+    def disable_tab(self):
+        if not self.call_tab('disable_tab'):
+            self.tab_disabled = True
+
+    def enable_tab(self):
+        if not self.call_tab('enable_tab'):
+            self.tab_disabled = False
+
+    def game_dir_changed(self, new_dir):
+        if not self.call_tab('game_dir_changed', new_dir):
+            self.game_dir = new_dir
+
+    def clear_game_dir(self, name):
+        if not self.call_tab(name):
+            self.game_dir = None
+
+    def clear_backups(self):
+        self.clear_game_dir('clear_backups')
+
+    def clear_mods(self):
+        self.clear_game_dir('clear_mods')
+
+    def clear_soundpacks(self):
+        self.clear_game_dir('clear_soundpacks')
+
 
 class LauncherUpdateDialog(QDialog):
     def __init__(self, url, version, parent=0, f=0):
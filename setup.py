@@ -34,6 +34,21 @@ def log(msg):
     print(msg)
 
 
+def write_alembic_head():
+    """Write the head revision of the migration scripts to cddagl/ALEMBIC_HEAD
+    so the launcher does not need alembic to know the database is current."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    alembic_cfg = Config()
+    alembic_cfg.set_main_option('script_location',
+        str(get_setup_dir() / 'alembic'))
+    head_revision = ScriptDirectory.from_config(alembic_cfg).get_current_head()
+
+    with open(get_setup_dir() / 'cddagl' / 'ALEMBIC_HEAD', 'w') as head_file:
+        head_file.write(head_revision)
+
+
 class ExtendedCommand(Command):
     def run_other_command(self, command_name, **kwargs):
         """Runs another command with specified parameters."""
@@ -89,12 +104,15 @@ class FreezeWithPyInstaller(ExtendedCommand):
             ucrt_path = windowskit_path + 'Redist\\ucrt\\DLLs\\x86\\'
             makespec_call.extend(('-p', ucrt_path))
 
+        write_alembic_head()
+
         # Additional files
         added_files = [
             ('alembic', 'alembic'),
             ('data', 'data'),
             ('cddagl/resources', 'cddagl/resources'),
-            ('cddagl/VERSION', 'cddagl')
+            ('cddagl/VERSION', 'cddagl'),
+            ('cddagl/ALEMBIC_HEAD', 'cddagl')
         ]
 
         added_binaries = []